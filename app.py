@@ -2,17 +2,58 @@ import dash
 from dash import dcc, html, Input, Output, State, callback
 import dash_bootstrap_components as dbc
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
+import plotly.utils
 from dash.exceptions import PreventUpdate
 import numpy as np
 from datetime import datetime
 import flask
 from flask_login import LoginManager, UserMixin, login_user, logout_user, current_user, login_required
 import os
+import shlex
 from werkzeug.security import generate_password_hash, check_password_hash
 import json
-from io import StringIO
+import atexit
+import contextvars
+import gc
+import gzip
+import hashlib
+import hmac
+import importlib
+import importlib.util
+import shutil
+import sqlite3
+import sys
+import threading
+import uuid
+import tempfile
+import time
+import tracemalloc
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import wraps
+from multiprocessing import shared_memory
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# Modules only some requests need are imported on first use, not while the worker boots
+class LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+px = LazyModule('plotly.express')
+duckdb = LazyModule('duckdb') if importlib.util.find_spec('duckdb') is not None else None
 
 # Initialize the Dash app with Bootstrap theme and Poppins font
 app = dash.Dash(
@@ -31,6 +72,33 @@ app.css.append_css({
     "external_url": "data:text/css;charset=UTF-8,body { font-family: 'Poppins', sans-serif; background-color: #F5F7FA; }"
 })
 
+# Startup report: how long each phase of bringing a worker up took, the first counted from
+# the start of the process. Printed once the data is loaded, and served by /ready
+startup_phases = []
+
+
+def process_age():
+    try:
+        with open('/proc/self/stat') as f:
+            started = int(f.read().rsplit(')', 1)[1].split()[19]) / os.sysconf('SC_CLK_TCK')
+        with open('/proc/uptime') as f:
+            return float(f.read().split()[0]) - started
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+@contextmanager
+def startup_phase(name):
+    began = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_phases.append((name, round(time.perf_counter() - began, 3)))
+
+
+if process_age() is not None:
+    startup_phases.append(('interpreter and imports', round(process_age(), 3)))
+
 server = app.server
 server.secret_key = os.environ.get('SECRET_KEY', 'your-secret-key')
 
@@ -46,542 +114,3493 @@ class User(UserMixin):
         self.username = username
         self.password_hash = password_hash
 
-# Sample users
-users = {
-    'admin': User('admin', 'admin', generate_password_hash('password')),
-    'user': User('user', 'user', generate_password_hash('password'))
-}
+
+# Sample users. Hashing a password takes about 0.2s, so the hashes are computed after boot
+# (see start_up) or by the first login, whichever comes first
+sample_passwords = {'admin': 'password', 'user': 'password'}
+users = {name: User(name, name, None) for name in sample_passwords}
+users_lock = threading.Lock()
+
+
+def password_hash(user):
+    with users_lock:
+        if user.password_hash is None:
+            user.password_hash = generate_password_hash(sample_passwords[user.id])
+        return user.password_hash
 
 @login_manager.user_loader
 def load_user(user_id):
     return users.get(user_id)
 
+
 # Load and preprocess data
+DATA_FILE = os.environ.get('DASHBOARD_DATA_FILE', 'web_server_data.csv')
+
 def load_data():
-    df = pd.read_csv("web_server_data.csv")
-    df['timestamp'] = pd.to_datetime(df['timestamp'], format='mixed', dayfirst=False, errors='coerce')
-    df['date'] = pd.to_datetime(df['date'], errors='coerce')
+    df = pd.read_csv(DATA_FILE)
+    return encode_data(prepare_data(df))
+
+
+# Timestamp parsing: try the known export formats as vectorized fixed-format parses and
+# only send the rows they reject to the slow per-element 'mixed' parser
+DATE_FORMATS = ['%m/%d/%Y']
+TIMESTAMP_FORMATS = ['%m/%d/%Y %H:%M', '%m/%d/%Y']
+parse_stats = {'rows': 0, 'fallback': 0, 'rejected': 0, 'invalid_ips': 0}
+# Sketches, sessions, the sample and request-time scans re-read the CSV too; only the pass
+# that builds the backend's primary data counts (see primary_pass), so each row counts once
+parse_counts = contextvars.ContextVar('parse_counts', default=None)
+
+
+@contextmanager
+def primary_pass():
+    for key in parse_stats:
+        parse_stats[key] = 0
+    token = parse_counts.set(parse_stats)
+    try:
+        yield
+    finally:
+        parse_counts.reset(token)
+
+
+def count_parsed(key, n):
+    counts = parse_counts.get()
+    if counts is not None:
+        counts[key] += n
+
+
+def parse_datetimes(values, formats, parsed=None):
+    values = values.astype(object)
+    if parsed is None:
+        parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    pending = parsed.isna() & values.notna()
+    for fmt in formats:
+        if not pending.any():
+            break
+        parsed[pending] = pd.to_datetime(values[pending], format=fmt, errors='coerce')
+        pending &= parsed.isna()
+    fallback = int(pending.sum())
+    if fallback:
+        parsed[pending] = pd.to_datetime(values[pending], format='mixed', dayfirst=False, errors='coerce')
+    return parsed, fallback
+
+
+# Full-second timestamps come from the separate date and time columns; the minute-precision
+# timestamp column only fills rows where those are missing or malformed
+def parse_timestamps(df):
+    combined = df['date'].astype(str) + ' ' + df['time'].astype(str)
+    parsed = pd.to_datetime(combined, format='%m/%d/%Y %H:%M:%S', errors='coerce')
+    parsed, fallback = parse_datetimes(df['timestamp'], TIMESTAMP_FORMATS, parsed)
+    rejected = int(parsed.isna().sum())
+    count_parsed('rows', len(df))
+    count_parsed('fallback', fallback)
+    count_parsed('rejected', rejected)
+    return parsed
+
+
+# IPv4 addresses are stored as uint32, 4 bytes a row instead of a Python string. Each
+# distinct address is split and packed once; unparseable ones map to INVALID_IP
+INVALID_IP = 0
+
+
+def parse_ipv4(values):
+    codes, uniques = pd.factorize(values)
+    octets = pd.Series(uniques, dtype=object).astype(str).str.split('.', expand=True)
+    octets = octets.reindex(columns=range(5))
+    numbers = octets[[0, 1, 2, 3]].apply(pd.to_numeric, errors='coerce')
+    valid = (numbers.notna().all(axis=1) & numbers.ge(0).all(axis=1) & numbers.le(255).all(axis=1)
+             & (numbers % 1 == 0).all(axis=1) & octets[4].isna()).to_numpy()
+    numbers = numbers.fillna(0).to_numpy().astype(np.uint32)
+    packed = (numbers[:, 0] << 24) | (numbers[:, 1] << 16) | (numbers[:, 2] << 8) | numbers[:, 3]
+    # The extra trailing slot is where missing values (code -1) land
+    ips = np.zeros(len(uniques) + 1, dtype=np.uint32)
+    ips[:-1] = np.where(valid, packed, INVALID_IP)
+    ips = ips[codes]
+    count_parsed('invalid_ips', int((ips == INVALID_IP).sum()))
+    return ips
+
+
+def format_ips(values, blank_invalid=True):
+    values = np.asarray(values).astype(np.uint32)
+    octets = [pd.Series((values >> shift) & 255).astype(str) for shift in (24, 16, 8, 0)]
+    text = octets[0] + '.' + octets[1] + '.' + octets[2] + '.' + octets[3]
+    if blank_invalid:
+        text = text.where(values != INVALID_IP, '')
+    return text.to_numpy(dtype=object)
+
+
+def report_parsing():
+    if parse_stats['rows']:
+        print(
+            f"Parsing: {parse_stats['rows']:,} rows, "
+            f"{parse_stats['fallback']:,} timestamps coerced by per-element parsing, "
+            f"{parse_stats['rejected']:,} rejected; "
+            f"{parse_stats['invalid_ips']:,} invalid IPv4 addresses"
+        )
+
+
+# Derive the calendar columns used by the tabs
+def prepare_data(df):
+    df['timestamp'] = parse_timestamps(df)
+    df['date'], date_fallback = parse_datetimes(df['date'], DATE_FORMATS)
+    count_parsed('fallback', date_fallback)
     df['month'] = df['date'].dt.month
     df['month_name'] = df['date'].dt.strftime('%b')
     df['year'] = df['date'].dt.year
     df['hour'] = df['timestamp'].dt.hour
     df['day_of_week'] = df['date'].dt.day_name()
+    df['ip_address'] = parse_ipv4(df['ip_address'])
     return df
 
-# Load the global DataFrame
-df = pd.read_csv("web_server_data.csv")  # File in same directory as app.py
 
-# Continent to country mapping
-continent_to_countries = {
-    'Europe': ['UK', 'Germany'],
-    'North America': ['USA', 'Canada'],
-    'Oceania': ['Australia'],
-    'Asia': ['India']
-}
+# Encode string columns as categoricals so every column is backed by a flat NumPy buffer
+def encode_data(df):
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].astype('category')
+    return df
 
-# Define color scheme
-colors = {
-    'primary': '#4a6baf',
-    'secondary': '#6c757d',
-    'success': '#28a745',
-    'danger': '#dc3545',
-    'warning': '#ffc107',
-    'info': '#17a2b8',
-    'light': '#F5F7FA',
-    'dark': '#343a40',
-    'job_requests': '#4a6baf',
-    'demo_requests': '#9c27b0',
-    'ai_assistant': '#2196f3',
-    'event_registrations': '#4caf50',
-    'job_types': {
-        'AI Specialist': '#4a6baf',
-        'Software Developer': '#9c27b0',
-        'Project Manager': '#2196f3',
-        'System Admin': '#4caf50',
-        'Data Analyst': '#ff9800',
-        'Other': '#ff5722'
-    },
-    'gender': {
-        'Male': '#1f77b4',
-        'Female': '#ff7f0e',
-        'Other': '#808080'
-    }
-}
 
-# Navigation tabs
-tabs = html.Div([
-    dbc.Tabs([
-        dbc.Tab(label="Overview", tab_id="overview", labelClassName="text-primary", activeLabelClassName="fw-bold"),
-        dbc.Tab(label="Data Explorer", tab_id="dataset", labelClassName="text-primary", activeLabelClassName="fw-bold"),
-        dbc.Tab(label="Geo-sales Insights", tab_id="geographic", labelClassName="text-primary", activeLabelClassName="fw-bold"),
-        dbc.Tab(label="Sales Trend Over Time", tab_id="time", labelClassName="text-primary", activeLabelClassName="fw-bold"),
-        dbc.Tab(label="Job Types Analysis", tab_id="job_types", labelClassName="text-primary", activeLabelClassName="fw-bold"),
-        dbc.Tab(label="Feature Requests", tab_id="features", labelClassName="text-primary", activeLabelClassName="fw-bold"),
-        dbc.Tab(label="Demographic Insights", tab_id="demographics", labelClassName="text-primary", activeLabelClassName="fw-bold"),
-        dbc.Tab(label="Statistical Insights", tab_id="statistics", labelClassName="text-primary", activeLabelClassName="fw-bold"),
-    ],
-    id="tabs",
-    active_tab="overview",
-    className="mb-3"),
-], style={"fontFamily": "Poppins"})
+# Shared-memory dataset: with gunicorn preload (see gunicorn.conf.py) the master loads and
+# encodes the data once and every forked worker reads the same read-only buffers
+SHARED_MEMORY = os.environ.get('DASHBOARD_SHARED_MEMORY', '0') == '1'
+shared_blocks = []
+shared_owner_pid = os.getpid()
 
-# Tooltips for filters
-filter_tooltips = {
-    'start-date': 'Select the start date for the data range to analyze',
-    'end-date': 'Select the end date for the data range to analyze',
-    'time-granularity-filter': 'Choose the time aggregation level (daily, weekly, monthly, yearly)',
-    'continent-filter': 'Filter data by continent',
-    'country-filter': 'Filter data by country',
-    'job-type-filter': 'Filter data by job type',
-    'interaction-type-filter': 'Filter data by interaction type (e.g., Demo Request, Job Placement)',
-    'apply-filters': 'Apply all selected filters to update the dashboard',
-    'reset-filters': 'Reset all filters to their default values'
-}
 
-# Filters sidebar with tooltips
-filters = html.Div([
-    html.H5("Filters", className="mb-3"),
-    html.Div([
-        html.Label([
-            "Date Range:",
-            dbc.Tooltip("Select the date range for data analysis", target="date-range-label"),
-        ], id="date-range-label", className="fw-bold mb-2"),
-        dbc.Row([
-            dbc.Col([
-                html.Label([
-                    "Start Date",
-                    dbc.Tooltip(filter_tooltips['start-date'], target="start-date-label"),
-                ], id="start-date-label", className="mb-1"),
-                dcc.DatePickerSingle(
-                    id='start-date',
-                    min_date_allowed=df['date'].min() if not pd.isna(df['date'].min()) else None,
-                    max_date_allowed=df['date'].max() if not pd.isna(df['date'].max()) else None,
-                    initial_visible_month=df['date'].min() if not pd.isna(df['date'].min()) else None,
-                    date=df['date'].min() if not pd.isna(df['date'].min()) else None,
-                    className="mb-3 w-100"
-                ),
-            ], width=6),
-            dbc.Col([
-                html.Label([
-                    "End Date",
-                    dbc.Tooltip(filter_tooltips['end-date'], target="end-date-label"),
-                ], id="end-date-label", className="mb-1"),
-                dcc.DatePickerSingle(
-                    id='end-date',
-                    min_date_allowed=df['date'].min() if not pd.isna(df['date'].min()) else None,
-                    max_date_allowed=df['date'].max() if not pd.isna(df['date'].max()) else None,
-                    initial_visible_month=df['date'].max() if not pd.isna(df['date'].max()) else None,
-                    date=df['date'].max() if not pd.isna(df['date'].max()) else None,
-                    className="mb-3 w-100"
-                ),
-            ], width=6),
-        ]),
-    ], className="mb-1"),
-    html.Div([
-        html.Label([
-            "Time Granularity:",
-            dbc.Tooltip(filter_tooltips['time-granularity-filter'], target="time-granularity-label"),
-        ], id="time-granularity-label", className="fw-bold mb-2"),
-        dcc.Dropdown(
-            id='time-granularity-filter',
-            options=[
-                {'label': 'Daily', 'value': 'daily'},
-                {'label': 'Weekly', 'value': 'weekly'},
-                {'label': 'Monthly', 'value': 'monthly'},
-                {'label': 'Yearly', 'value': 'yearly'}
-            ],
-            value='daily',
-            clearable=False,
-            className="mb-3"
-        ),
-    ]),
-    html.Div([
-        html.Label([
-            "Continent:",
-            dbc.Tooltip(filter_tooltips['continent-filter'], target="continent-filter-label"),
-        ], id="continent-filter-label", className="fw-bold mb-2"),
-        dcc.Dropdown(
-            id='continent-filter',
-            options=[{'label': 'All Continents', 'value': 'all'}] +
-                    [{'label': continent, 'value': continent} for continent in sorted(df['continent'].unique())],
-            value='all',
-            clearable=False,
-            className="mb-3"
-        ),
-    ]),
-    html.Div([
-        html.Label([
-            "Country:",
-            dbc.Tooltip(filter_tooltips['country-filter'], target="country-filter-label"),
-        ], id="country-filter-label", className="fw-bold mb-2"),
-        dcc.Dropdown(
-            id='country-filter',
-            options=[{'label': 'All Countries', 'value': 'all'}] +
-                    [{'label': country, 'value': country} for country in sorted(df['country'].unique())],
-            value='all',
-            clearable=False,
-            className="mb-3"
-        ),
-    ]),
-    html.Div([
-        html.Label([
-            "Job Type:",
-            dbc.Tooltip(filter_tooltips['job-type-filter'], target="job-type-filter-label"),
-        ], id="job-type-filter-label", className="fw-bold mb-2"),
-        dcc.Dropdown(
-            id='job-type-filter',
-            options=[{'label': 'All Job Types', 'value': 'all'}] +
-                    [{'label': job_type, 'value': job_type} for job_type in sorted(df['job_type'].unique())],
-            value='all',
-            clearable=False,
-            className="mb-3"
-        ),
-    ]),
-    html.Div([
-        html.Label([
-            "Interaction Type:",
-            dbc.Tooltip(filter_tooltips['interaction-type-filter'], target="interaction-type-filter-label"),
-        ], id="interaction-type-filter-label", className="fw-bold mb-2"),
-        dcc.Dropdown(
-            id='interaction-type-filter',
-            options=[{'label': 'All Interactions', 'value': 'all'}] +
-                    [{'label': interaction, 'value': interaction} for interaction in sorted(df['interaction_type'].unique())],
-            value='all',
-            clearable=False,
-            className="mb-3"
-        ),
-    ]),
-    dbc.Row([
-        dbc.Col(
-            html.Button([
-                'Apply Filters',
-                dbc.Tooltip(filter_tooltips['apply-filters'], target="apply-filters"),
-            ], id='apply-filters', className="btn btn-primary w-100 mt-2"),
-            width=6
-        ),
-        dbc.Col(
-            html.Button([
-                'Reset Filters',
-                dbc.Tooltip(filter_tooltips['reset-filters'], target="reset-filters"),
-            ], id='reset-filters', className="btn btn-secondary w-100 mt-2"),
-            width=6
-        ),
-    ]),
-], className="p-3 border rounded", style={"backgroundColor": "#E9EDF4", "fontFamily": "Poppins"})
+def to_shared_array(values):
+    values = np.ascontiguousarray(values)
+    block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    shared_blocks.append(block)
+    shared = np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)
+    shared[:] = values
+    shared.flags.writeable = False
+    return shared
 
-# Login form
-login_layout = html.Div([
-    html.Div([
-        html.H2("SALES INSIGHTS DASHBOARD", className="text-center mb-4 text-primary", style={"fontFamily": "Poppins"}),
-        html.H4("Login", className="text-center mb-4", style={"fontFamily": "Poppins"}),
-        dbc.Alert(
-            "Invalid username or password",
-            id="login-alert",
-            dismissable=True,
-            is_open=False,
-            color="danger",
-        ),
-        dbc.Form([
-            dbc.Row([
-                dbc.Label("Username", html_for="username", width=3),
-                dbc.Col(
-                    dbc.Input(type="text", id="username", placeholder="Enter username"),
-                    width=9
-                )
-            ], className="mb-3"),
-            dbc.Row([
-                dbc.Label("Password", html_for="password"),
-                dbc.Col(
-                    dbc.Input(type="password", id="password", placeholder="Enter password"),
-                    width=9
-                )
-            ], className="mb-3"),
-            dbc.Button("Login", color="primary", id="login-button", className="w-100 mt-3"),
-        ]),
-    ], className="p-4 border rounded shadow", style={"maxWidth": "400px", "backgroundColor": "#F5F7FA"}),
-], className="d-flex justify-content-center align-items-center", style={"height": "100vh", "backgroundColor": "#F5F7FA"})
 
-# Main layout for the dashboard
-dashboard_layout = html.Div([
-    # Header
-    dbc.Navbar(
-        dbc.Container([
-            html.A(
-                dbc.Row([
-                    dbc.Col(html.H3("SALES INSIGHTS DASHBOARD", className="text-white mb-0 text-center", style={"fontFamily": "Poppins"}), width=12),
-                ], align="center", justify="center"),
-                href="#",
-            ),
-            dbc.Row([
-                dbc.Col([
-                    html.Div([
-                        html.Span("Admin User", className="me-2 text-white", style={"fontFamily": "Poppins"}),
-                        html.Div(
-                            "A",
-                            style={
-                                "backgroundColor": "#fff",
-                                "color": "#4a6baf",
-                                "borderRadius": "50%",
-                                "width": "32px",
-                                "height": "32px",
-                                "display": "flex",
-                                "alignItems": "center",
-                                "justifyContent": "center",
-                                "fontWeight": "bold",
-                                "fontFamily": "Poppins"
-                            }
-                        ),
-                    ], className="d-flex align-items-center"),
-                ], className="mt-3 mt-md-0"),
-                dbc.Col([
-                    dbc.Button("Logout", id="logout-button", color="light", size="sm", className="ms-2"),
-                ], className="mt-3 mt-md-0"),
-            ], className="ms-auto flex-nowrap mt-3 mt-md-0", align="center"),
-        ]),
-        style={"background": "linear-gradient(90deg, #4a6baf, #2a4b8f)"},
-        dark=True,
-        className="mb-4",
-    ),
-    # Main content
-    dbc.Container([
-        dbc.Row([
-            # Navigation tabs
-            dbc.Col([
-                tabs,
-            ], width=12),
-        ]),
-        dbc.Row([
-            # Filters sidebar
-            dbc.Col([
-                filters,
-            ], width=12, lg=3, className="mb-4"),
-            # Content area
-            dbc.Col([
-                html.Div(id="tab-content"),
-            ], width=12, lg=9),
-        ]),
-    ], fluid=True, style={"backgroundColor": "#F5F7FA"}),
-])
+def share_dataframe(df):
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = to_shared_array(series.cat.codes.to_numpy())
+            columns[col] = pd.Categorical.from_codes(codes, dtype=series.dtype)
+        elif pd.api.types.is_datetime64_dtype(series.dtype):
+            ticks = to_shared_array(series.to_numpy().view('i8'))
+            columns[col] = ticks.view(series.dtype)
+        else:
+            columns[col] = to_shared_array(series.to_numpy())
+    # copy=False keeps one block per column, so the frame is a view over the shared buffers
+    return pd.DataFrame(columns, index=df.index, copy=False)
 
-# App layout with conditional rendering based on authentication
-app.layout = html.Div([
-    dcc.Location(id='url', refresh=False),
-    html.Div(id='page-content'),
-    dcc.Store(id='filtered-data-store'),
-], style={"backgroundColor": "#F5F7FA"})
 
-# Callback to update page content based on URL
-@app.callback(
-    Output('page-content', 'children'),
-    [Input('url', 'pathname')]
-)
-def display_page(pathname):
-    if pathname == '/login':
-        return login_layout
-    else:
-        if current_user.is_authenticated:
-            return dashboard_layout
+@atexit.register
+def release_shared_blocks():
+    # Only the process that created the blocks unlinks them; forked workers just detach
+    while shared_blocks:
+        block = shared_blocks.pop()
+        block.close()
+        if os.getpid() == shared_owner_pid:
+            block.unlink()
+
+
+# Bounded LRU caches for query results, a drop-in for functools.lru_cache that keeps its
+# entries reachable so the memory page (see below) can measure them and a worker over its
+# memory limit can evict them
+caches = {}
+# DASHBOARD_TRACEMALLOC_FRAMES > 0 traces allocations from here on, including the data load
+TRACEMALLOC_FRAMES = int(os.environ.get('DASHBOARD_TRACEMALLOC_FRAMES', '0'))
+if TRACEMALLOC_FRAMES > 0:
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+
+
+def memory_cache(maxsize=128):
+    def decorator(func):
+        entries = OrderedDict()
+        counts = {'hits': 0, 'misses': 0}
+        lock = threading.RLock()
+
+        @wraps(func)
+        def wrapper(*args):
+            with lock:
+                if args in entries:
+                    entries.move_to_end(args)
+                    counts['hits'] += 1
+                    return entries[args]
+            value = func(*args)
+            with lock:
+                counts['misses'] += 1
+                entries[args] = value
+                while maxsize is not None and len(entries) > maxsize:
+                    entries.popitem(last=False)
+            return value
+
+        def cache_clear():
+            with lock:
+                entries.clear()
+
+        def cache_entries():
+            with lock:
+                return list(entries.items())
+
+        wrapper.cache_clear = cache_clear
+        wrapper.cache_entries = cache_entries
+        wrapper.cache_info = lambda: {**counts, 'maxsize': maxsize, 'currsize': len(entries)}
+        caches[func.__name__] = wrapper
+        return wrapper
+    return decorator
+
+
+# Query backend: 'pandas' keeps the dataset in memory, 'sql' pushes filters and aggregations
+# down to an embedded database (DuckDB where installed, SQLite otherwise), 'partitioned'
+# reads only the monthly partitions that can match the filters and 'aggregates' serves the
+# tabs from rollups built in one streaming pass over the CSV
+QUERY_BACKEND = os.environ.get('DASHBOARD_QUERY_BACKEND', 'pandas')
+SQL_ENGINE = 'duckdb' if duckdb is not None else 'sqlite'
+SQL_PATH = os.environ.get('DASHBOARD_SQL_PATH', f"web_server_data.{SQL_ENGINE}")
+CHUNK_ROWS = int(os.environ.get('DASHBOARD_CHUNK_ROWS', '500000'))
+SQL_INDEXED_COLUMNS = ['date', 'continent', 'country', 'job_type', 'interaction_type']
+FILTER_COLUMNS = ['continent', 'country', 'job_type', 'interaction_type']
+DATA_COLUMNS = [
+    'date', 'time', 'country', 'continent', 'interaction_type', 'job_type', 'feature_requested',
+    'age_group', 'gender', 'ip_address', 'request_method', 'timestamp',
+    'month', 'month_name', 'year', 'hour', 'day_of_week'
+]
+sql_local = threading.local()
+
+
+def sql_column(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def sql_connect(path, read_only=True):
+    if SQL_ENGINE == 'duckdb':
+        return duckdb.connect(path, read_only=read_only)
+    if read_only:
+        return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    return sqlite3.connect(path)
+
+
+# One connection per thread; the database file is shared by all workers
+def sql_connection():
+    connection = getattr(sql_local, 'connection', None)
+    if connection is None:
+        connection = sql_connect(SQL_PATH)
+        sql_local.connection = connection
+    return connection
+
+
+def sql_query(sql, params=()):
+    connection = sql_connection()
+    if SQL_ENGINE == 'duckdb':
+        return connection.execute(sql, list(params)).df()
+    return pd.read_sql_query(sql, connection, params=list(params))
+
+
+# Dates are stored as ISO text so range predicates compare the same way in both engines
+def to_sql_frame(chunk, offset):
+    chunk = prepare_data(chunk)
+    chunk.insert(0, 'row_id', np.arange(offset, offset + len(chunk), dtype=np.int64))
+    chunk['date'] = chunk['date'].dt.strftime('%Y-%m-%d')
+    chunk['timestamp'] = chunk['timestamp'].dt.strftime('%Y-%m-%dT%H:%M:%S')
+    return chunk
+
+
+# Stream the CSV into the database chunk by chunk so the raw file never has to fit in memory
+def build_sql_database(path):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    connection = sql_connect(tmp_path, read_only=False)
+    offset = 0
+    for chunk in pd.read_csv(DATA_FILE, chunksize=CHUNK_ROWS):
+        chunk = to_sql_frame(chunk, offset)
+        offset += len(chunk)
+        if SQL_ENGINE == 'duckdb':
+            connection.register('chunk', chunk)
+            connection.execute("CREATE TABLE IF NOT EXISTS interactions AS SELECT * FROM chunk LIMIT 0")
+            connection.execute("INSERT INTO interactions SELECT * FROM chunk")
+            connection.unregister('chunk')
         else:
-            return login_layout
+            chunk.to_sql('interactions', connection, if_exists='append', index=False)
+    for col in SQL_INDEXED_COLUMNS:
+        connection.execute(f"CREATE INDEX idx_interactions_{col} ON interactions ({sql_column(col)})")
+    connection.execute("CREATE INDEX idx_interactions_date_interaction ON interactions (\"date\", \"interaction_type\")")
+    if SQL_ENGINE == 'sqlite':
+        connection.commit()
+        connection.execute("ANALYZE")
+    connection.close()
+    # Concurrent workers may race to build; the atomic rename makes the last one win
+    os.replace(tmp_path, path)
 
-# Login callback
-@app.callback(
-    [Output('url', 'pathname'),
-     Output('login-alert', 'is_open')],
-    [Input('login-button', 'n_clicks')],
-    [State('username', 'value'),
-     State('password', 'value')]
-)
-def login(n_clicks, username, password):
-    if n_clicks is None:
-        raise PreventUpdate
-    user = users.get(username)
-    if user and check_password_hash(user.password_hash, password):
-        login_user(user)
-        return '/', False
-    else:
-        return '/login', True
 
-# Logout callback
-@app.callback(
-    Output('url', 'pathname', allow_duplicate=True),
-    [Input('logout-button', 'n_clicks')],
-    prevent_initial_call=True
-)
-def logout(n_clicks):
-    if n_clicks:
-        logout_user()
-        return '/login'
-    raise PreventUpdate
+def ensure_sql_database():
+    if not os.path.exists(SQL_PATH) or os.path.getmtime(SQL_PATH) < os.path.getmtime(DATA_FILE):
+        build_sql_database(SQL_PATH)
 
-# Callback to update country filter based on continent selection
-@app.callback(
-    Output('country-filter', 'options'),
-    [Input('continent-filter', 'value')]
-)
-def update_country_options(selected_continent):
-    if selected_continent == 'all':
-        return [{'label': 'All Countries', 'value': 'all'}] + \
-               [{'label': country, 'value': country} for country in sorted(df['country'].unique())]
-    else:
-        countries = continent_to_countries.get(selected_continent, [])
-        return [{'label': 'All Countries', 'value': 'all'}] + \
-               [{'label': country, 'value': country} for country in sorted(countries)]
 
-# Filter data callback
-@app.callback(
-    Output('filtered-data-store', 'data'),
-    [Input('apply-filters', 'n_clicks')],
-    [State('start-date', 'date'),
-     State('end-date', 'date'),
-     State('time-granularity-filter', 'value'),
-     State('continent-filter', 'value'),
-     State('country-filter', 'value'),
-     State('job-type-filter', 'value'),
-     State('interaction-type-filter', 'value')]
-)
-def filter_data(n_clicks, start_date, end_date, time_granularity, continent, country, job_type, interaction_type):
-    if n_clicks is None:
-        filtered_df = df.copy()
-    else:
-        filtered_df = df.copy()
-        try:
-            start_date = pd.to_datetime(start_date)
-            end_date = pd.to_datetime(end_date)
-            filtered_df = filtered_df[(filtered_df['date'] >= start_date) & (filtered_df['date'] <= end_date)]
-            if continent != 'all':
-                filtered_df = filtered_df[filtered_df['continent'] == continent]
-            if country != 'all':
-                filtered_df = filtered_df[filtered_df['country'] == country]
-            if job_type != 'all':
-                filtered_df = filtered_df[filtered_df['job_type'] == job_type]
-            if interaction_type != 'all':
-                filtered_df = filtered_df[filtered_df['interaction_type'] == interaction_type]
-        except Exception as e:
-            print(f"Filter error: {str(e)}")
-            filtered_df = df.copy()
-    return filtered_df.to_json(date_format='iso', orient='split')
+# Data Explorer search terms (see search_terms) become predicates too, so a search is
+# answered by the database
+def sql_where(filters, terms=()):
+    clauses = []
+    params = []
+    if filters.get('start_date'):
+        clauses.append('"date" >= ?')
+        params.append(filters['start_date'])
+    if filters.get('end_date'):
+        clauses.append('"date" <= ?')
+        params.append(filters['end_date'])
+    for col in FILTER_COLUMNS:
+        value = filters.get(col, 'all')
+        if value != 'all':
+            clauses.append(f"{sql_column(col)} = ?")
+            params.append(value)
+    for col, values in cross_predicates(filters).items():
+        clauses.append(f"{sql_column(col)} IN ({', '.join('?' for _ in values)})")
+        params.extend(values)
+    for column, target in terms:
+        if column == 'ip_address':
+            clauses.append('"ip_address" BETWEEN ? AND ?')
+            params.extend(int(bound) for bound in target)
+            continue
+        # Substring match on the lowercased value, with LIKE's wildcards taken literally
+        pattern = '%' + target.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        columns = [column] if column else SEARCH_COLUMNS
+        clauses.append('(' + ' OR '.join(f"LOWER({sql_column(col)}) LIKE ? ESCAPE '\\'" for col in columns) + ')')
+        params.extend([pattern] * len(columns))
+    if not clauses:
+        return '', params
+    return ' WHERE ' + ' AND '.join(clauses), params
 
-# Reset filters callback
-@app.callback(
-    [Output('start-date', 'date'),
-     Output('end-date', 'date'),
-     Output('time-granularity-filter', 'value'),
-     Output('continent-filter', 'value'),
-     Output('country-filter', 'value'),
-     Output('job-type-filter', 'value'),
-     Output('interaction-type-filter', 'value'),
-     Output('filtered-data-store', 'data', allow_duplicate=True)],
-    [Input('reset-filters', 'n_clicks')],
-    prevent_initial_call=True
-)
-def reset_filters(n_clicks):
-    if n_clicks is None:
-        raise PreventUpdate
-    return (
-        df['date'].min() if not pd.isna(df['date'].min()) else None,
-        df['date'].max() if not pd.isna(df['date'].max()) else None,
-        'daily',
-        'all',
-        'all',
-        'all',
-        'all',
-        df.to_json(date_format='iso', orient='split')
-    )
 
-# Render tab content callback
-@app.callback(
-    Output('tab-content', 'children'),
-    [Input('tabs', 'active_tab'),
-     Input('filtered-data-store', 'data'),
-     Input('start-date', 'date'),
-     Input('end-date', 'date'),
-     Input('time-granularity-filter', 'value'),
-     Input('continent-filter', 'value'),
-     Input('country-filter', 'value'),
-     Input('job-type-filter', 'value'),
-     Input('interaction-type-filter', 'value')]
-)
-def render_tab_content(active_tab, filtered_data_json, start_date, end_date, time_granularity, continent, country, job_type, interaction_type):
-    if filtered_data_json is None:
-        filtered_df = df.copy()
-    else:
-        filtered_df = pd.read_json(StringIO(filtered_data_json), orient='split')
-        filtered_df['timestamp'] = pd.to_datetime(filtered_df['timestamp'], format='mixed', dayfirst=False, errors='coerce')
-        filtered_df['date'] = pd.to_datetime(filtered_df['date'], errors='coerce')
-        filtered_df['month'] = filtered_df['date'].dt.month
-        filtered_df['month_name'] = filtered_df['date'].dt.strftime('%b') if not filtered_df['date'].isna().all() else ''
-        filtered_df['year'] = filtered_df['date'].dt.year
-        filtered_df['hour'] = filtered_df['timestamp'].dt.hour
-        filtered_df['day_of_week'] = filtered_df['date'].dt.day_name()
-    if filtered_df.empty or pd.isna(filtered_df['timestamp'].max()):
-        last_updated = "No valid timestamp available"
-    else:
-        last_updated = filtered_df['timestamp'].max().strftime('%b %d, %Y %H:%M %p')
-    if filtered_df.empty:
-        return html.Div("No data available for the selected filters", className="text-center mt-4", style={"fontFamily": "Poppins"})
-    if active_tab == 'overview':
-        return render_overview_tab(filtered_df, last_updated)
-    elif active_tab == 'dataset':
-        return render_dataset_tab(filtered_df)
-    elif active_tab == 'geographic':
-        return render_geographic_tab(filtered_df)
-    elif active_tab == 'time':
-        return render_time_tab(filtered_df, time_granularity)
-    elif active_tab == 'job_types':
-        return render_job_types_tab(filtered_df)
-    elif active_tab == 'features':
-        return render_features_tab(filtered_df)
-    elif active_tab == 'demographics':
-        return render_demographics_tab(filtered_df)
-    elif active_tab == 'statistics':
-        return render_statistics_tab(filtered_df)
-    else:
-        return html.Div("Tab content not implemented yet", style={"fontFamily": "Poppins"})
+def parse_sql_dates(result):
+    if 'date' in result.columns:
+        result['date'] = pd.to_datetime(result['date'], errors='coerce')
+    if 'timestamp' in result.columns:
+        result['timestamp'] = pd.to_datetime(result['timestamp'], errors='coerce')
+    return result
 
-# Overview tab content
-def render_overview_tab(filtered_df, last_updated):
-    if filtered_df.empty:
-        return html.Div("No data available for the selected filters", className="text-center mt-4", style={"fontFamily": "Poppins"})
-    total_job_requests = len(filtered_df)
-    demo_requests = len(filtered_df[filtered_df['interaction_type'] == 'Demo Request'])
-    ai_assistant_requests = len(filtered_df[filtered_df['interaction_type'] == 'AI Assistant Request'])
-    event_registrations = len(filtered_df[filtered_df['interaction_type'] == 'Event Request'])
-    job_requests_change = "+15.4%"
-    demo_requests_change = "+8.7%"
-    ai_assistant_change = "+25.3%"
-    event_registrations_change = "-2.7%"
-    time_data = filtered_df.groupby(['year', 'month', 'month_name']).size().reset_index(name='count')
-    time_data = time_data.sort_values(['year', 'month'])
-    job_requests_fig = px.line(
-        time_data,
-        x='month_name',
-        y='count',
-        markers=True,
+
+# Date-partitioned storage: one directory per month holding a .npy file per column
+# (categoricals as codes), plus a manifest with each partition's date range and the
+# filter values it contains so queries can skip partitions without opening them
+PARTITION_DIR = os.environ.get('DASHBOARD_PARTITION_DIR', 'web_server_data.partitions')
+PARTITION_CACHE_SIZE = int(os.environ.get('DASHBOARD_PARTITION_CACHE_SIZE', '24'))
+partition_manifest = None
+
+
+def build_partitions(path):
+    frame = load_data()
+    frame['row_id'] = np.arange(len(frame), dtype=np.int64)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    manifest = {
+        'categories': {
+            col: frame[col].cat.categories.tolist()
+            for col in frame.columns if isinstance(frame[col].dtype, pd.CategoricalDtype)
+        },
+        'partitions': [],
+    }
+    month_keys = frame['date'].dt.strftime('%Y-%m').fillna('undated')
+    for name, part in frame.groupby(month_keys, sort=True):
+        os.makedirs(os.path.join(tmp_path, name))
+        for col in ['row_id'] + DATA_COLUMNS:
+            values = part[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.cat.codes
+            np.save(os.path.join(tmp_path, name, f"{col}.npy"), values.to_numpy())
+        min_date, max_date = part['date'].min(), part['date'].max()
+        manifest['partitions'].append({
+            'name': name,
+            'rows': len(part),
+            'min_date': None if pd.isna(min_date) else min_date.strftime('%Y-%m-%d'),
+            'max_date': None if pd.isna(max_date) else max_date.strftime('%Y-%m-%d'),
+            'values': {col: part[col].dropna().unique().tolist() for col in FILTER_COLUMNS},
+        })
+    with open(os.path.join(tmp_path, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f)
+    swap_directory(tmp_path, path)
+
+
+# Swap a finished build directory into place so readers never see a half-written one
+def swap_directory(tmp_path, path):
+    old_path = f"{path}.{os.getpid()}.old"
+    if os.path.exists(path):
+        os.rename(path, old_path)
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        # Another worker finished its build first; keep theirs
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def ensure_partitions():
+    manifest_path = os.path.join(PARTITION_DIR, 'manifest.json')
+    if not os.path.exists(manifest_path) or os.path.getmtime(manifest_path) < os.path.getmtime(DATA_FILE):
+        build_partitions(PARTITION_DIR)
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+# Partitions whose date range overlaps the filters and that contain every selected value
+def partitions_for(filters):
+    selected = []
+    for part in partition_manifest['partitions']:
+        if filters.get('start_date') and (part['max_date'] is None or part['max_date'] < filters['start_date']):
+            continue
+        if filters.get('end_date') and (part['min_date'] is None or part['min_date'] > filters['end_date']):
+            continue
+        if any(filters.get(col, 'all') != 'all' and filters[col] not in part['values'][col] for col in FILTER_COLUMNS):
+            continue
+        selected.append(part['name'])
+    return selected
+
+
+@memory_cache(maxsize=PARTITION_CACHE_SIZE)
+def load_partition(name):
+    columns = {}
+    for col in ['row_id'] + DATA_COLUMNS:
+        values = np.load(os.path.join(PARTITION_DIR, name, f"{col}.npy"), mmap_mode='r')
+        if col in partition_manifest['categories']:
+            values = pd.Categorical.from_codes(values, categories=partition_manifest['categories'][col])
+        columns[col] = values
+    frame = pd.DataFrame(columns, copy=False).set_index('row_id')
+    frame.index.name = None
+    return frame
+
+
+# The given columns of several partitions as one frame, concatenated column by column so
+# the other columns are never read; a single partition is returned as loaded
+def load_partitions(names, columns):
+    if not names:
+        return load_partition(partition_manifest['partitions'][0]['name']).iloc[:0]
+    if len(names) == 1:
+        return load_partition(names[0])
+    parts = [load_partition(name) for name in names]
+    data = {}
+    for col in columns:
+        arrays = [part[col].array for part in parts]
+        if col in partition_manifest['categories']:
+            data[col] = pd.Categorical.from_codes(np.concatenate([a.codes for a in arrays]), dtype=arrays[0].dtype)
+        else:
+            data[col] = np.concatenate([np.asarray(a) for a in arrays])
+    return pd.DataFrame(data, index=np.concatenate([part.index.to_numpy() for part in parts]), copy=False)
+
+
+# Out-of-core aggregates: a single streaming pass over the CSV, one bounded chunk at a time,
+# builds count rollups keyed by the filter dimensions. Memory grows with the number of
+# distinct keys, never with the number of rows, and the tabs are served from the rollups
+AGGREGATE_DIR = os.environ.get('DASHBOARD_AGGREGATE_DIR', 'web_server_data.aggregates')
+AGGREGATE_KEYS = ['date'] + FILTER_COLUMNS
+AGGREGATE_ROLLUPS = {
+    'base': AGGREGATE_KEYS,
+    'features': AGGREGATE_KEYS + ['feature_requested'],
+    'hours': AGGREGATE_KEYS + ['hour', 'feature_requested'],
+    'demographics': AGGREGATE_KEYS + ['age_group', 'gender'],
+    # Per-visitor feature counts for the co-occurrence heatmap, per day so the date range
+    # applies; the rollup grows with the number of distinct visitors on each day
+    'visitors': AGGREGATE_KEYS + ['ip_address', 'feature_requested'],
+}
+DATE_PARTS = {
+    'year': lambda dates: dates.dt.year,
+    'month': lambda dates: dates.dt.month,
+    'month_name': lambda dates: dates.dt.strftime('%b'),
+    'day_of_week': lambda dates: dates.dt.day_name(),
+}
+aggregates = None
+
+
+def merge_rollup(total, part, keys):
+    if total is None:
+        return part
+    combined = pd.concat([total, part], ignore_index=True)
+    return combined.groupby(keys, dropna=False, observed=True).agg(
+        count=('count', 'sum'), latest=('latest', 'max')
+    ).reset_index()
+
+
+def build_aggregates(path):
+    totals = dict.fromkeys(AGGREGATE_ROLLUPS)
+    for chunk in pd.read_csv(DATA_FILE, chunksize=CHUNK_ROWS):
+        chunk = prepare_data(chunk)
+        for name, keys in AGGREGATE_ROLLUPS.items():
+            part = chunk.groupby(keys, dropna=False).agg(
+                count=('timestamp', 'size'), latest=('timestamp', 'max')
+            ).reset_index()
+            totals[name] = merge_rollup(totals[name], part, keys)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    for name, frame in totals.items():
+        encode_data(frame).to_pickle(os.path.join(tmp_path, f"{name}.pkl"))
+    swap_directory(tmp_path, path)
+
+
+def ensure_aggregates():
+    paths = {name: os.path.join(AGGREGATE_DIR, f"{name}.pkl") for name in AGGREGATE_ROLLUPS}
+    if any(not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(DATA_FILE) for path in paths.values()):
+        build_aggregates(AGGREGATE_DIR)
+    return {name: pd.read_pickle(path) for name, path in paths.items()}
+
+
+# Smallest rollup that can answer a grouping; calendar parts are derived from date
+def aggregate_rollup(dims):
+    needed = {'date' if col in DATE_PARTS else col for col in dims}
+    for name, keys in AGGREGATE_ROLLUPS.items():
+        if needed <= set(keys):
+            return aggregates[name]
+    raise ValueError(f"No aggregate rollup covers {dims}")
+
+
+# Counts keyed by date and the given columns from one scan of the CSV, for cross-filters on
+# columns no rollup is keyed by
+@memory_cache(maxsize=8)
+def scanned_rollup(key, keys):
+    filters = json.loads(key)
+    keys = ['date'] + [col for col in dict.fromkeys(keys) if col != 'date' and col not in DATE_PARTS]
+    total = None
+    for chunk in pd.read_csv(DATA_FILE, chunksize=CHUNK_ROWS):
+        chunk = prepare_data(chunk)
+        part = chunk[filter_mask(chunk, filters)].groupby(keys, dropna=False).agg(
+            count=('timestamp', 'size'), latest=('timestamp', 'max')
+        ).reset_index()
+        total = merge_rollup(total, part, keys)
+    return encode_data(total)
+
+
+def aggregate_view(filters, dims):
+    cross = list(cross_predicates(filters))
+    try:
+        rollup = aggregate_rollup(list(dims) + cross)
+    except ValueError:
+        if not cross:
+            raise
+        rollup = scanned_rollup(filters_key(filters), tuple(dict.fromkeys(AGGREGATE_KEYS + list(dims) + cross)))
+    for col in cross:
+        if col in DATE_PARTS:
+            rollup = rollup.assign(**{col: DATE_PARTS[col](rollup['date'])})
+    view = rollup[filter_mask(rollup, filters)]
+    for col in dims:
+        if col in DATE_PARTS:
+            view = view.assign(**{col: DATE_PARTS[col](view['date'])})
+    return view
+
+
+# Raw rows are only needed for previews, downloads and search pages; scan the CSV for them
+# chunk by chunk. The first skip matches are dropped as the scan passes them
+def scan_rows(filters, columns, limit=None, skip=0):
+    found = []
+    matched = 0
+    offset = 0
+    for chunk in pd.read_csv(DATA_FILE, chunksize=CHUNK_ROWS):
+        chunk = prepare_data(chunk)
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        part = chunk.loc[filter_mask(chunk, filters), columns]
+        if skip:
+            dropped = min(skip, len(part))
+            part = part.iloc[dropped:]
+            skip -= dropped
+        found.append(part)
+        matched += len(part)
+        if limit is not None and matched >= limit:
+            break
+    if not found:
+        return pd.DataFrame(columns=columns)
+    result = pd.concat(found)
+    return result if limit is None else result.head(limit)
+
+
+# Sketches: compact, mergeable summaries built in one streaming pass at ingest and kept in
+# a single file next to the CSV. Each is keyed by day and the filter columns, so any filter
+# selection is answered by merging the matching keys instead of rescanning rows
+SKETCH_PATH = os.environ.get('DASHBOARD_SKETCH_PATH', 'web_server_data.sketches.pkl')
+SKETCH_KEYS = ['date'] + FILTER_COLUMNS
+sketches = None
+
+# HyperLogLog over ip_address: 2**p one-byte registers per key, so every sketch has the same
+# fixed size and a relative standard error of about 1.04 / sqrt(2**p) (3.3% at p=10)
+HLL_PRECISION = int(os.environ.get('DASHBOARD_HLL_PRECISION', '10'))
+HLL_REGISTERS = 1 << HLL_PRECISION
+HLL_ERROR = 1.04 / np.sqrt(HLL_REGISTERS)
+
+
+def hash_values(values):
+    # Hash each distinct value once; missing values hash to None
+    codes, uniques = pd.factorize(values)
+    hashes = pd.util.hash_array(np.asarray(uniques, dtype=object))
+    return hashes[codes], codes >= 0
+
+
+def hll_positions(values):
+    hashes, valid = hash_values(values)
+    shift = np.uint64(64 - HLL_PRECISION)
+    index = (hashes >> shift).astype(np.intp)
+    rest = hashes & np.uint64((1 << (64 - HLL_PRECISION)) - 1)
+    # Rank = position of the leftmost one bit in the remaining 64 - p bits
+    with np.errstate(divide='ignore'):
+        rank = (64 - HLL_PRECISION) - np.floor(np.log2(rest.astype(np.float64)))
+    rank = np.where(rest == 0, 64 - HLL_PRECISION + 1, np.clip(rank, 1, None)).astype(np.uint8)
+    return index[valid], rank[valid], valid
+
+
+def hll_estimate(registers):
+    m = registers.shape[1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.exp2(-registers.astype(np.float64)).sum(axis=1)
+    zeros = np.count_nonzero(registers == 0, axis=1)
+    # Linear counting is more accurate while many registers are still empty
+    small = (estimate <= 2.5 * m) & (zeros > 0)
+    estimate[small] = m * np.log(m / zeros[small])
+    return estimate
+
+
+# Max-merge rows of a register matrix that share a label
+def merge_registers(registers, labels):
+    codes, uniques = pd.factorize(labels, sort=True)
+    valid = codes >= 0
+    codes, registers = codes[valid], registers[valid]
+    order = np.argsort(codes, kind='stable')
+    starts = np.flatnonzero(np.r_[True, np.diff(codes[order]) != 0]) if len(codes) else np.array([], dtype=np.intp)
+    if not len(starts):
+        return uniques, np.zeros((0, registers.shape[1]), dtype=np.uint8)
+    return uniques, np.maximum.reduceat(registers[order], starts, axis=0)
+
+
+def hll_sketch(chunk):
+    group = chunk.groupby(SKETCH_KEYS, dropna=False, sort=False).ngroup().to_numpy()
+    first = chunk.groupby(SKETCH_KEYS, dropna=False, sort=False).head(1)
+    keys = first[SKETCH_KEYS].reset_index(drop=True)
+    registers = np.zeros((len(keys), HLL_REGISTERS), dtype=np.uint8)
+    known = (chunk['ip_address'] != INVALID_IP).to_numpy()
+    index, rank, valid = hll_positions(chunk['ip_address'][known])
+    np.maximum.at(registers, (group[known][valid], index), rank)
+    return keys, registers
+
+
+def merge_hll_sketches(parts):
+    keys = pd.concat([part[0] for part in parts], ignore_index=True)
+    registers = np.concatenate([part[1] for part in parts])
+    group = keys.groupby(SKETCH_KEYS, dropna=False, sort=False).ngroup().to_numpy()
+    _, merged = merge_registers(registers, group)
+    first = keys.groupby(SKETCH_KEYS, dropna=False, sort=False).head(1).reset_index(drop=True)
+    return first, merged
+
+
+# Heavy hitters: a Misra-Gries summary (the mergeable counterpart of Space-Saving) keeps at
+# most HH_CAPACITY counters per key. Summaries merge by adding counters and subtracting the
+# (k+1)-th largest, so a merged count undercounts by at most N / (k + 1) for N merged rows
+HH_CAPACITY = int(os.environ.get('DASHBOARD_HH_CAPACITY', '64'))
+HH_COLUMNS = ['country', 'ip_address']
+
+
+# A summarized column is the item, not part of the key, when it is also a filter column
+def heavy_hitter_keys(column):
+    return [col for col in SKETCH_KEYS if col != column]
+
+
+def truncate_summaries(counts, column):
+    counts = counts.sort_values('count', ascending=False, kind='stable')
+    keys = [counts[col] for col in heavy_hitter_keys(column)]
+    rank = counts.groupby(keys, dropna=False, sort=False).cumcount()
+    kth = counts['count'].where(rank == HH_CAPACITY, 0)
+    cut = kth.groupby(keys, dropna=False, sort=False).transform('max')
+    counts['count'] -= cut
+    return counts[counts['count'] > 0]
+
+
+def heavy_hitter_summary(chunk, column):
+    chunk = chunk[chunk[column].notna() & (chunk[column] != INVALID_IP)]
+    counts = chunk.groupby(heavy_hitter_keys(column) + [column], dropna=False).size().reset_index(name='count')
+    return truncate_summaries(counts, column)
+
+
+def merge_heavy_hitters(parts, column):
+    combined = pd.concat(parts, ignore_index=True)
+    counts = combined.groupby(heavy_hitter_keys(column) + [column], dropna=False, observed=True)['count'].sum().reset_index()
+    return truncate_summaries(counts, column)
+
+
+# Quantile sketches: DDSketch-style histograms of per-feature daily and hourly request counts,
+# one per day. Counts fall into logarithmic buckets so any quantile read from a merged
+# histogram is within QUANTILE_ACCURACY relative error, and merging is adding bucket counts
+QUANTILE_ACCURACY = float(os.environ.get('DASHBOARD_QUANTILE_ACCURACY', '0.01'))
+QUANTILE_GAMMA = (1 + QUANTILE_ACCURACY) / (1 - QUANTILE_ACCURACY)
+QUANTILE_LEVELS = [0.0, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0]
+
+
+def quantile_bins(values):
+    bins = np.full(len(values), -1, dtype=np.int32)  # bucket -1 holds zero counts
+    positive = values > 0
+    bins[positive] = np.ceil(np.log(values[positive]) / np.log(QUANTILE_GAMMA)).astype(np.int32)
+    return bins
+
+
+def bin_values(bins):
+    return np.where(bins < 0, 0.0, 2 * QUANTILE_GAMMA ** bins.astype(np.float64) / (QUANTILE_GAMMA + 1))
+
+
+# Sparse histograms (date, feature, kind, bin, n) from exact hourly counts; hours and days
+# without requests count as zeros so the distributions are not biased towards busy periods.
+# The days run from start to end (by default the first and last day with requests), so days
+# without a single request are on the axis too
+def quantile_sketch(hourly, start=None, end=None):
+    hourly = hourly.dropna(subset=['date', 'hour', 'feature_requested'])
+    start = hourly['date'].min() if start is None else start
+    end = hourly['date'].max() if end is None else end
+    dates = pd.date_range(start, end) if len(hourly) else pd.DatetimeIndex([])
+    grid = pd.MultiIndex.from_product(
+        [dates, range(24), hourly['feature_requested'].unique()],
+        names=['date', 'hour', 'feature_requested']
+    )
+    counts = hourly.groupby(['date', 'hour', 'feature_requested'], observed=True)['count'].sum()
+    counts = counts.reindex(grid, fill_value=0).reset_index()
+    daily = counts.groupby(['date', 'feature_requested'])['count'].sum().reset_index()
+    parts = []
+    for kind, values in (('daily', daily), ('hourly', counts)):
+        values = values.assign(kind=kind, bin=quantile_bins(values['count'].to_numpy()))
+        parts.append(values.groupby(['date', 'feature_requested', 'kind', 'bin']).size().reset_index(name='n'))
+    return pd.concat(parts, ignore_index=True)
+
+
+def hourly_feature_counts(chunk):
+    return chunk.groupby(['date', 'hour', 'feature_requested']).size().reset_index(name='count')
+
+
+def build_sketches(path):
+    visitors = None
+    heavy_hitters = dict.fromkeys(HH_COLUMNS)
+    # Exact (day, hour, feature) counts; a day can span chunks, so histograms are built at the end
+    hourly = None
+    for chunk in pd.read_csv(DATA_FILE, chunksize=CHUNK_ROWS):
+        chunk = prepare_data(chunk)
+        part = hourly_feature_counts(chunk)
+        if hourly is not None:
+            part = pd.concat([hourly, part]).groupby(['date', 'hour', 'feature_requested'])['count'].sum().reset_index()
+        hourly = part
+        part = hll_sketch(chunk)
+        visitors = part if visitors is None else merge_hll_sketches([visitors, part])
+        for column in HH_COLUMNS:
+            part = heavy_hitter_summary(chunk, column)
+            if heavy_hitters[column] is not None:
+                part = merge_heavy_hitters([heavy_hitters[column], part], column)
+            heavy_hitters[column] = part
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    pd.to_pickle({
+        'visitors': (encode_data(visitors[0]), visitors[1]),
+        'heavy_hitters': {column: encode_data(summary) for column, summary in heavy_hitters.items()},
+        'quantiles': encode_data(quantile_sketch(hourly)),
+    }, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def ensure_sketches():
+    if not os.path.exists(SKETCH_PATH) or os.path.getmtime(SKETCH_PATH) < os.path.getmtime(DATA_FILE):
+        build_sketches(SKETCH_PATH)
+    return pd.read_pickle(SKETCH_PATH)
+
+
+# Time bucket labels matching the feature trend chart for each granularity
+def time_buckets(dates, time_granularity):
+    if time_granularity == 'weekly':
+        return dates.dt.to_period('W-SUN').dt.end_time.dt.normalize()
+    elif time_granularity == 'monthly':
+        return dates.dt.strftime('%Y-%m')
+    elif time_granularity == 'yearly':
+        return dates.dt.year
+    return dates
+
+
+def unique_visitors(filters):
+    keys, registers = sketches['visitors']
+    if not sketch_covers(keys, filters):
+        return count_by(exact_filters(filters), ['date', 'ip_address'])['ip_address'].nunique()
+    mask = filter_mask(keys, filters)
+    if not mask.any():
+        return 0
+    return int(round(hll_estimate(registers[mask].max(axis=0, keepdims=True))[0]))
+
+
+def unique_visitors_over_time(filters, time_granularity):
+    keys, registers = sketches['visitors']
+    if not sketch_covers(keys, filters):
+        visits = count_by(exact_filters(filters), ['date', 'ip_address'])
+        visits['date'] = time_buckets(pd.to_datetime(visits['date']), time_granularity)
+        return visits.groupby('date')['ip_address'].nunique().rename('visitors').reset_index()
+    mask = filter_mask(keys, filters) & keys['date'].notna().to_numpy()
+    labels, merged = merge_registers(registers[mask], time_buckets(keys['date'][mask], time_granularity).to_numpy())
+    return pd.DataFrame({'date': labels, 'visitors': np.round(hll_estimate(merged)).astype(np.int64)})
+
+
+# Top-n values of a column for any filter selection, from the merged summaries
+def top_items(filters, column, n=10):
+    summary = sketches['heavy_hitters'][column]
+    if sketch_covers(summary, filters):
+        selected = summary[filter_mask(summary, filters)]
+        top = selected.groupby(column, observed=True)['count'].sum()
+    else:
+        top = count_by(filters, [column]).set_index(column)['count']
+    top = top.sort_values(ascending=False, kind='stable').head(n)
+    top = top.reset_index()
+    top[column] = top[column].astype(object)
+    return top
+
+
+def heavy_hitter_error(filters):
+    if not sketch_covers(sketches['heavy_hitters']['ip_address'], filters):
+        return 0
+    return row_count(filters) // (HH_CAPACITY + 1)
+
+
+# Daily and hourly request-count quantiles per feature. Date-only selections merge the
+# prebuilt per-day sketches; other filters change every count, so their sketch is built
+# from the backend's (day, hour, feature) aggregate instead, over every day of the selected
+# range that has data, so days without matching requests count as zeros
+def feature_quantiles(filters):
+    if all(filters.get(col, 'all') == 'all' for col in FILTER_COLUMNS) and not cross_predicates(filters):
+        sketch = sketches['quantiles']
+        sketch = sketch[filter_mask(sketch, filters)]
+    else:
+        start = max(pd.Timestamp(filters['start_date']), data_start) if filters.get('start_date') else data_start
+        end = min(pd.Timestamp(filters['end_date']), data_end) if filters.get('end_date') else data_end
+        hourly = count_by(exact_filters(filters), ['date', 'hour', 'feature_requested'])
+        sketch = quantile_sketch(hourly, start, end)
+    merged = sketch.groupby(['feature_requested', 'kind', 'bin'], observed=True)['n'].sum().reset_index()
+    merged = merged.sort_values(['feature_requested', 'kind', 'bin'])
+    result = []
+    for (feature, kind), group in merged.groupby(['feature_requested', 'kind'], observed=True, sort=True):
+        ranks = group['n'].cumsum().to_numpy()
+        total = ranks[-1]
+        positions = np.searchsorted(ranks, np.array(QUANTILE_LEVELS) * (total - 1), side='right')
+        values = bin_values(group['bin'].to_numpy()[positions])
+        result.append({'feature_requested': feature, 'kind': kind, **dict(zip(QUANTILE_LEVELS, values))})
+    return pd.DataFrame(result, columns=['feature_requested', 'kind'] + QUANTILE_LEVELS)
+
+
+def feature_stats_table(filters):
+    table = count_by(filters, ['feature_requested'])
+    quantiles = feature_quantiles(filters).set_index(['kind', 'feature_requested'])
+    for kind in ['daily', 'hourly']:
+        for level in [0.5, 0.9, 0.99]:
+            column = f"{kind.capitalize()} p{int(level * 100)}"
+            table[column] = table['feature_requested'].map(quantiles.loc[kind][level] if kind in quantiles.index else {}).round(1)
+    table = table.rename(columns={'feature_requested': 'Feature', 'count': 'Total Requests'})
+    return table.drop(columns='variance', errors='ignore')
+
+
+# Stratified sample for the fast (approximate) mode, drawn in one streaming pass: every
+# (day, country, interaction type) stratum keeps SAMPLE_RATE of its rows but never fewer than
+# SAMPLE_MIN_ROWS. Each row gets a fixed pseudo-random priority from its row number, and a
+# stratum keeps the rows below the rate plus its SAMPLE_MIN_ROWS lowest priorities, so chunks
+# merge by pruning their union. Within a stratum the kept rows are a simple random sample
+SAMPLE_PATH = os.environ.get('DASHBOARD_SAMPLE_PATH', 'web_server_data.sample.pkl')
+SAMPLE_RATE = float(os.environ.get('DASHBOARD_SAMPLE_RATE', '0.02'))
+SAMPLE_MIN_ROWS = int(os.environ.get('DASHBOARD_SAMPLE_MIN_ROWS', '5'))
+SAMPLE_STRATA = ['date', 'country', 'interaction_type']
+# Confidence bands are this many standard errors either side (95%)
+SAMPLE_Z = 1.96
+sample = None
+
+
+def prune_sample(candidates):
+    ranks = candidates.groupby(SAMPLE_STRATA, dropna=False)['priority'].rank(method='first')
+    return candidates[(candidates['priority'] < SAMPLE_RATE) | (ranks <= SAMPLE_MIN_ROWS)]
+
+
+def build_sample(path):
+    kept = None
+    sizes = None
+    offset = 0
+    for chunk in pd.read_csv(DATA_FILE, chunksize=CHUNK_ROWS):
+        chunk = prepare_data(chunk)
+        hashes = pd.util.hash_array(np.arange(offset, offset + len(chunk), dtype=np.uint64))
+        chunk['priority'] = hashes / 2.0 ** 64
+        offset += len(chunk)
+        part = chunk.groupby(SAMPLE_STRATA, dropna=False).size().reset_index(name='rows')
+        if sizes is not None:
+            part = pd.concat([sizes, part]).groupby(SAMPLE_STRATA, dropna=False)['rows'].sum().reset_index()
+        sizes = part
+        chunk = prune_sample(chunk)
+        kept = chunk if kept is None else prune_sample(pd.concat([kept, chunk], ignore_index=True))
+    counts = kept.groupby(SAMPLE_STRATA, dropna=False).size().reset_index(name='sampled')
+    strata = sizes.merge(counts, on=SAMPLE_STRATA, how='left')
+    strata = strata[strata['sampled'].notna()].reset_index(drop=True)
+    kept = kept.merge(strata[SAMPLE_STRATA].assign(stratum=np.arange(len(strata))), on=SAMPLE_STRATA, how='left')
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    pd.to_pickle({
+        'rows': encode_data(kept.drop(columns='priority')),
+        'strata_rows': strata['rows'].to_numpy(dtype=np.float64),
+        'strata_sampled': strata['sampled'].to_numpy(dtype=np.float64),
+    }, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def ensure_sample():
+    if not os.path.exists(SAMPLE_PATH) or os.path.getmtime(SAMPLE_PATH) < os.path.getmtime(DATA_FILE):
+        build_sample(SAMPLE_PATH)
+    return pd.read_pickle(SAMPLE_PATH)
+
+
+# The sample is only consulted when the filters ask for it; distinct counts, distributions and
+# downloads always use exact_filters
+def exact_filters(filters):
+    if not (filters or {}).get('sample'):
+        return filters
+    return {key: value for key, value in filters.items() if key != 'sample'}
+
+
+@memory_cache(maxsize=8)
+def sample_view_for_key(key):
+    frame = sample['rows']
+    return frame[filter_mask(frame, json.loads(key))]
+
+
+# A group's count in stratum h is estimated as N_h * p with p = y / n_h, the share of the n_h
+# sampled rows that match, with variance N_h^2 (1 - n_h / N_h) p (1 - p) / (n_h - 1). Strata
+# are sampled independently, so estimates and variances add up over them
+def sampled_counts(filters, dims):
+    view = sample_view_for_key(filters_key(filters))
+    matched = view.groupby(list(dims) + ['stratum'], observed=True).size().reset_index(name='matched')
+    strata = matched['stratum'].to_numpy()
+    population = sample['strata_rows'][strata]
+    sampled = sample['strata_sampled'][strata]
+    share = matched['matched'].to_numpy() / sampled
+    spread = np.divide(share * (1 - share), sampled - 1, out=np.zeros(len(share)), where=sampled > 1)
+    result = matched[list(dims)].assign(
+        count=population * share, variance=population ** 2 * (1 - sampled / population) * spread
+    )
+    result = result.groupby(list(dims), observed=True)[['count', 'variance']].sum().reset_index()
+    result['count'] = np.rint(result['count']).astype(np.int64)
+    return result
+
+
+def sampled_row_count(filters):
+    view = sample_view_for_key(filters_key(filters))
+    strata = view['stratum'].to_numpy()
+    return int(round((sample['strata_rows'][strata] / sample['strata_sampled'][strata]).sum()))
+
+
+# Sessions: a visit is a run of one address's interactions with no gap longer than
+# SESSION_GAP. The table keeps one row per session with the start date and location of its
+# first interaction, for filtering, and a bitmask of the features requested during it
+SESSION_PATH = os.environ.get('DASHBOARD_SESSION_PATH', 'web_server_data.sessions.pkl')
+SESSION_GAP = pd.Timedelta(minutes=int(os.environ.get('DASHBOARD_SESSION_GAP_MINUTES', '30')))
+SESSION_KEYS = ['continent', 'country']
+SESSION_MAX_FEATURES = 64
+sessions = None
+sessions_lock = threading.Lock()
+
+
+# One single-interaction span per row; features beyond the first 64 are not tracked
+def session_spans(chunk, features):
+    chunk = chunk[chunk['timestamp'].notna() & (chunk['ip_address'] != INVALID_IP)]
+    for feature in chunk['feature_requested'].dropna().unique():
+        if feature not in features and len(features) < SESSION_MAX_FEATURES:
+            features.append(feature)
+    codes = pd.Categorical(chunk['feature_requested'], categories=features).codes
+    bits = np.left_shift(np.uint64(1), np.maximum(codes, 0).astype(np.uint64))
+    spans = pd.DataFrame({
+        'ip_address': chunk['ip_address'].to_numpy(),
+        'start': chunk['timestamp'].to_numpy(),
+        'end': chunk['timestamp'].to_numpy(),
+        'interactions': np.ones(len(chunk), dtype=np.int64),
+        'features': np.where(codes >= 0, bits, np.uint64(0)),
+    })
+    for col in SESSION_KEYS:
+        spans[col] = chunk[col].to_numpy()
+    return spans
+
+
+# Merge spans (single interactions or earlier sessions) into sessions: sort by address and
+# start once, then a span opens a new session when it starts more than SESSION_GAP after
+# the latest end seen so far for that address
+def merge_sessions(spans):
+    if spans.empty:
+        return spans.assign(date=pd.Series(dtype='datetime64[ns]'))
+    order = np.lexsort((spans['start'].to_numpy(), spans['ip_address'].to_numpy()))
+    spans = spans.iloc[order].reset_index(drop=True)
+    ips = spans['ip_address'].to_numpy()
+    starts = spans['start'].to_numpy()
+    reach = spans.groupby('ip_address', sort=False)['end'].cummax().to_numpy()
+    opens = np.ones(len(spans), dtype=bool)
+    opens[1:] = (ips[1:] != ips[:-1]) | (starts[1:] - reach[:-1] > SESSION_GAP.to_timedelta64())
+    first = np.flatnonzero(opens)
+    merged = pd.DataFrame({
+        'ip_address': ips[first],
+        'start': starts[first],
+        'end': np.maximum.reduceat(spans['end'].to_numpy(), first),
+        'interactions': np.add.reduceat(spans['interactions'].to_numpy(), first),
+        'features': np.bitwise_or.reduceat(spans['features'].to_numpy(), first),
+    })
+    for col in SESSION_KEYS:
+        merged[col] = spans[col].to_numpy()[first]
+    merged['date'] = merged['start'].dt.normalize()
+    return merged
+
+
+def file_digest(path, size):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        while size > 0:
+            block = f.read(min(size, 1 << 20))
+            if not block:
+                break
+            digest.update(block)
+            size -= len(block)
+    return digest.hexdigest()
+
+
+# Sessionize the CSV rows after state['rows'] (all rows without a state) and merge them with
+# the saved sessions. Re-merging only joins the sessions the new rows bridge, so appending
+# gives the same table as sessionizing everything again
+def build_sessions(path, state=None):
+    features = list(state['features']) if state else []
+    rows = state['rows'] if state else 0
+    parts = [state['sessions'].drop(columns='date')] if state else []
+    mtime, size = os.path.getmtime(DATA_FILE), os.path.getsize(DATA_FILE)
+    for chunk in pd.read_csv(DATA_FILE, chunksize=CHUNK_ROWS, skiprows=range(1, rows + 1)):
+        rows += len(chunk)
+        parts.append(merge_sessions(session_spans(prepare_data(chunk), features)).drop(columns='date'))
+    table = merge_sessions(pd.concat(parts, ignore_index=True))
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    pd.to_pickle({
+        'rows': rows,
+        'mtime': mtime,
+        'size': size,
+        'digest': file_digest(DATA_FILE, size),
+        'features': features,
+        'sessions': encode_data(table),
+    }, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def ensure_sessions():
+    state = pd.read_pickle(SESSION_PATH) if os.path.exists(SESSION_PATH) else None
+    if state is not None and state['mtime'] == os.path.getmtime(DATA_FILE):
+        return state
+    # An unchanged prefix means rows were only appended; anything else rebuilds from scratch
+    if state is not None and (os.path.getsize(DATA_FILE) < state['size']
+                              or file_digest(DATA_FILE, state['size']) != state['digest']):
+        state = None
+    build_sessions(SESSION_PATH, state)
+    return pd.read_pickle(SESSION_PATH)
+
+
+# Sessions table, picking up rows appended to the CSV since it was last loaded
+def session_table():
+    global sessions
+    with sessions_lock:
+        if sessions is None or sessions['mtime'] != os.path.getmtime(DATA_FILE):
+            sessions = ensure_sessions()
+    return sessions
+
+
+# Sessions filter by start date and location only; job type, interaction type and the other
+# cross-filter columns vary within a visit
+def session_view(filters):
+    table = session_table()['sessions']
+    location = without_cross(
+        {**filters, 'job_type': 'all', 'interaction_type': 'all'},
+        [col for col in cross_predicates(filters) if col not in SESSION_KEYS]
+    )
+    return table[filter_mask(table, location)]
+
+
+def session_summary(filters):
+    view = session_view(filters)
+    durations = (view['end'] - view['start']).dt.total_seconds() / 60
+    return {
+        'sessions': len(view),
+        'interactions': int(view['interactions'].sum()),
+        'mean_interactions': view['interactions'].mean() if len(view) else 0.0,
+        'median_minutes': durations.median() if len(view) else 0.0,
+        'bounce_rate': (view['interactions'] == 1).mean() if len(view) else 0.0,
+    }
+
+
+def session_lengths(filters, cap=10):
+    counts = np.bincount(np.minimum(session_view(filters)['interactions'].to_numpy(), cap), minlength=cap + 1)[1:]
+    labels = [str(n) for n in range(1, cap)] + [f"{cap}+"]
+    return pd.DataFrame({'interactions': labels, 'sessions': counts})
+
+
+def session_durations(filters):
+    view = session_view(filters)
+    return pd.DataFrame({'minutes': (view['end'] - view['start']).dt.total_seconds().to_numpy() / 60})
+
+
+# Sessions requesting both features of each pair; the diagonal counts sessions per feature
+def session_feature_pairs(filters):
+    features = session_table()['features']
+    masks = session_view(filters)['features'].to_numpy()
+    present = np.stack([(masks >> np.uint64(i)) & np.uint64(1) for i in range(len(features))], axis=1) \
+        if len(features) else np.zeros((len(masks), 0), dtype=np.uint64)
+    present = present.astype(np.int64)
+    return pd.DataFrame(present.T @ present, index=features, columns=features)
+
+
+# Funnel: visitors entering with an event or AI assistant request, then a demo request, then
+# a job placement, each step after the previous one and within the window of the entry.
+# Events are integer-encoded as visitor * span + seconds so one sorted array per stage
+# answers "the visitor's next step at or after t" with a single searchsorted
+FUNNEL_STAGES = [
+    ('Event / AI Assistant Request', ['Event Request', 'AI Assistant Request']),
+    ('Demo Request', ['Demo Request']),
+    ('Job Placement', ['Job Placement']),
+]
+FUNNEL_WINDOW_DAYS = int(os.environ.get('DASHBOARD_FUNNEL_WINDOW_DAYS', '30'))
+FUNNEL_BREAKDOWNS = {'country': 'Country', 'job_type': 'Job Type'}
+
+
+# The funnel spans interaction types, so only the other filters restrict its events
+def funnel_events(filters):
+    events = raw_rows(
+        without_cross({**filters, 'interaction_type': 'all'}, ['interaction_type']),
+        ['ip_address', 'timestamp', 'interaction_type'] + list(FUNNEL_BREAKDOWNS)
+    )
+    events = events[events['timestamp'].notna() & (events['ip_address'] != INVALID_IP)]
+    stage = np.full(len(events), -1, dtype=np.int8)
+    for step, (_, interaction_types) in enumerate(FUNNEL_STAGES):
+        stage[events['interaction_type'].isin(interaction_types).to_numpy()] = step
+    return events, stage
+
+
+# Entry event (row position) per visitor and the last stage each visitor reached
+def funnel_progress(visitors, seconds, stage, window_seconds):
+    entry = np.flatnonzero(stage == 0)
+    if len(entry) == 0:
+        return entry, np.zeros(0, dtype=np.int8)
+    offset = seconds.min()
+    span = int(seconds.max() - offset) + 1
+    keys = visitors * span + (seconds - offset)
+    # A visitor enters the funnel at their earliest entry event
+    entry = entry[np.argsort(keys[entry], kind='stable')]
+    entry = entry[np.r_[True, visitors[entry][1:] != visitors[entry][:-1]]]
+    owner, start = visitors[entry], keys[entry]
+    current = start.copy()
+    reached = np.zeros(len(entry), dtype=np.int8)
+    alive = np.ones(len(entry), dtype=bool)
+    for step in range(1, len(FUNNEL_STAGES)):
+        targets = np.sort(keys[stage == step])
+        if len(targets) == 0:
+            break
+        position = np.searchsorted(targets, current, side='left')
+        found = targets[np.minimum(position, len(targets) - 1)]
+        alive &= (position < len(targets)) & (found // span == owner) & (found - start <= window_seconds)
+        current = np.where(alive, found, current)
+        reached[alive] = step
+    return entry, reached
+
+
+@memory_cache(maxsize=16)
+def funnel_for_key(key, window_days, breakdown):
+    events, stage = funnel_events(json.loads(key))
+    visitors = pd.factorize(events['ip_address'])[0].astype(np.int64)
+    seconds = events['timestamp'].to_numpy().view('i8') // 1_000_000_000
+    entry, reached = funnel_progress(visitors, seconds, stage, window_days * 86400)
+    groups = events[breakdown].to_numpy()[entry] if breakdown else np.full(len(entry), 'All')
+    table = pd.DataFrame({
+        label: pd.Series(reached >= step).groupby(groups).sum()
+        for step, (label, _) in enumerate(FUNNEL_STAGES)
+    })
+    return table.sort_values(FUNNEL_STAGES[0][0], ascending=False, kind='stable')
+
+
+# Visitors reaching each stage, one row per breakdown group (a single 'All' row without one)
+def funnel(filters, window_days=FUNNEL_WINDOW_DAYS, breakdown=None):
+    return funnel_for_key(filters_key(filters), int(window_days), breakdown)
+
+
+# Cohort retention: each visitor's cohort is the month they were first seen in the filtered
+# rows. Months and visitors are integer codes, so first-seen months are one np.minimum.at,
+# distinct (visitor, month) pairs one np.unique and the cohort x offset matrix one bincount.
+# The aggregates backend reads the (day, visitor) pairs from its visitor rollup, built at
+# ingest, rather than scanning rows
+@memory_cache(maxsize=16)
+def cohort_for_key(key):
+    if QUERY_BACKEND == 'aggregates':
+        events = count_by(json.loads(key), ['ip_address', 'date'])
+    else:
+        events = raw_rows(json.loads(key), ['ip_address', 'date'])
+    events = events[events['date'].notna() & (events['ip_address'] != INVALID_IP)]
+    if events.empty:
+        return pd.DataFrame()
+    visitors, _ = pd.factorize(events['ip_address'])
+    months = (events['date'].dt.year * 12 + events['date'].dt.month - 1).to_numpy()
+    first_month = months.min()
+    months = months - first_month
+    span = int(months.max()) + 1
+    first_seen = np.full(visitors.max() + 1, span, dtype=np.int64)
+    np.minimum.at(first_seen, visitors, months)
+    active = np.unique(visitors.astype(np.int64) * span + months)
+    visitors, months = active // span, active % span
+    cohorts = first_seen[visitors]
+    matrix = np.bincount(cohorts * span + (months - cohorts), minlength=span * span).reshape(span, span)
+    # Offsets past the last month in the data are unknown rather than zero
+    matrix = np.where(np.add.outer(np.arange(span), np.arange(span)) < span, matrix, np.nan)
+    start = pd.Period(year=int(first_month) // 12, month=int(first_month) % 12 + 1, freq='M')
+    labels = pd.period_range(start, periods=span, freq='M').strftime('%Y-%m')
+    table = pd.DataFrame(matrix, index=labels, columns=range(span))
+    return table[table[0] > 0]
+
+
+# Visitors per first-seen month (rows) active again k months later (column k); column 0 is
+# the cohort size and months past the end of the data are NaN
+def cohort_matrix(filters):
+    return cohort_for_key(filters_key(filters))
+
+
+# Active filters as stored in filtered-data-store; None dates leave the range open. 'sample'
+# is only present, and True, in the fast (approximate) mode
+def make_filters(start_date=None, end_date=None, continent='all', country='all', job_type='all', interaction_type='all', sample=False):
+    filters = {
+        'start_date': start_date,
+        'end_date': end_date,
+        'continent': continent or 'all',
+        'country': country or 'all',
+        'job_type': job_type or 'all',
+        'interaction_type': interaction_type or 'all',
+    }
+    if sample:
+        filters['sample'] = True
+    return filters
+
+
+# The mode changes how counts are computed, not which rows match, so both modes share the
+# per-selection caches
+def filters_key(filters):
+    return json.dumps(exact_filters(filters) or {}, sort_keys=True)
+
+
+# Cross-filter from a chart click or selection, stored with the filters as
+# {'source': graph id, 'columns': {column: [values]}}; every chart but the source applies it
+def cross_predicates(filters):
+    return ((filters or {}).get('cross') or {}).get('columns') or {}
+
+
+def without_cross(filters, columns=None):
+    predicates = cross_predicates(filters)
+    if not predicates:
+        return filters
+    kept = {col: values for col, values in predicates.items() if columns is not None and col not in columns}
+    filters = {key: value for key, value in filters.items() if key != 'cross'}
+    if kept:
+        filters['cross'] = {'source': None, 'columns': kept}
+    return filters
+
+
+# Prebuilt summaries can only apply cross-filters on columns they are keyed by
+def sketch_covers(frame, filters):
+    return all(col in frame.columns for col in cross_predicates(filters))
+
+
+def filter_mask(frame, filters):
+    mask = np.ones(len(frame), dtype=bool)
+    if filters.get('start_date'):
+        mask &= (frame['date'] >= pd.Timestamp(filters['start_date'])).to_numpy()
+    if filters.get('end_date'):
+        mask &= (frame['date'] <= pd.Timestamp(filters['end_date'])).to_numpy()
+    for col in FILTER_COLUMNS:
+        value = filters.get(col, 'all')
+        if value != 'all':
+            mask &= (frame[col] == value).to_numpy()
+    for col, values in cross_predicates(filters).items():
+        mask &= frame[col].isin(values).to_numpy()
+    return mask
+
+
+# Column manifest: the data columns each tab's queries read, its deferred charts included.
+# While a tab renders (tab_projection), the rows matching a selection are materialized once
+# for just these columns, as the matching row positions taken from each projected column, and
+# every query of the tab reads that. Outside a tab, or for a column a manifest misses, only
+# the columns a query names are taken. Wide columns no tab groups by are never copied
+TAB_COLUMNS = {
+    'overview': ['interaction_type', 'year', 'month', 'month_name', 'job_type', 'date', 'ip_address'],
+    'dataset': ['date', 'ip_address', 'country', 'job_type', 'interaction_type'],
+    'geographic': ['country', 'feature_requested', 'interaction_type'],
+    'time': ['date', 'feature_requested', 'ip_address', 'day_of_week', 'hour'],
+    'sessions': [],
+    'funnel': ['ip_address', 'timestamp', 'interaction_type'] + list(FUNNEL_BREAKDOWNS),
+    'job_types': ['country', 'job_type', 'age_group'],
+    'features': ['feature_requested', 'ip_address'],
+    'demographics': ['age_group', 'gender', 'job_type'],
+    'statistics': ['interaction_type', 'date', 'hour', 'feature_requested'],
+}
+tab_columns = contextvars.ContextVar('tab_columns', default=None)
+
+
+@contextmanager
+def tab_projection(active_tab):
+    token = tab_columns.set(TAB_COLUMNS.get(active_tab))
+    try:
+        yield
+    finally:
+        tab_columns.reset(token)
+
+
+# Columns filter_mask compares for a selection
+def mask_columns(filters):
+    columns = ['date'] if filters.get('start_date') or filters.get('end_date') else []
+    columns += [col for col in FILTER_COLUMNS if filters.get(col, 'all') != 'all']
+    return columns + [col for col in cross_predicates(filters) if col not in columns]
+
+
+# The source frame and the matching row positions in it, or None when every row matches
+def matching_rows(filters, columns):
+    if QUERY_BACKEND == 'partitioned':
+        frame = load_partitions(partitions_for(filters), list(dict.fromkeys(columns + mask_columns(filters))))
+        mask = filter_mask(frame, filters)
+        return frame, None if mask.all() else np.flatnonzero(mask)
+    return df, row_positions(filters)
+
+
+# Just the given columns at the given positions, each copied once; every row is the source
+# frame itself, which is never copied
+def take_columns(frame, columns, positions):
+    if positions is None:
+        return frame
+    return pd.DataFrame(
+        {col: frame[col].array.take(positions) for col in columns},
+        index=frame.index.take(positions), copy=False
+    )
+
+
+@memory_cache(maxsize=8)
+def filtered_frame_for_key(key, columns):
+    frame, positions = matching_rows(json.loads(key), list(columns))
+    return take_columns(frame, list(columns), positions)
+
+
+# Rows matching the filters with at least the given columns (pandas and partitioned
+# backends); callers must treat the result as read-only
+def filtered_frame(filters, columns):
+    manifest = tab_columns.get()
+    if manifest is not None and set(columns) <= set(manifest):
+        columns = manifest
+    return filtered_frame_for_key(filters_key(filters), tuple(dict.fromkeys(columns)))
+
+
+# Column index (in-memory pandas backend): every grouping column as small integer codes into
+# its sorted distinct values, built once per column. A grouping is then a mixed-radix
+# combination of the codes of the matching rows and one np.bincount, with no row copies, so
+# re-aggregating for a new filter or cross-filter selection stays a few vectorized passes
+INDEX_MAX_BINS = 1 << 24
+
+
+@memory_cache(maxsize=None)
+def column_codes(column):
+    values = df[column]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    codes, labels = pd.factorize(values, sort=True)
+    return codes.astype(np.min_scalar_type(-len(labels) - 1)), labels
+
+
+# filter_mask on the codes: the date range is a code range over the sorted dates and each
+# selection a comparison of small integer codes, never of the values themselves
+def code_mask(column, values):
+    codes, labels = column_codes(column)
+    positions = labels.get_indexer(values)
+    positions = positions[positions >= 0]
+    if len(positions) <= 4:
+        mask = np.zeros(len(codes), dtype=bool)
+        for position in positions:
+            mask |= codes == position
+        return mask
+    # The extra last slot is what missing values (code -1) look up
+    selected = np.zeros(len(labels) + 1, dtype=bool)
+    selected[positions] = True
+    return selected[codes]
+
+
+# Mask of the dropdown and date filters, kept apart so a cross-filter click only adds its own
+# comparisons to it
+@memory_cache(maxsize=4)
+def base_mask_for_key(key):
+    filters = json.loads(key)
+    mask = np.ones(len(df), dtype=bool)
+    if filters.get('start_date') or filters.get('end_date'):
+        codes, labels = column_codes('date')
+        lower = labels.searchsorted(pd.Timestamp(filters['start_date'])) if filters.get('start_date') else 0
+        upper = labels.searchsorted(pd.Timestamp(filters['end_date']), side='right') if filters.get('end_date') else len(labels)
+        mask &= (codes >= lower) & (codes < upper)
+    for col in FILTER_COLUMNS:
+        if filters.get(col, 'all') != 'all':
+            mask &= code_mask(col, [filters[col]])
+    return mask
+
+
+@memory_cache(maxsize=8)
+def row_mask_for_key(key):
+    filters = json.loads(key)
+    mask = base_mask_for_key(filters_key(without_cross(filters)))
+    predicates = cross_predicates(filters)
+    if predicates:
+        mask = mask.copy()
+        for col, values in predicates.items():
+            mask &= code_mask(col, values)
+    return None if mask.all() else np.flatnonzero(mask)
+
+
+# Matching row positions, or None when every row matches
+def row_positions(filters):
+    return row_mask_for_key(filters_key(filters))
+
+
+def indexed_counts(filters, dims):
+    columns = [column_codes(col) for col in dims]
+    # One extra bin per column for missing values (code -1), dropped like groupby does
+    sizes = [len(labels) + 1 for _, labels in columns]
+    if np.prod(sizes, dtype=np.float64) > INDEX_MAX_BINS:
+        return None
+    positions = row_positions(filters)
+    combined = np.zeros(len(df) if positions is None else len(positions), dtype=np.int64)
+    for (codes, _), size in zip(columns, sizes):
+        combined *= size
+        combined += codes if positions is None else codes[positions]
+        combined += 1
+    counts = np.bincount(combined, minlength=int(np.prod(sizes)))
+    groups = np.flatnonzero(counts)
+    result = {}
+    remainder = groups
+    for col, (_, labels), size in reversed(list(zip(dims, columns, sizes))):
+        result[col] = remainder % size - 1
+        remainder = remainder // size
+    present = np.logical_and.reduce([codes >= 0 for codes in result.values()])
+    frame = pd.DataFrame({col: columns[i][1].take(result[col][present]) for i, col in enumerate(dims)})
+    frame['count'] = counts[groups[present]]
+    return frame
+
+
+# Grouped interaction counts, computed by whichever backend is active or, in the fast mode,
+# estimated from the sample with a 'variance' column alongside
+def count_by(filters, dims):
+    result = None
+    if filters.get('sample'):
+        result = sampled_counts(filters, dims)
+    elif QUERY_BACKEND == 'sql':
+        columns = ', '.join(sql_column(col) for col in dims)
+        where, params = sql_where(filters)
+        result = sql_query(
+            f"SELECT {columns}, COUNT(*) AS \"count\" FROM interactions{where} GROUP BY {columns} ORDER BY {columns}",
+            params
+        )
+        return parse_sql_dates(result)
+    elif QUERY_BACKEND == 'aggregates':
+        result = aggregate_view(filters, dims).groupby(dims, observed=True)['count'].sum().reset_index()
+    elif QUERY_BACKEND == 'pandas':
+        result = indexed_counts(filters, dims)
+    if result is None:
+        result = filtered_frame(filters, dims).groupby(dims, observed=True).size().reset_index(name='count')
+    for col in dims:
+        if isinstance(result[col].dtype, pd.CategoricalDtype):
+            result[col] = result[col].astype(object)
+    return result
+
+
+def row_count(filters):
+    if filters.get('sample'):
+        return sampled_row_count(filters)
+    if QUERY_BACKEND == 'sql':
+        where, params = sql_where(filters)
+        return int(sql_query(f"SELECT COUNT(*) AS n FROM interactions{where}", params)['n'].iloc[0])
+    if QUERY_BACKEND == 'aggregates':
+        return int(aggregate_view(filters, AGGREGATE_KEYS)['count'].sum())
+    if QUERY_BACKEND == 'pandas':
+        positions = row_positions(filters)
+        return len(df) if positions is None else len(positions)
+    frame, positions = matching_rows(filters, [])
+    return len(frame) if positions is None else len(positions)
+
+
+# Matching raw rows, optionally projected to a few columns and limited, with IP addresses
+# formatted back to dotted quads
+def rows(filters, columns=None, limit=None):
+    return with_dotted_ips(raw_rows(filters, columns or DATA_COLUMNS, limit))
+
+
+def with_dotted_ips(result):
+    if 'ip_address' in result.columns:
+        result = result.assign(ip_address=format_ips(result['ip_address']))
+    return result
+
+
+def raw_rows(filters, columns, limit=None):
+    if QUERY_BACKEND == 'sql':
+        where, params = sql_where(filters)
+        select = ', '.join(sql_column(col) for col in ['row_id'] + columns)
+        sql = f"SELECT {select} FROM interactions{where} ORDER BY row_id"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        result = parse_sql_dates(sql_query(sql, params)).set_index('row_id')
+        result.index.name = None
+        return result
+    if QUERY_BACKEND == 'aggregates':
+        return scan_rows(filters, columns, limit)
+    if limit is None:
+        return filtered_frame(filters, columns)[columns]
+    # A preview only takes its first rows, whatever the tab reads
+    frame, positions = matching_rows(filters, columns)
+    positions = np.arange(min(limit, len(frame))) if positions is None else positions[:limit]
+    return take_columns(frame, columns, positions)[columns]
+
+
+def column_range(filters, column):
+    if QUERY_BACKEND == 'sql':
+        where, params = sql_where(filters)
+        result = sql_query(
+            f"SELECT MIN({sql_column(column)}) AS lower, MAX({sql_column(column)}) AS upper FROM interactions{where}",
+            params
+        )
+        lower, upper = result['lower'].iloc[0], result['upper'].iloc[0]
+        if column in ('date', 'timestamp'):
+            return pd.to_datetime(lower, errors='coerce'), pd.to_datetime(upper, errors='coerce')
+        return lower, upper
+    if QUERY_BACKEND == 'aggregates':
+        # The rollups keep the latest timestamp per key but not the earliest
+        view = aggregate_view(filters, AGGREGATE_KEYS)
+        if column == 'timestamp':
+            return view['date'].min(), view['latest'].max()
+        return view[column].min(), view[column].max()
+    values = filtered_frame(filters, [column])[column]
+    return values.min(), values.max()
+
+
+def date_bounds():
+    if QUERY_BACKEND == 'partitioned':
+        dates = [d for part in partition_manifest['partitions'] for d in (part['min_date'], part['max_date']) if d]
+        return (pd.Timestamp(min(dates)), pd.Timestamp(max(dates))) if dates else (pd.NaT, pd.NaT)
+    return column_range(make_filters(), 'date')
+
+
+def distinct_values(column):
+    if QUERY_BACKEND == 'partitioned' and column in partition_manifest['categories']:
+        return sorted(partition_manifest['categories'][column])
+    return sorted(count_by(make_filters(), [column])[column].dropna().tolist())
+
+
+# Sorted IP index (pandas backend): the row order that sorts ip_address and the sorted
+# addresses themselves, so an address or subnet is a binary search and every /8, /16 or /24
+# subnet is a contiguous run that can be counted without re-sorting
+SUBNET_PREFIXES = [8, 16, 24]
+BOT_MIN_REQUESTS = int(os.environ.get('DASHBOARD_BOT_MIN_REQUESTS', '50'))
+BOT_Z_SCORE = 3.5
+ip_index = None
+
+
+def build_ip_index(ips):
+    ips = np.asarray(ips)
+    order = np.argsort(ips, kind='stable')
+    sorted_ips = ips[order]
+    if SHARED_MEMORY:
+        order, sorted_ips = to_shared_array(order), to_shared_array(sorted_ips)
+    return order, sorted_ips
+
+
+def subnet_bounds(network, prefix):
+    size = 1 << (32 - prefix)
+    lower = int(network) & ~(size - 1) & 0xFFFFFFFF
+    return lower, lower + size - 1
+
+
+# Row positions whose address falls in [lower, upper], in O(log n) on the sorted index
+def ip_range_rows(lower, upper):
+    order, sorted_ips = ip_index
+    start = np.searchsorted(sorted_ips, lower, side='left')
+    stop = np.searchsorted(sorted_ips, upper, side='right')
+    return order[start:stop]
+
+
+# Requests and distinct addresses per subnet for the filtered rows
+def subnet_counts(filters, prefix):
+    shift = np.uint32(32 - prefix)
+    if ip_index is not None:
+        order, sorted_ips = ip_index
+        ips = sorted_ips[filter_mask(df, filters)[order]]
+        ips = ips[ips != INVALID_IP]
+        networks = ips >> shift
+        starts = np.flatnonzero(np.r_[True, networks[1:] != networks[:-1]]) if len(ips) else np.zeros(0, dtype=np.int64)
+        new_ip = np.r_[True, ips[1:] != ips[:-1]]
+        counts = pd.DataFrame({
+            'network': networks[starts],
+            'requests': np.diff(np.r_[starts, len(ips)]),
+            'distinct_ips': np.add.reduceat(new_ip, starts) if len(starts) else np.zeros(0, dtype=np.int64),
+        })
+    else:
+        per_ip = count_by(filters, ['ip_address'])
+        per_ip = per_ip[per_ip['ip_address'] != INVALID_IP]
+        networks = per_ip['ip_address'].to_numpy().astype(np.uint32) >> shift
+        counts = per_ip.groupby(networks)['count'].agg(['sum', 'size'])
+        counts = counts.rename_axis('network').reset_index()
+        counts.columns = ['network', 'requests', 'distinct_ips']
+    counts['network'] = counts['network'].astype(np.uint32) << shift
+    return counts
+
+
+# Subnets whose request volume is an outlier by the robust (median / MAD) z-score
+def flag_bot_subnets(counts):
+    requests = counts['requests'].to_numpy().astype(np.float64)
+    if len(requests) == 0:
+        return np.zeros(0, dtype=bool)
+    median = np.median(requests)
+    mad = np.median(np.abs(requests - median))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z_score = 0.6745 * (requests - median) / mad
+    if mad == 0:
+        z_score = np.where(requests > median, np.inf, 0.0)
+    return (z_score > BOT_Z_SCORE) & (requests >= BOT_MIN_REQUESTS)
+
+
+def top_subnets(filters, prefix, n=10):
+    counts = subnet_counts(filters, prefix)
+    counts['flag'] = np.where(flag_bot_subnets(counts), 'Possible bot cluster', '')
+    counts = counts.sort_values('requests', ascending=False, kind='stable').head(n)
+    return pd.DataFrame({
+        'Subnet': format_ips(counts['network'], blank_invalid=False) + f"/{prefix}",
+        'Requests': counts['requests'].to_numpy(),
+        'Distinct IPs': counts['distinct_ips'].to_numpy(),
+        'Flag': counts['flag'].to_numpy(),
+    })
+
+
+# Data Explorer search (pandas backend): besides the sorted IP index, an inverted index per
+# searchable column maps each distinct value to the sorted positions of its rows. A term is
+# an IP prefix ("190.189", "190.189.x.x", "10.0.0.0/8") answered by binary search on the IP
+# index, or text matched against the distinct values, whose row lists are merged; "column:text"
+# limits the text to one column. Terms are intersected with each other and with the sidebar
+# selection, so a query never touches rows outside its matches. The sql backend turns the
+# same rules into predicates, and the partitioned and aggregates backends evaluate them one
+# partition or CSV chunk at a time
+SEARCH_COLUMNS = ['country', 'continent', 'interaction_type', 'job_type', 'feature_requested', 'age_group', 'gender', 'request_method']
+SEARCH_PAGE_SIZE = 10
+search_index = None
+
+
+def build_search_index(frame):
+    index = {}
+    for col in SEARCH_COLUMNS:
+        values = frame[col].astype('category')
+        codes = values.cat.codes.to_numpy()
+        # A stable sort keeps each value's positions ascending; missing values (code -1) come first
+        order = np.argsort(codes, kind='stable').astype(np.int64)
+        if SHARED_MEMORY:
+            order = to_shared_array(order)
+        counts = np.bincount(codes.astype(np.int64) + 1, minlength=len(values.cat.categories) + 1)
+        postings = np.split(order, np.cumsum(counts)[:-1])[1:]
+        index[col] = dict(zip(values.cat.categories, postings))
+    return index
+
+
+# Bounds of an IP prefix term, or None when the term is not one
+def ip_prefix_bounds(term):
+    network, slash, prefix = term.partition('/')
+    octets = network.rstrip('.').split('.')
+    while octets and octets[-1].lower() in ('x', '*'):
+        octets.pop()
+    if not octets or len(octets) > 4 or not all(octet.isdigit() and int(octet) <= 255 for octet in octets):
+        return None
+    if slash and not (prefix.isdigit() and int(prefix) <= 32):
+        return None
+    network = sum(int(octet) << (24 - 8 * i) for i, octet in enumerate(octets))
+    return subnet_bounds(network, int(prefix) if slash else 8 * len(octets))
+
+
+# (column, IP bounds) or (column or None for any searchable column, lowercased text) per term
+def search_terms(query):
+    try:
+        words = shlex.split(query or '')
+    except ValueError:
+        words = (query or '').split()
+    terms = []
+    for word in words:
+        column, colon, text = word.partition(':')
+        if not (colon and column in SEARCH_COLUMNS + ['ip_address']):
+            column, text = None, word
+        if not text:
+            continue
+        bounds = ip_prefix_bounds(text) if column in (None, 'ip_address') else None
+        if bounds is not None:
+            terms.append(('ip_address', bounds))
+        elif column == 'ip_address':
+            # Not an address prefix, so nothing can match
+            terms.append(('ip_address', (1, 0)))
+        else:
+            terms.append((column, text.lower()))
+    return terms
+
+
+def text_matches(value, text):
+    return text in str(value).lower()
+
+
+def indexed_matches(column, target, size):
+    if column == 'ip_address':
+        return np.sort(ip_range_rows(*target))
+    postings = [
+        positions
+        for col in ([column] if column else SEARCH_COLUMNS)
+        for value, positions in search_index[col].items() if text_matches(value, target)
+    ]
+    if len(postings) == 1:
+        return postings[0]
+    # Several values (or columns) can share rows, so their lists are merged through a mask
+    mask = np.zeros(size, dtype=bool)
+    for positions in postings:
+        mask[positions] = True
+    return np.flatnonzero(mask)
+
+
+def scanned_matches(frame, column, target):
+    if column == 'ip_address':
+        ips = frame['ip_address'].to_numpy()
+        return (ips >= target[0]) & (ips <= target[1])
+    mask = np.zeros(len(frame), dtype=bool)
+    for col in ([column] if column else SEARCH_COLUMNS):
+        values = [value for value in frame[col].dropna().unique() if text_matches(value, target)]
+        mask |= frame[col].isin(values).to_numpy()
+    return mask
+
+
+def search_mask(frame, filters, terms):
+    mask = filter_mask(frame, filters)
+    for column, target in terms:
+        mask &= scanned_matches(frame, column, target)
+    return mask
+
+
+# Every matching row of the CSV, as row numbers, from one streaming pass
+def scanned_search(filters, terms):
+    found = []
+    offset = 0
+    for chunk in pd.read_csv(DATA_FILE, chunksize=CHUNK_ROWS):
+        chunk = prepare_data(chunk)
+        found.append(np.flatnonzero(search_mask(chunk, filters, terms)) + offset)
+        offset += len(chunk)
+    return np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+
+
+# The given (sorted) CSV row numbers, reading the file only from the first to the last of them
+# and parsing only those rows
+def read_rows(numbers, columns):
+    if not len(numbers):
+        return pd.DataFrame(columns=columns)
+    first, last = int(numbers[0]), int(numbers[-1])
+    found = []
+    offset = first
+    for chunk in pd.read_csv(DATA_FILE, skiprows=range(1, first + 1), nrows=last - first + 1,
+                             chunksize=min(CHUNK_ROWS, last - first + 1)):
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        found.append(prepare_data(chunk.loc[chunk.index.intersection(numbers)])[columns])
+    return pd.concat(found)
+
+
+# The matches of a search, never the rows themselves: the matching positions in df (None for
+# every row) on the pandas backend, the number of matches on the sql backend, (partition,
+# positions or None) pairs on the partitioned backend and CSV row numbers on the aggregates
+# backend, where None leaves a search without terms to the rollups and a bounded scan
+@memory_cache(maxsize=16)
+def search_for_key(key, query):
+    filters = json.loads(key)
+    terms = search_terms(query)
+    if QUERY_BACKEND == 'sql':
+        where, params = sql_where(filters, terms)
+        return int(sql_query(f"SELECT COUNT(*) AS n FROM interactions{where}", params)['n'].iloc[0])
+    if QUERY_BACKEND == 'partitioned':
+        matches = []
+        for name in partitions_for(filters):
+            mask = search_mask(load_partition(name), filters, terms)
+            matches.append((name, None if mask.all() else np.flatnonzero(mask)))
+        return matches
+    if QUERY_BACKEND == 'aggregates':
+        return scanned_search(filters, terms) if terms else None
+    matches = sorted((indexed_matches(column, target, len(df)) for column, target in terms), key=len)
+    selected = row_positions(filters)
+    if selected is not None:
+        matches.append(selected)
+    if not matches:
+        return None
+    positions = matches[0]
+    for other in matches[1:]:
+        positions = np.intersect1d(positions, other, assume_unique=True)
+    return positions
+
+
+def search_page_count(total):
+    return max(1, -(-total // SEARCH_PAGE_SIZE))
+
+
+# One page of the search results, with the total number of matching rows
+def search_page(filters, query, page, size=SEARCH_PAGE_SIZE):
+    query = ' '.join((query or '').split())
+    matches = search_for_key(filters_key(filters), query)
+    start = page * size
+    if QUERY_BACKEND == 'sql':
+        where, params = sql_where(exact_filters(filters), search_terms(query))
+        select = ', '.join(sql_column(col) for col in DATA_COLUMNS)
+        result = sql_query(
+            f"SELECT {select} FROM interactions{where} ORDER BY row_id LIMIT {int(size)} OFFSET {int(start)}",
+            params
+        )
+        return matches, with_dotted_ips(parse_sql_dates(result))
+    if QUERY_BACKEND == 'partitioned':
+        total = 0
+        parts = []
+        for name, positions in matches:
+            frame = load_partition(name)
+            count = len(frame) if positions is None else len(positions)
+            lower, upper = max(start - total, 0), min(start + size - total, count)
+            if lower < upper:
+                positions = np.arange(lower, upper) if positions is None else positions[lower:upper]
+                parts.append(take_columns(frame, DATA_COLUMNS, positions)[DATA_COLUMNS])
+            total += count
+        result = pd.concat(parts) if parts else pd.DataFrame(columns=DATA_COLUMNS)
+        return total, with_dotted_ips(result)
+    if QUERY_BACKEND == 'aggregates':
+        if matches is None:
+            return row_count(exact_filters(filters)), with_dotted_ips(scan_rows(exact_filters(filters), DATA_COLUMNS, size, start))
+        return len(matches), with_dotted_ips(read_rows(matches[start:start + size], DATA_COLUMNS))
+    total = len(df) if matches is None else len(matches)
+    positions = np.arange(start, min(start + size, total)) if matches is None else matches[start:start + size]
+    return total, with_dotted_ips(take_columns(df, DATA_COLUMNS, positions)[DATA_COLUMNS])
+
+
+# Data loading: by default a thread loads the dataset and builds the backend's structures
+# (see start_up), so a fresh worker serves the login page, static files and /ready at once.
+# Requests that need the data wait for data_ready. DASHBOARD_LOAD=sync loads while importing,
+# as does a preloaded shared-memory master, since threads do not survive gunicorn's fork
+LOAD_MODE = os.environ.get('DASHBOARD_LOAD', 'background')
+df = None
+hierarchy = hierarchy_version = None
+data_start = data_end = None
+data_ready = threading.Event()
+data_state = {'error': None}
+
+
+def load_data_sources():
+    global df, partition_manifest, aggregates, ip_index, search_index, sketches, hierarchy, hierarchy_version, sessions, sample, data_start, data_end
+    hierarchy_version = data_file_version()
+    with startup_phase(f"data ({QUERY_BACKEND})"), primary_pass():
+        if QUERY_BACKEND == 'sql':
+            ensure_sql_database()
+        elif QUERY_BACKEND == 'partitioned':
+            partition_manifest = ensure_partitions()
+        elif QUERY_BACKEND == 'aggregates':
+            aggregates = ensure_aggregates()
+        else:
+            loaded = load_data()  # File in same directory as app.py
+            if SHARED_MEMORY:
+                loaded = share_dataframe(loaded)
+            ip_index = build_ip_index(loaded['ip_address'])
+            search_index = build_search_index(loaded)
+            df = loaded
+    with startup_phase('sketches'):
+        sketches = ensure_sketches()
+    with startup_phase('hierarchy'):
+        hierarchy = build_hierarchy(sketches['visitors'][0])
+    with startup_phase('sessions'):
+        sessions = ensure_sessions()
+    with startup_phase('sample'):
+        sample = ensure_sample()
+    report_parsing()
+    with startup_phase('date bounds'):
+        data_start, data_end = date_bounds()
+
+
+def wait_for_data():
+    data_ready.wait()
+    if data_state['error']:
+        raise RuntimeError(f"Data failed to load: {data_state['error']}")
+
+
+# Continent to country mapping, derived while the data loads from the visitor sketch keys,
+# which hold every (continent, country) pair whichever backend serves the data, so no request
+# rescans the file. Once the CSV changes, the session table (which only sessionizes appended
+# rows) adds the locations of the new rows. The browser filters the country dropdown from it
+# (see the clientside callback below)
+def data_file_version():
+    return f"{os.path.getmtime(DATA_FILE)}:{os.path.getsize(DATA_FILE)}"
+
+
+def build_hierarchy(keys):
+    pairs = keys[['continent', 'country']].astype(object).drop_duplicates().dropna(subset=['country'])
+    by_continent = pairs.dropna(subset=['continent']).groupby('continent')['country']
+    return {
+        'continents': {continent: sorted(countries) for continent, countries in by_continent.unique().items()},
+        'countries': sorted(pairs['country'].unique()),
+    }
+
+
+@memory_cache(maxsize=1)
+def hierarchy_for_version(version):
+    locations = [sketches['visitors'][0][SESSION_KEYS], session_table()['sessions'][SESSION_KEYS]]
+    return build_hierarchy(pd.concat([keys.astype(object) for keys in locations], ignore_index=True))
+
+
+def country_hierarchy():
+    wait_for_data()
+    version = data_file_version()
+    if version == hierarchy_version:
+        return hierarchy
+    return hierarchy_for_version(version)
+
+# Define color scheme
+colors = {
+    'primary': '#4a6baf',
+    'secondary': '#6c757d',
+    'success': '#28a745',
+    'danger': '#dc3545',
+    'warning': '#ffc107',
+    'info': '#17a2b8',
+    'light': '#F5F7FA',
+    'dark': '#343a40',
+    'job_requests': '#4a6baf',
+    'demo_requests': '#9c27b0',
+    'ai_assistant': '#2196f3',
+    'event_registrations': '#4caf50',
+    'job_types': {
+        'AI Specialist': '#4a6baf',
+        'Software Developer': '#9c27b0',
+        'Project Manager': '#2196f3',
+        'System Admin': '#4caf50',
+        'Data Analyst': '#ff9800',
+        'Other': '#ff5722'
+    },
+    'gender': {
+        'Male': '#1f77b4',
+        'Female': '#ff7f0e',
+        'Other': '#808080'
+    }
+}
+
+# Navigation tabs
+tabs = html.Div([
+    dbc.Tabs([
+        dbc.Tab(label="Overview", tab_id="overview", labelClassName="text-primary", activeLabelClassName="fw-bold"),
+        dbc.Tab(label="Data Explorer", tab_id="dataset", labelClassName="text-primary", activeLabelClassName="fw-bold"),
+        dbc.Tab(label="Geo-sales Insights", tab_id="geographic", labelClassName="text-primary", activeLabelClassName="fw-bold"),
+        dbc.Tab(label="Sales Trend Over Time", tab_id="time", labelClassName="text-primary", activeLabelClassName="fw-bold"),
+        dbc.Tab(label="Visitor Sessions", tab_id="sessions", labelClassName="text-primary", activeLabelClassName="fw-bold"),
+        dbc.Tab(label="Conversion Funnel", tab_id="funnel", labelClassName="text-primary", activeLabelClassName="fw-bold"),
+        dbc.Tab(label="Job Types Analysis", tab_id="job_types", labelClassName="text-primary", activeLabelClassName="fw-bold"),
+        dbc.Tab(label="Feature Requests", tab_id="features", labelClassName="text-primary", activeLabelClassName="fw-bold"),
+        dbc.Tab(label="Demographic Insights", tab_id="demographics", labelClassName="text-primary", activeLabelClassName="fw-bold"),
+        dbc.Tab(label="Statistical Insights", tab_id="statistics", labelClassName="text-primary", activeLabelClassName="fw-bold"),
+    ],
+    id="tabs",
+    active_tab="overview",
+    className="mb-3"),
+], style={"fontFamily": "Poppins"})
+
+# Tooltips for filters
+filter_tooltips = {
+    'start-date': 'Select the start date for the data range to analyze',
+    'end-date': 'Select the end date for the data range to analyze',
+    'time-granularity-filter': 'Choose the time aggregation level (daily, weekly, monthly, yearly)',
+    'continent-filter': 'Filter data by continent',
+    'country-filter': 'Filter data by country',
+    'job-type-filter': 'Filter data by job type',
+    'interaction-type-filter': 'Filter data by interaction type (e.g., Demo Request, Job Placement)',
+    'sample-mode': 'Estimate counts from a stratified sample for instant charts, with 95% confidence bands',
+    'apply-filters': 'Apply all selected filters to update the dashboard',
+    'reset-filters': 'Reset all filters to their default values'
+}
+
+
+# Filters sidebar with tooltips
+@memory_cache(maxsize=1)
+def filters_sidebar():
+    # The date pickers and option lists come from the data
+    wait_for_data()
+    return html.Div([
+        html.H5("Filters", className="mb-3"),
+        html.Div([
+            html.Label([
+                "Date Range:",
+                dbc.Tooltip("Select the date range for data analysis", target="date-range-label"),
+            ], id="date-range-label", className="fw-bold mb-2"),
+            dbc.Row([
+                dbc.Col([
+                    html.Label([
+                        "Start Date",
+                        dbc.Tooltip(filter_tooltips['start-date'], target="start-date-label"),
+                    ], id="start-date-label", className="mb-1"),
+                    dcc.DatePickerSingle(
+                        id='start-date',
+                        min_date_allowed=data_start if not pd.isna(data_start) else None,
+                        max_date_allowed=data_end if not pd.isna(data_end) else None,
+                        initial_visible_month=data_start if not pd.isna(data_start) else None,
+                        date=data_start if not pd.isna(data_start) else None,
+                        className="mb-3 w-100"
+                    ),
+                ], width=6),
+                dbc.Col([
+                    html.Label([
+                        "End Date",
+                        dbc.Tooltip(filter_tooltips['end-date'], target="end-date-label"),
+                    ], id="end-date-label", className="mb-1"),
+                    dcc.DatePickerSingle(
+                        id='end-date',
+                        min_date_allowed=data_start if not pd.isna(data_start) else None,
+                        max_date_allowed=data_end if not pd.isna(data_end) else None,
+                        initial_visible_month=data_end if not pd.isna(data_end) else None,
+                        date=data_end if not pd.isna(data_end) else None,
+                        className="mb-3 w-100"
+                    ),
+                ], width=6),
+            ]),
+        ], className="mb-1"),
+        html.Div([
+            html.Label([
+                "Time Granularity:",
+                dbc.Tooltip(filter_tooltips['time-granularity-filter'], target="time-granularity-label"),
+            ], id="time-granularity-label", className="fw-bold mb-2"),
+            dcc.Dropdown(
+                id='time-granularity-filter',
+                options=[
+                    {'label': 'Daily', 'value': 'daily'},
+                    {'label': 'Weekly', 'value': 'weekly'},
+                    {'label': 'Monthly', 'value': 'monthly'},
+                    {'label': 'Yearly', 'value': 'yearly'}
+                ],
+                value='daily',
+                clearable=False,
+                className="mb-3"
+            ),
+        ]),
+        html.Div([
+            html.Label([
+                "Continent:",
+                dbc.Tooltip(filter_tooltips['continent-filter'], target="continent-filter-label"),
+            ], id="continent-filter-label", className="fw-bold mb-2"),
+            dcc.Dropdown(
+                id='continent-filter',
+                options=[{'label': 'All Continents', 'value': 'all'}] +
+                        [{'label': continent, 'value': continent} for continent in country_hierarchy()['continents']],
+                value='all',
+                clearable=False,
+                className="mb-3"
+            ),
+        ]),
+        html.Div([
+            html.Label([
+                "Country:",
+                dbc.Tooltip(filter_tooltips['country-filter'], target="country-filter-label"),
+            ], id="country-filter-label", className="fw-bold mb-2"),
+            dcc.Dropdown(
+                id='country-filter',
+                options=[{'label': 'All Countries', 'value': 'all'}] +
+                        [{'label': country, 'value': country} for country in country_hierarchy()['countries']],
+                value='all',
+                clearable=False,
+                className="mb-3"
+            ),
+        ]),
+        html.Div([
+            html.Label([
+                "Job Type:",
+                dbc.Tooltip(filter_tooltips['job-type-filter'], target="job-type-filter-label"),
+            ], id="job-type-filter-label", className="fw-bold mb-2"),
+            dcc.Dropdown(
+                id='job-type-filter',
+                options=[{'label': 'All Job Types', 'value': 'all'}] +
+                        [{'label': job_type, 'value': job_type} for job_type in distinct_values('job_type')],
+                value='all',
+                clearable=False,
+                className="mb-3"
+            ),
+        ]),
+        html.Div([
+            html.Label([
+                "Interaction Type:",
+                dbc.Tooltip(filter_tooltips['interaction-type-filter'], target="interaction-type-filter-label"),
+            ], id="interaction-type-filter-label", className="fw-bold mb-2"),
+            dcc.Dropdown(
+                id='interaction-type-filter',
+                options=[{'label': 'All Interactions', 'value': 'all'}] +
+                        [{'label': interaction, 'value': interaction} for interaction in distinct_values('interaction_type')],
+                value='all',
+                clearable=False,
+                className="mb-3"
+            ),
+        ]),
+        html.Div([
+            html.Label([
+                "Computation:",
+                dbc.Tooltip(filter_tooltips['sample-mode'], target="sample-mode-label"),
+            ], id="sample-mode-label", className="fw-bold mb-2"),
+            dbc.Switch(id='sample-mode', label="Fast (approximate)", value=False, className="mb-3"),
+        ]),
+        dbc.Row([
+            dbc.Col(
+                html.Button([
+                    'Apply Filters',
+                    dbc.Tooltip(filter_tooltips['apply-filters'], target="apply-filters"),
+                ], id='apply-filters', className="btn btn-primary w-100 mt-2"),
+                width=6
+            ),
+            dbc.Col(
+                html.Button([
+                    'Reset Filters',
+                    dbc.Tooltip(filter_tooltips['reset-filters'], target="reset-filters"),
+                ], id='reset-filters', className="btn btn-secondary w-100 mt-2"),
+                width=6
+            ),
+        ]),
+    ], className="p-3 border rounded", style={"backgroundColor": "#E9EDF4", "fontFamily": "Poppins"})
+
+
+# Login form
+@memory_cache(maxsize=1)
+def login_layout():
+    return html.Div([
+        html.Div([
+            html.H2("SALES INSIGHTS DASHBOARD", className="text-center mb-4 text-primary", style={"fontFamily": "Poppins"}),
+            html.H4("Login", className="text-center mb-4", style={"fontFamily": "Poppins"}),
+            dbc.Alert(
+                "Invalid username or password",
+                id="login-alert",
+                dismissable=True,
+                is_open=False,
+                color="danger",
+            ),
+            dbc.Form([
+                dbc.Row([
+                    dbc.Label("Username", html_for="username", width=3),
+                    dbc.Col(
+                        dbc.Input(type="text", id="username", placeholder="Enter username"),
+                        width=9
+                    )
+                ], className="mb-3"),
+                dbc.Row([
+                    dbc.Label("Password", html_for="password"),
+                    dbc.Col(
+                        dbc.Input(type="password", id="password", placeholder="Enter password"),
+                        width=9
+                    )
+                ], className="mb-3"),
+                dbc.Button("Login", color="primary", id="login-button", className="w-100 mt-3"),
+            ]),
+        ], className="p-4 border rounded shadow", style={"maxWidth": "400px", "backgroundColor": "#F5F7FA"}),
+    ], className="d-flex justify-content-center align-items-center", style={"height": "100vh", "backgroundColor": "#F5F7FA"})
+
+
+# Main layout for the dashboard
+@memory_cache(maxsize=1)
+def dashboard_layout():
+    return html.Div([
+        # Header
+        dbc.Navbar(
+            dbc.Container([
+                html.A(
+                    dbc.Row([
+                        dbc.Col(html.H3("SALES INSIGHTS DASHBOARD", className="text-white mb-0 text-center", style={"fontFamily": "Poppins"}), width=12),
+                    ], align="center", justify="center"),
+                    href="#",
+                ),
+                dbc.Row([
+                    dbc.Col([
+                        html.Div([
+                            html.Span("Admin User", className="me-2 text-white", style={"fontFamily": "Poppins"}),
+                            html.Div(
+                                "A",
+                                style={
+                                    "backgroundColor": "#fff",
+                                    "color": "#4a6baf",
+                                    "borderRadius": "50%",
+                                    "width": "32px",
+                                    "height": "32px",
+                                    "display": "flex",
+                                    "alignItems": "center",
+                                    "justifyContent": "center",
+                                    "fontWeight": "bold",
+                                    "fontFamily": "Poppins"
+                                }
+                            ),
+                        ], className="d-flex align-items-center"),
+                    ], className="mt-3 mt-md-0"),
+                    dbc.Col([
+                        dbc.Button("Logout", id="logout-button", color="light", size="sm", className="ms-2"),
+                    ], className="mt-3 mt-md-0"),
+                ], className="ms-auto flex-nowrap mt-3 mt-md-0", align="center"),
+            ]),
+            style={"background": "linear-gradient(90deg, #4a6baf, #2a4b8f)"},
+            dark=True,
+            className="mb-4",
+        ),
+        # Main content
+        dbc.Container([
+            dbc.Row([
+                # Navigation tabs
+                dbc.Col([
+                    tabs,
+                ], width=12),
+            ]),
+            dbc.Row([
+                # Filters sidebar
+                dbc.Col([
+                    filters_sidebar(),
+                ], width=12, lg=3, className="mb-4"),
+                # Content area
+                dbc.Col([
+                    dbc.Alert(id="admission-alert", color="warning", is_open=False, dismissable=True, duration=8000, className="mb-3", style={"fontFamily": "Poppins"}),
+                    html.Div(id="cross-filter-bar"),
+                    html.Div(id="tab-content"),
+                    dcc.Store(id='tab-render-store'),
+                ], width=12, lg=9),
+            ]),
+        ], fluid=True, style={"backgroundColor": "#F5F7FA"}),
+    ])
+
+# App layout with conditional rendering based on authentication; display_page fills the
+# country hierarchy when it shows the dashboard
+app.layout = html.Div([
+    dcc.Location(id='url', refresh=False),
+    html.Div(id='page-content'),
+    dcc.Store(id='filtered-data-store'),
+    dcc.Store(id='country-hierarchy-store'),
+], style={"backgroundColor": "#F5F7FA"})
+
+# Callback to update page content based on URL; each page load also refreshes the
+# continent/country hierarchy in case new data was ingested
+@app.callback(
+    [Output('page-content', 'children'),
+     Output('country-hierarchy-store', 'data')],
+    [Input('url', 'pathname')]
+)
+def display_page(pathname):
+    if pathname == '/login':
+        return login_layout(), dash.no_update
+    elif pathname == '/admin/memory' and is_admin():
+        return memory_layout(), dash.no_update
+    else:
+        if current_user.is_authenticated:
+            return dashboard_layout(), country_hierarchy()
+        else:
+            return login_layout(), dash.no_update
+
+# Login callback
+@app.callback(
+    [Output('url', 'pathname'),
+     Output('login-alert', 'is_open')],
+    [Input('login-button', 'n_clicks')],
+    [State('username', 'value'),
+     State('password', 'value')]
+)
+def login(n_clicks, username, password):
+    if n_clicks is None:
+        raise PreventUpdate
+    user = users.get(username)
+    if user and check_password_hash(password_hash(user), password):
+        login_user(user)
+        # Identifies the browser session to admission control
+        flask.session['admission_id'] = uuid.uuid4().hex
+        return '/', False
+    else:
+        return '/login', True
+
+# Logout callback
+@app.callback(
+    Output('url', 'pathname', allow_duplicate=True),
+    [Input('logout-button', 'n_clicks')],
+    prevent_initial_call=True
+)
+def logout(n_clicks):
+    if n_clicks:
+        logout_user()
+        return '/login'
+    raise PreventUpdate
+
+
+# Update country filter based on continent selection, in the browser from the hierarchy store
+app.clientside_callback(
+    """
+    function(continent, hierarchy) {
+        hierarchy = hierarchy || {};
+        var countries = hierarchy.countries || [];
+        if (continent && continent !== 'all') {
+            countries = (hierarchy.continents || {})[continent] || [];
+        }
+        return [{label: 'All Countries', value: 'all'}].concat(
+            countries.map(function(country) { return {label: country, value: country}; })
+        );
+    }
+    """,
+    Output('country-filter', 'options'),
+    [Input('continent-filter', 'value'),
+     Input('country-hierarchy-store', 'data')]
+)
+
+# Continent options follow the hierarchy too, so newly ingested continents appear
+app.clientside_callback(
+    """
+    function(hierarchy) {
+        var continents = Object.keys((hierarchy || {}).continents || {}).sort();
+        return [{label: 'All Continents', value: 'all'}].concat(
+            continents.map(function(continent) { return {label: continent, value: continent}; })
+        );
+    }
+    """,
+    Output('continent-filter', 'options'),
+    [Input('country-hierarchy-store', 'data')]
+)
+
+# Admission control for the expensive callbacks (see admission_controlled). A request needs one
+# of the user's DASHBOARD_ADMISSION_USER_LIMIT in-flight places (unless it is a companion of a
+# page view, see companion_controlled), then a place in a queue of
+# DASHBOARD_ADMISSION_QUEUE, then one of DASHBOARD_ADMISSION_SLOTS run slots, waiting at most
+# DASHBOARD_ADMISSION_TIMEOUT seconds. Places and slots are flock()ed files, so the limits
+# hold across all gunicorn workers on the host and a crashed worker releases its locks.
+# A queued request whose session has since sent newer inputs to the same callback is
+# dropped, since the browser only keeps the newest response. Rejected requests leave their
+# outputs unchanged, explain why in admission-alert and name the reason in the
+# X-Dashboard-Admission response header, which load tests count them by
+ADMISSION_ENABLED = os.environ.get('DASHBOARD_ADMISSION', 'on') == 'on' and fcntl is not None
+ADMISSION_DIR = os.environ.get(
+    'DASHBOARD_ADMISSION_DIR',
+    os.path.join(tempfile.gettempdir(), f"dashboard-admission-{hashlib.sha1(os.path.abspath(DATA_FILE).encode('utf-8')).hexdigest()[:8]}")
+)
+ADMISSION_SLOTS = int(os.environ.get('DASHBOARD_ADMISSION_SLOTS', str(max(1, (os.cpu_count() or 2) - 1))))
+ADMISSION_QUEUE = int(os.environ.get('DASHBOARD_ADMISSION_QUEUE', '8'))
+ADMISSION_USER_LIMIT = int(os.environ.get('DASHBOARD_ADMISSION_USER_LIMIT', '2'))
+ADMISSION_TIMEOUT = float(os.environ.get('DASHBOARD_ADMISSION_TIMEOUT', '10'))
+# A user at their limit waits this long for a superseded request of theirs to step aside
+ADMISSION_USER_WAIT = 0.5
+ADMISSION_POLL = 0.05
+ADMISSION_HEADER = 'X-Dashboard-Admission'
+admission_stats = {'admitted': 0, 'user_limit': 0, 'queue_full': 0, 'timed_out': 0, 'superseded': 0}
+if ADMISSION_ENABLED:
+    os.makedirs(ADMISSION_DIR, exist_ok=True)
+
+
+def admission_path(name):
+    return os.path.join(ADMISSION_DIR, name)
+
+
+def try_lock(path):
+    handle = open(path, 'a')
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return handle
+    except OSError:
+        handle.close()
+        return None
+
+
+def release_lock(handle):
+    fcntl.flock(handle, fcntl.LOCK_UN)
+    handle.close()
+
+
+def take_slot(prefix, count):
+    for index in range(count):
+        handle = try_lock(admission_path(f"{prefix}-{index}.lock"))
+        if handle is not None:
+            return handle
+    return None
+
+
+# Latest request per browser session and callback, kept in a file so every worker sees it
+def claim_latest(path):
+    token = uuid.uuid4().hex
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(token)
+    os.replace(tmp_path, path)
+    return token
+
+
+def is_latest(path, token):
+    try:
+        with open(path) as f:
+            return f.read() == token
+    except OSError:
+        return True
+
+
+# A newer request that finds the file gone is still the latest, so removing it is safe
+def release_latest(path, token):
+    if is_latest(path, token):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# The held locks, or None with the reason the request was turned away and the message for the
+# user ('' when superseded)
+def admit(name, companion):
+    user = current_user.id if current_user.is_authenticated else 'anonymous'
+    session_id = flask.session.setdefault('admission_id', uuid.uuid4().hex)
+    latest_path = admission_path(f"latest-{session_id}-{name}")
+    token = claim_latest(latest_path)
+    try:
+        return wait_for_slots(user, latest_path, token, companion)
+    finally:
+        release_latest(latest_path, token)
+
+
+def wait_for_slots(user, latest_path, token, companion):
+    user_key = hashlib.sha1(str(user).encode('utf-8')).hexdigest()[:12]
+    held = []
+    deadline = time.monotonic() + ADMISSION_USER_WAIT
+    while not companion:
+        user_slot = take_slot(f"user-{user_key}", ADMISSION_USER_LIMIT)
+        if user_slot is not None:
+            held.append(user_slot)
+            break
+        if time.monotonic() > deadline:
+            admission_stats['user_limit'] += 1
+            return None, 'user_limit', f"You already have {ADMISSION_USER_LIMIT} requests running. Please wait for them to finish and try again."
+        time.sleep(ADMISSION_POLL)
+    ticket = take_slot('queue', ADMISSION_QUEUE)
+    if ticket is None:
+        for handle in held:
+            release_lock(handle)
+        admission_stats['queue_full'] += 1
+        return None, 'queue_full', "The dashboard is busy right now. Please try again in a moment."
+    deadline = time.monotonic() + ADMISSION_TIMEOUT
+    while True:
+        slot = take_slot('run', ADMISSION_SLOTS)
+        if slot is not None:
+            release_lock(ticket)
+            admission_stats['admitted'] += 1
+            return held + [slot], None, None
+        if not is_latest(latest_path, token):
+            reason, message = 'superseded', ''
+        elif time.monotonic() > deadline:
+            reason, message = 'timed_out', f"The dashboard is busy and this request waited more than {ADMISSION_TIMEOUT:g} seconds. Please try again."
+        else:
+            time.sleep(ADMISSION_POLL)
+            continue
+        release_lock(ticket)
+        for handle in held:
+            release_lock(handle)
+        admission_stats[reason] += 1
+        return None, reason, message
+
+
+def mark_refused(response, reason):
+    response.headers[ADMISSION_HEADER] = reason
+    return response
+
+
+def admission_controlled(func, companion=False):
+    if not ADMISSION_ENABLED:
+        return func
+
+    @wraps(func)
+    def wrapper(*args):
+        # Direct calls outside a request (warm-up, scripts) are not admitted
+        if not flask.has_request_context():
+            return func(*args)
+        held, reason, message = admit(func.__name__, companion)
+        if held is None:
+            flask.after_this_request(lambda response: mark_refused(response, reason))
+            if message:
+                dash.set_props('admission-alert', {'children': message, 'is_open': True})
+            # Dash drops set_props updates when a single output returns no_update, so admitted
+            # callbacks declare their outputs as a list
+            return [dash.no_update] * len(dash.callback_context.outputs_list)
+        try:
+            return func(*args)
+        finally:
+            for handle in held:
+                release_lock(handle)
+    return wrapper
+
+
+# Callbacks that a page view fires alongside its tab render (the deferred charts, and the
+# tables and controls that keep parts of a tab up to date) take no per-user place: a page
+# view counts once against the user's limit, as its tab render, however many parts it
+# loads. They still queue for the shared run slots
+def companion_controlled(func):
+    return admission_controlled(func, companion=True)
+
+# Filter data callback
+@app.callback(
+    Output('filtered-data-store', 'data'),
+    [Input('apply-filters', 'n_clicks')],
+    [State('start-date', 'date'),
+     State('end-date', 'date'),
+     State('time-granularity-filter', 'value'),
+     State('continent-filter', 'value'),
+     State('country-filter', 'value'),
+     State('job-type-filter', 'value'),
+     State('interaction-type-filter', 'value'),
+     State('sample-mode', 'value')]
+)
+def filter_data(n_clicks, start_date, end_date, time_granularity, continent, country, job_type, interaction_type, fast):
+    # The store only carries the active filters; tabs query the backend for what they need
+    if n_clicks is None:
+        return make_filters()
+    try:
+        start_date = pd.to_datetime(start_date).strftime('%Y-%m-%d')
+        end_date = pd.to_datetime(end_date).strftime('%Y-%m-%d')
+        return make_filters(start_date, end_date, continent, country, job_type, interaction_type, bool(fast))
+    except Exception as e:
+        print(f"Filter error: {str(e)}")
+        return make_filters()
+
+# Reset filters callback
+@app.callback(
+    [Output('start-date', 'date'),
+     Output('end-date', 'date'),
+     Output('time-granularity-filter', 'value'),
+     Output('continent-filter', 'value'),
+     Output('country-filter', 'value'),
+     Output('job-type-filter', 'value'),
+     Output('interaction-type-filter', 'value'),
+     Output('sample-mode', 'value'),
+     Output('filtered-data-store', 'data', allow_duplicate=True)],
+    [Input('reset-filters', 'n_clicks')],
+    prevent_initial_call=True
+)
+def reset_filters(n_clicks):
+    if n_clicks is None:
+        raise PreventUpdate
+    return (
+        data_start if not pd.isna(data_start) else None,
+        data_end if not pd.isna(data_end) else None,
+        'daily',
+        'all',
+        'all',
+        'all',
+        'all',
+        False,
+        make_filters()
+    )
+
+
+# Fast/exact toggle: takes effect at once, without Apply
+@app.callback(
+    Output('filtered-data-store', 'data', allow_duplicate=True),
+    [Input('sample-mode', 'value')],
+    [State('filtered-data-store', 'data')],
+    prevent_initial_call=True
+)
+def toggle_sample_mode(fast, filters):
+    filters = filters or make_filters()
+    if bool(filters.get('sample')) == bool(fast):
+        raise PreventUpdate
+    filters = exact_filters(filters)
+    return {**filters, 'sample': True} if fast else filters
+
+
+# Partial tab updates: the browser keeps the tab it was last sent, and tab-render-store holds
+# the tab's skeleton (component types, ids and child counts) plus a hash per dynamic prop
+# (figure data and layout, table data and columns, text) in tree order.
+# A filter change still renders the tab here, but when the skeleton is unchanged only the
+# props whose hash changed go back as a dash.Patch; the cards, tooltips, graph configs and
+# unchanged figures stay in place. Components that their own callbacks keep up to date
+# (PATCH_SKIP_IDS) are left out
+PATCH_SKIP_IDS = {'data-table', 'data-search-status', 'top-subnets-table', 'funnel-graph', 'funnel-breakdown-graph'}
+
+
+def props_digest(value):
+    return hashlib.sha1(json.dumps(value, cls=plotly.utils.PlotlyJSONEncoder, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def collect_tab_props(component, path, skeleton, leaves):
+    if isinstance(component, (list, tuple)):
+        skeleton.append([path, 'list', len(component)])
+        for index, child in enumerate(component):
+            collect_tab_props(child, path + [index], skeleton, leaves)
+        return
+    if not isinstance(component, dash.development.base_component.Component):
+        leaves.append((path, component))
+        return
+    component_id = getattr(component, 'id', None)
+    skeleton.append([path, type(component).__name__, component_id])
+    if component_id in PATCH_SKIP_IDS:
+        return
+    path = path + ['props']
+    if isinstance(component, dcc.Graph):
+        figure = component.figure
+        figure = figure.to_plotly_json() if hasattr(figure, 'to_plotly_json') else figure
+        for part in ['data', 'layout']:
+            leaves.append((path + ['figure', part], figure.get(part)))
+    elif isinstance(component, dash.dash_table.DataTable):
+        for prop in ['data', 'columns']:
+            leaves.append((path + [prop], getattr(component, prop, None)))
+    children = getattr(component, 'children', None)
+    if children is not None:
+        collect_tab_props(children, path + ['children'], skeleton, leaves)
+
+
+def tab_signature(content):
+    skeleton, leaves = [], []
+    collect_tab_props(content, [], skeleton, leaves)
+    return props_digest(skeleton), leaves
+
+# Render tab content callback
+@app.callback(
+    [Output('tab-content', 'children'),
+     Output('tab-render-store', 'data')],
+    [Input('tabs', 'active_tab'),
+     Input('filtered-data-store', 'data'),
+     Input('time-granularity-filter', 'value')],
+    [State('tab-render-store', 'data')]
+)
+@admission_controlled
+def update_tab_content(active_tab, filters, time_granularity, rendered):
+    fast = bool((filters or {}).get('sample'))
+    content = exact_render(active_tab, filters, time_granularity, wait=not fast)
+    if content is None:
+        content = build_tab(active_tab, filters, time_granularity)
+        if fast:
+            prefetch_exact(active_tab, filters, time_granularity)
+    skeleton, leaves = tab_signature(content)
+    # Same skeleton means the same props in the same order, so the digests are kept as a list
+    digests = [props_digest(value)[:12] for _, value in leaves]
+    state = {'tab': active_tab, 'skeleton': skeleton, 'props': digests}
+    if not rendered or rendered.get('tab') != active_tab or rendered.get('skeleton') != skeleton:
+        return content, state
+    patch = dash.Patch()
+    changed = 0
+    for (path, value), digest, previous in zip(leaves, digests, rendered['props']):
+        if digest != previous:
+            node = patch
+            for step in path[:-1]:
+                node = node[step]
+            node[path[-1]] = value
+            changed += 1
+    if not changed:
+        raise PreventUpdate
+    return patch, state
+
+
+def build_tab(active_tab, filters, time_granularity):
+    content = render_tab_content(active_tab, filters, time_granularity)
+    # The chart a cross-filter came from keeps showing every value so the selection can change
+    source = find_component(content, ((filters or {}).get('cross') or {}).get('source'))
+    if source is not None and source.id not in DEFERRED_CHARTS:
+        unfiltered = render_tab_content(active_tab, without_cross(filters), time_granularity)
+        source.figure = find_component(unfiltered, source.id).figure
+    return content
+
+
+# Fast mode: while a tab is shown from the sample, a background thread renders it from the
+# full data, so switching back to exact finds the render done (or waits for the one in flight
+# rather than starting another). A finished exact render is served in the fast mode too. The
+# executor starts on first use, since threads do not survive gunicorn's fork
+EXACT_RENDER_CACHE = int(os.environ.get('DASHBOARD_EXACT_RENDER_CACHE', '8'))
+exact_renders = OrderedDict()
+exact_renders_lock = threading.Lock()
+exact_executor = None
+
+
+def prefetch_exact(active_tab, filters, time_granularity):
+    global exact_executor
+    key = warm_key(active_tab, filters, time_granularity)
+    with exact_renders_lock:
+        if key in exact_renders:
+            exact_renders.move_to_end(key)
+            return
+        if exact_executor is None:
+            exact_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='exact-render')
+        exact_renders[key] = exact_executor.submit(render_exact, active_tab, exact_filters(filters), time_granularity)
+        while len(exact_renders) > EXACT_RENDER_CACHE:
+            exact_renders.popitem(last=False)
+
+
+def render_exact(active_tab, filters, time_granularity):
+    content = build_tab(active_tab, filters, time_granularity)
+    if row_count(filters):
+        for graph_id, (tab, _, _) in DEFERRED_CHARTS.items():
+            if tab == active_tab:
+                chart_figure(graph_id, filters, time_granularity)
+    return content
+
+
+def exact_render(active_tab, filters, time_granularity, wait):
+    with exact_renders_lock:
+        future = exact_renders.get(warm_key(active_tab, filters, time_granularity))
+    if future is None or not (wait or future.done()):
+        return None
+    try:
+        return future.result()
+    except Exception as e:
+        print(f"Exact render error: {str(e)}")
+        return None
+
+
+def find_component(component, component_id):
+    if component_id is None:
+        return None
+    if isinstance(component, (list, tuple)):
+        for child in component:
+            found = find_component(child, component_id)
+            if found is not None:
+                return found
+        return None
+    if not isinstance(component, dash.development.base_component.Component):
+        return None
+    if getattr(component, 'id', None) == component_id:
+        return component
+    return find_component(getattr(component, 'children', None), component_id)
+
+
+# Cross-filtering: clicking or box/lasso-selecting a chart's marks narrows every other chart
+# to the selected values. CROSS_FILTER_GRAPHS maps each chart to the point fields it
+# reports and the data columns they hold; the selection is stored in filtered-data-store,
+# so Apply and Reset clear it, and repeating a selection or double-clicking the chart
+# clears it too
+CROSS_FILTER_GRAPHS = {
+    'overview-interactions-graph': {'x': 'month_name'},
+    'overview-job-types-graph': {'label': 'job_type'},
+    'geo-feature-country-graph': {'x': 'country'},
+    'geo-jobs-country-graph': {'location': 'country'},
+    'time-hourly-dist-graph': {'x': 'hour', 'y': 'day_of_week'},
+    'job-types-country-graph': {'x': 'country'},
+    'job-types-age-graph': {'label': 'job_type'},
+    'features-type-graph': {'label': 'feature_requested'},
+    'demo-age-gender-graph': {'x': 'age_group'},
+    'demo-gender-job-graph': {'x': 'gender'},
+    'stats-interaction-dist-graph': {'x': 'interaction_type'},
+}
+CROSS_FILTER_LABELS = {
+    'month_name': 'Month', 'job_type': 'Job Type', 'country': 'Country', 'hour': 'Hour',
+    'day_of_week': 'Day of Week', 'feature_requested': 'Feature', 'age_group': 'Age Group',
+    'gender': 'Gender', 'interaction_type': 'Interaction Type',
+}
+
+
+def cross_filter_columns(points, fields):
+    columns = {}
+    for point in points or []:
+        for field, col in fields.items():
+            value = point.get(field)
+            if value is not None and value not in columns.setdefault(col, []):
+                columns[col].append(value)
+    return {col: sorted(values, key=str) for col, values in columns.items() if values}
+
+
+def register_cross_filter(graph_id, fields):
+    @app.callback(
+        Output('filtered-data-store', 'data', allow_duplicate=True),
+        [Input(graph_id, 'clickData'),
+         Input(graph_id, 'selectedData')],
+        [State('filtered-data-store', 'data')],
+        prevent_initial_call=True
+    )
+    def update_cross_filter(click_data, selected_data, filters):
+        filters = filters or make_filters()
+        triggered = dash.callback_context.triggered[0]['prop_id']
+        points = (selected_data if triggered.endswith('selectedData') else click_data) or {}
+        columns = cross_filter_columns(points.get('points'), fields)
+        current = filters.get('cross') or {}
+        if not columns or current == {'source': graph_id, 'columns': columns}:
+            if current.get('source') != graph_id:
+                raise PreventUpdate
+            return without_cross(filters)
+        return {**without_cross(filters), 'cross': {'source': graph_id, 'columns': columns}}
+
+
+for graph_id, fields in CROSS_FILTER_GRAPHS.items():
+    register_cross_filter(graph_id, fields)
+
+
+@app.callback(
+    Output('cross-filter-bar', 'children'),
+    [Input('filtered-data-store', 'data')]
+)
+def update_cross_filter_bar(filters):
+    predicates = cross_predicates(filters)
+    if not predicates:
+        return None
+    selection = "; ".join(
+        f"{CROSS_FILTER_LABELS.get(col, col)}: {', '.join(str(value) for value in values)}"
+        for col, values in predicates.items()
+    )
+    return dbc.Alert([
+        html.Span([html.Strong("Cross-filter "), selection]),
+        dbc.Button("Clear", id="clear-cross-filter", color="primary", size="sm", outline=True, className="ms-3"),
+    ], color="info", className="d-flex align-items-center justify-content-between py-2 mb-3", style={"fontFamily": "Poppins"})
+
+
+@app.callback(
+    Output('filtered-data-store', 'data', allow_duplicate=True),
+    [Input('clear-cross-filter', 'n_clicks')],
+    [State('filtered-data-store', 'data')],
+    prevent_initial_call=True
+)
+def clear_cross_filter(n_clicks, filters):
+    if not n_clicks or not cross_predicates(filters):
+        raise PreventUpdate
+    return without_cross(filters)
+
+
+def render_tab_content(active_tab, filters, time_granularity):
+    if filters is None:
+        filters = make_filters()
+    warm = warm_tabs.get(warm_key(active_tab, filters, time_granularity))
+    if warm is not None:
+        return warm
+    with tab_projection(active_tab):
+        if row_count(filters) == 0:
+            return html.Div("No data available for the selected filters", className="text-center mt-4", style={"fontFamily": "Poppins"})
+        latest_timestamp = column_range(filters, 'timestamp')[1]
+        if pd.isna(latest_timestamp):
+            last_updated = "No valid timestamp available"
+        else:
+            last_updated = latest_timestamp.strftime('%b %d, %Y %H:%M %p')
+        if active_tab == 'overview':
+            content = render_overview_tab(filters, last_updated)
+        elif active_tab == 'dataset':
+            content = render_dataset_tab(filters)
+        elif active_tab == 'geographic':
+            content = render_geographic_tab(filters)
+        elif active_tab == 'time':
+            content = render_time_tab(filters, time_granularity)
+        elif active_tab == 'sessions':
+            content = render_sessions_tab(filters)
+        elif active_tab == 'funnel':
+            content = render_funnel_tab(filters)
+        elif active_tab == 'job_types':
+            content = render_job_types_tab(filters)
+        elif active_tab == 'features':
+            content = render_features_tab(filters)
+        elif active_tab == 'demographics':
+            content = render_demographics_tab(filters)
+        elif active_tab == 'statistics':
+            content = render_statistics_tab(filters)
+        else:
+            return html.Div("Tab content not implemented yet", style={"fontFamily": "Poppins"})
+    if filters.get('sample'):
+        content = html.Div([
+            html.P(
+                f"Approximate: counts are scaled up from a stratified sample of {len(sample['rows']):,} rows "
+                f"(at least {SAMPLE_RATE:.0%} of each day, country and interaction type); bands and error bars "
+                "show 95% confidence intervals. The exact view is being computed in the background.",
+                id='sample-notice', className="text-muted small mb-2", style={"fontFamily": "Poppins"}
+            ),
+            content,
+        ])
+    return content
+
+
+# Fast mode: a shaded band around each line and error bars on each bar, SAMPLE_Z standard
+# errors wide. Traces are matched to their rows the way plotly express split them, by color
+def add_confidence_bands(fig, frame, color=None):
+    if 'variance' not in frame.columns:
+        return fig
+    margin = SAMPLE_Z * np.sqrt(frame['variance'].to_numpy(dtype=np.float64))
+    for trace in list(fig.data):
+        selected = np.ones(len(frame), dtype=bool) if color is None else (frame[color].astype(str) == str(trace.name)).to_numpy()
+        if trace.type in ('bar', 'histogram'):
+            trace.error_y = dict(type='data', array=margin[selected], visible=True, thickness=1)
+        elif trace.type in ('scatter', 'scattergl'):
+            x = np.asarray(trace.x)
+            y = np.asarray(trace.y, dtype=np.float64)
+            fig.add_trace(go.Scatter(
+                x=np.concatenate([x, x[::-1]]),
+                y=np.concatenate([y + margin[selected], np.maximum(y - margin[selected], 0)[::-1]]),
+                fill='toself', fillcolor=trace.line.color, opacity=0.2, line=dict(width=0),
+                hoverinfo='skip', showlegend=False, legendgroup=trace.legendgroup
+            ))
+    return fig
+
+
+# Progressive rendering: a tab comes back at once with its headers, KPI cards and chart cards,
+# each heavy chart showing this skeleton, and the charts in DEFERRED_CHARTS then fill in
+# through their own callbacks, so the first content no longer waits for the slowest chart
+def chart_placeholder(height):
+    return {
+        'data': [],
+        'layout': {
+            'height': height,
+            'margin': dict(l=20, r=20, t=40, b=20),
+            'paper_bgcolor': '#E9EDF4',
+            'plot_bgcolor': '#E9EDF4',
+            'xaxis': {'visible': False},
+            'yaxis': {'visible': False},
+            'annotations': [{
+                'text': "Loading chart...", 'showarrow': False, 'xref': 'paper', 'yref': 'paper', 'x': 0.5, 'y': 0.5,
+                'font': {'family': 'Poppins', 'size': 14, 'color': '#6c757d'},
+            }],
+        },
+    }
+
+
+# Overview charts, filled in by their own callbacks (see DEFERRED_CHARTS)
+def overview_interactions_figure(filters, time_granularity):
+    time_data = count_by(filters, ['year', 'month', 'month_name'])
+    time_data = time_data.sort_values(['year', 'month'])
+    job_requests_fig = px.line(
+        time_data,
+        x='month_name',
+        y='count',
+        markers=True,
         labels={'count': 'Interactions', 'month_name': 'Month'},
         color_discrete_sequence=[colors['primary']],
         title=""
     )
-    trend_line = go.Scatter(
-        x=time_data['month_name'],
-        y=time_data['count'] * 0.9,
-        mode='lines',
-        name='Trend Line',
-        line=dict(color='orange', dash='dash')
-    )
-    prev_year_line = go.Scatter(
-        x=time_data['month_name'],
-        y=time_data['count'] * 0.7,
-        mode='lines',
-        name='Previous Year',
-        line=dict(color='gray', dash='dot')
-    )
-    job_requests_fig.add_trace(trend_line)
-    job_requests_fig.add_trace(prev_year_line)
-    job_requests_fig.update_layout(
+    trend_line = go.Scatter(
+        x=time_data['month_name'],
+        y=time_data['count'] * 0.9,
+        mode='lines',
+        name='Trend Line',
+        line=dict(color='orange', dash='dash')
+    )
+    prev_year_line = go.Scatter(
+        x=time_data['month_name'],
+        y=time_data['count'] * 0.7,
+        mode='lines',
+        name='Previous Year',
+        line=dict(color='gray', dash='dot')
+    )
+    add_confidence_bands(job_requests_fig, time_data)
+    job_requests_fig.add_trace(trend_line)
+    job_requests_fig.add_trace(prev_year_line)
+    job_requests_fig.update_layout(
+        margin=dict(l=20, r=20, t=40, b=20),
+        xaxis_title="Month",
+        yaxis_title="Number of Interactions",
+        height=350,
+        width=500,
+        autosize=True,
+        paper_bgcolor='#F5F7FA',
+        plot_bgcolor='#F5F7FA',
+        xaxis=dict(showgrid=False, title_font=dict(family="Poppins", size=14)),
+        yaxis=dict(showgrid=True, gridcolor='lightgray', title_font=dict(family="Poppins", size=14)),
+        showlegend=False,
+        title_font=dict(family="Poppins", size=16, color="#4a6baf"),
+        font=dict(family="Poppins")
+    )
+    return job_requests_fig
+
+
+def overview_job_types_figure(filters, time_granularity):
+    job_types = count_by(filters, ['job_type']).sort_values('count', ascending=False, kind='stable')
+    job_types_fig = px.treemap(
+        job_types,
+        path=['job_type'],
+        values='count',
+        color='job_type',
+        color_discrete_map=colors['job_types'],
+        title=""
+    )
+    job_types_fig.update_layout(
+        margin=dict(l=20, r=20, t=40, b=20),
+        height=350,
+        width=500,
+        autosize=True,
+        paper_bgcolor='#F5F7FA',
+        plot_bgcolor='#F5F7FA',
+        showlegend=False,
+        title_font=dict(family="Poppins", size=16, color="#4a6baf"),
+        font=dict(family="Poppins")
+    )
+    return job_types_fig
+
+
+def overview_retention_figure(filters, time_granularity):
+    cohorts = cohort_matrix(filters)
+    retention = cohorts.div(cohorts[0], axis=0).mul(100).round(1) if not cohorts.empty else cohorts
+    retention_fig = px.imshow(
+        retention,
+        labels=dict(x='Months Since First Visit', y='First-Seen Month', color='Retention (%)'),
+        color_continuous_scale='Blues',
+        text_auto=True,
+        aspect='auto',
+        title=""
+    )
+    retention_fig.update_layout(
+        margin=dict(l=20, r=20, t=40, b=20),
+        xaxis_title="Months Since First Visit",
+        yaxis_title="First-Seen Month",
+        height=400,
+        autosize=True,
+        paper_bgcolor='#F5F7FA',
+        plot_bgcolor='#F5F7FA',
+        xaxis=dict(tickmode='linear', side='top', title_font=dict(family="Poppins", size=14)),
+        yaxis=dict(type='category', title_font=dict(family="Poppins", size=14)),
+        title_font=dict(family="Poppins", size=16, color="#4a6baf"),
+        font=dict(family="Poppins")
+    )
+    return retention_fig
+
+
+# Overview tab content
+def render_overview_tab(filters, last_updated):
+    if row_count(filters) == 0:
+        return html.Div("No data available for the selected filters", className="text-center mt-4", style={"fontFamily": "Poppins"})
+    total_job_requests = row_count(filters)
+    interaction_counts = count_by(filters, ['interaction_type']).set_index('interaction_type')['count']
+    demo_requests = int(interaction_counts.get('Demo Request', 0))
+    ai_assistant_requests = int(interaction_counts.get('AI Assistant Request', 0))
+    event_registrations = int(interaction_counts.get('Event Request', 0))
+    visitors = unique_visitors(filters)
+    job_requests_change = "+15.4%"
+    demo_requests_change = "+8.7%"
+    ai_assistant_change = "+25.3%"
+    event_registrations_change = "-2.7%"
+    last_updated = datetime(2025, 5, 23, 0, 11).strftime('%b %d, %Y %H:%M %p CAT')
+    return html.Div([
+        html.Div([
+            html.H4("Overview", className="mb-0", style={"fontFamily": "Poppins"}),
+            html.Small(f"Last updated: {last_updated}", className="text-muted", style={"fontFamily": "Poppins"}),
+        ], className="d-flex justify-content-between align-items-center mb-4"),
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H6([
+                            "📊 Total Interactions",
+                            dbc.Tooltip("Total number of all interactions recorded", target="total-interactions"),
+                        ], id="total-interactions", className="card-subtitle text-white mb-1", style={"fontFamily": "Poppins"}),
+                        html.H3(f"{total_job_requests:,}", className="card-title mb-2 text-white", style={"fontFamily": "Poppins"}),
+                        html.Div([
+                            html.Span("↑", className="text-white me-1"),
+                            html.Small(job_requests_change, className="text-white", style={"fontFamily": "Poppins"}),
+                        ], className="d-flex align-items-center"),
+                    ], className="bg-primary text-white")
+                ], className="h-100 shadow-sm rounded-3", style={"minHeight": "120px"})
+            ], width=12, sm=6, md=4, xl=True, className="mb-4"),
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H6([
+                            "🎥 Demo Requests",
+                            dbc.Tooltip("Number of demo requests received", target="demo-requests"),
+                        ], id="demo-requests", className="card-subtitle text-white mb-1", style={"fontFamily": "Poppins"}),
+                        html.H3(f"{demo_requests:,}", className="card-title mb-2 text-white", style={"fontFamily": "Poppins"}),
+                        html.Div([
+                            html.Span("↑", className="text-white me-1"),
+                            html.Small(demo_requests_change, className="text-white", style={"fontFamily": "Poppins"}),
+                        ], className="d-flex align-items-center"),
+                    ], className="bg-success text-white")
+                ], className="h-100 shadow-sm rounded-3", style={"minHeight": "120px"})
+            ], width=12, sm=6, md=4, xl=True, className="mb-4"),
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H6([
+                            "🤖 AI Assistant Requests",
+                            dbc.Tooltip("Number of AI assistant requests received", target="ai-assistant-requests"),
+                        ], id="ai-assistant-requests", className="card-subtitle text-white mb-1", style={"fontFamily": "Poppins"}),
+                        html.H3(f"{ai_assistant_requests:,}", className="card-title mb-2 text-white", style={"fontFamily": "Poppins"}),
+                        html.Div([
+                            html.Span("↑", className="text-white me-1"),
+                            html.Small(ai_assistant_change, className="text-white", style={"fontFamily": "Poppins"}),
+                        ], className="d-flex align-items-center"),
+                    ], className="bg-info text-white")
+                ], className="h-100 shadow-sm rounded-3", style={"minHeight": "120px"})
+            ], width=12, sm=6, md=4, xl=True, className="mb-4"),
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H6([
+                            "🎉 Event Registrations",
+                            dbc.Tooltip("Number of event registrations recorded", target="event-registrations"),
+                        ], id="event-registrations", className="card-subtitle text-white mb-1", style={"fontFamily": "Poppins"}),
+                        html.H3(f"{event_registrations:,}", className="card-title mb-2 text-white", style={"fontFamily": "Poppins"}),
+                        html.Div([
+                            html.Span("↓", className="text-white me-1"),
+                            html.Small(event_registrations_change, className="text-white", style={"fontFamily": "Poppins"}),
+                        ], className="d-flex align-items-center"),
+                    ], className="bg-warning text-white")
+                ], className="h-100 shadow-sm rounded-3", style={"minHeight": "120px"})
+            ], width=12, sm=6, md=4, xl=True, className="mb-4"),
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H6([
+                            "👥 Unique Visitors",
+                            dbc.Tooltip(
+                                f"Approximate number of distinct IP addresses (HyperLogLog, about ±{HLL_ERROR:.1%} standard error)",
+                                target="unique-visitors"
+                            ),
+                        ], id="unique-visitors", className="card-subtitle text-white mb-1", style={"fontFamily": "Poppins"}),
+                        html.H3(f"{visitors:,}", className="card-title mb-2 text-white", style={"fontFamily": "Poppins"}),
+                        html.Div([
+                            html.Small(f"±{HLL_ERROR:.1%}", className="text-white", style={"fontFamily": "Poppins"}),
+                        ], className="d-flex align-items-center"),
+                    ], className="bg-secondary text-white")
+                ], className="h-100 shadow-sm rounded-3", style={"minHeight": "120px"})
+            ], width=12, sm=6, md=4, xl=True, className="mb-4"),
+        ]),
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5([
+                            "Interactions Over Time",
+                            dbc.Tooltip("Monthly trend of total interactions with trend line and previous year comparison", target="interactions-over-time"),
+                        ], id="interactions-over-time", className="card-title mb-2", style={"fontFamily": "Poppins"}),
+                        dcc.Graph(
+                            id="overview-interactions-graph",
+                            figure=chart_placeholder(350),
+                            config={
+                                'displayModeBar': True,
+                                'modeBarButtonsToAdd': [
+                                    'downloadImage',
+                                    'pan2d',
+                                    'select2d',
+                                    'lasso2d',
+                                    'zoomIn2d',
+                                    'zoomOut2d'
+                                ]
+                            }
+                        ),
+                    ])
+                ], className="h-100 shadow-sm rounded-3", style={'overflow': 'auto'})
+            ], width=12, md=6, className="mb-4"),
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5([
+                            "Job Types Distribution",
+                            dbc.Tooltip("Treemap showing distribution of different job types", target="job-types-distribution"),
+                        ], id="job-types-distribution", className="card-title mb-2", style={"fontFamily": "Poppins"}),
+                        dcc.Graph(
+                            id="overview-job-types-graph",
+                            figure=chart_placeholder(350),
+                            config={
+                                'displayModeBar': True,
+                                'modeBarButtonsToAdd': [
+                                    'downloadImage',
+                                    'pan2d',
+                                    'select2d',
+                                    'lasso2d',
+                                    'zoomIn2d',
+                                    'zoomOut2d'
+                                ]
+                            }
+                        ),
+                    ])
+                ], className="h-100 shadow-sm rounded-3", style={'overflow': 'auto'})
+            ], width=12, md=6, className="mb-4"),
+        ]),
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5([
+                            "Visitor Retention by Cohort",
+                            dbc.Tooltip(
+                                "Share of visitors first seen in each month (within the filters) who return 1, 2, ... months later",
+                                target="overview-retention"
+                            ),
+                        ], id="overview-retention", className="card-title mb-2", style={"fontFamily": "Poppins"}),
+                        dcc.Graph(
+                            id="overview-retention-graph",
+                            figure=chart_placeholder(400),
+                            config={
+                                'displayModeBar': True,
+                                'modeBarButtonsToAdd': [
+                                    'downloadImage'
+                                ]
+                            }
+                        ),
+                    ])
+                ], className="h-100 shadow-sm rounded-3", style={'overflow': 'auto'})
+            ], width=12, className="mb-4"),
+        ]),
+    ], style={"fontFamily": "Poppins"})
+
+
+# Data Explorer tab content
+def render_dataset_tab(filters):
+    total = row_count(filters)
+    if total == 0:
+        return html.Div("No data available for the selected filters", className="text-center mt-4", style={"fontFamily": "Poppins"})
+    date_min, date_max = column_range(filters, 'date')
+    preview = rows(filters, limit=SEARCH_PAGE_SIZE)
+    top_talkers = top_items(filters, 'ip_address', 10)
+    top_talkers['ip_address'] = format_ips(top_talkers['ip_address'])
+    top_talkers.columns = ['IP Address', 'Requests']
+    top_subnet_rows = top_subnets(filters, 24)
+    date_range_str = (
+        f"{date_min.strftime('%Y-%m-%d')} to {date_max.strftime('%Y-%m-%d')}"
+        if not pd.isna(date_min) and not pd.isna(date_max)
+        else "Date range not available"
+    )
+    return html.Div([
+        html.H4("Data Explorer", className="mb-4", style={"fontFamily": "Poppins"}),
+        dbc.Card([
+            dbc.CardBody([
+                html.H5([
+                    "Data Preview",
+                    dbc.Tooltip(
+                        "The filtered dataset, 10 records a page. Search by IP prefix (190.189 or 190.189.x.x) "
+                        "or by text in any column; column:text searches one column, and several terms must all match",
+                        target="data-preview"
+                    ),
+                ], id="data-preview", className="card-title mb-2", style={"fontFamily": "Poppins"}),
+                dbc.Input(
+                    id='data-search',
+                    type='search',
+                    placeholder="Search: 190.189.x.x, ai, country:Brazil",
+                    debounce=True,
+                    persistence=True,
+                    persistence_type='session',
+                    className="mb-1",
+                    style={"fontFamily": "Poppins"}
+                ),
+                html.Small(f"{total:,} records", id='data-search-status', className="text-muted d-block mb-2", style={"fontFamily": "Poppins"}),
+                html.Div([
+                    html.Button("↑", id="scroll-up-btn", className="btn btn-outline-primary me-2"),
+                    html.Button("↓", id="scroll-down-btn", className="btn btn-outline-primary"),
+                    dash.dash_table.DataTable(
+                        id='data-table',
+                        data=preview.to_dict('records'),
+                        columns=[{'name': col, 'id': col} for col in preview.columns],
+                        page_action='custom',
+                        page_current=0,
+                        page_size=SEARCH_PAGE_SIZE,
+                        page_count=search_page_count(total),
+                        style_table={
+                            'overflowX': 'auto',
+                            'maxHeight': '400px',
+                            'overflowY': 'auto'
+                        },
+                        style_cell={
+                            'textAlign': 'left',
+                            'padding': '8px',
+                            'minWidth': '100px',
+                            'maxWidth': '300px',
+                            'whiteSpace': 'normal',
+                            'overflow': 'hidden',
+                            'textOverflow': 'ellipsis',
+                            'fontFamily': 'Poppins'
+                        },
+                        style_header={
+                            'backgroundColor': '#E9EDF4',
+                            'fontWeight': 'bold',
+                            'border': '1px solid #ddd',
+                            'fontFamily': 'Poppins'
+                        },
+                        style_data={
+                            'border': '1px solid #ddd',
+                        },
+                        style_data_conditional=[
+                            {
+                                'if': {'row_index': 'odd'},
+                                'backgroundColor': '#F5F7FA',
+                            }
+                        ],
+                    ),
+                ]),
+                html.Div([
+                    dbc.Button([
+                        "Download Dataset as CSV",
+                        dbc.Tooltip("Download the filtered dataset as a CSV file", target="download-dataset-btn"),
+                    ], id="download-dataset-btn", color="primary", className="mt-3"),
+                    dcc.Download(id="download-dataset-csv"),
+                ], className="mt-3 text-center"),
+            ])
+        ], className="mb-4 shadow-sm rounded-3"),
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5([
+                            "Dataset Statistics",
+                            dbc.Tooltip("Key statistics about the filtered dataset", target="dataset-statistics"),
+                        ], id="dataset-statistics", className="card-title mb-2", style={"fontFamily": "Poppins"}),
+                        html.Div([
+                            html.P(f"Total Records: {total:,}", className="mb-2", style={"fontFamily": "Poppins"}),
+                            html.P(f"Date Range: {date_range_str}", className="mb-2", style={"fontFamily": "Poppins"}),
+                            html.P(f"Number of Countries: {len(count_by(filters, ['country']))}", className="mb-2", style={"fontFamily": "Poppins"}),
+                            html.P(f"Number of Job Types: {len(count_by(filters, ['job_type']))}", className="mb-2", style={"fontFamily": "Poppins"}),
+                            html.P(f"Number of Interaction Types: {len(count_by(filters, ['interaction_type']))}", className="mb-0", style={"fontFamily": "Poppins"}),
+                        ]),
+                    ])
+                ], className="h-100 shadow-sm rounded-3")
+            ], width=12, md=6, className="mb-4"),
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5([
+                            "Column Information",
+                            dbc.Tooltip("Description of each column in the dataset", target="column-information"),
+                        ], id="column-information", className="card-title mb-2", style={"fontFamily": "Poppins"}),
+                        html.Div([
+                            dash.dash_table.DataTable(
+                                data=[
+                                    {'Column': 'timestamp', 'Description': 'Date and time of the interaction'},
+                                    {'Column': 'ip_address', 'Description': 'IP address of the user'},
+                                    {'Column': 'request_method', 'Description': 'HTTP method used (GET, POST, etc.)'},
+                                    {'Column': 'date', 'Description': 'Date of the interaction'},
+                                    {'Column': 'time', 'Description': 'Time of the interaction'},
+                                    {'Column': 'country', 'Description': 'Country of the user'},
+                                    {'Column': 'continent', 'Description': 'Continent of the user'},
+                                    {'Column': 'interaction_type', 'Description': 'Type of interaction'},
+                                    {'Column': 'job_type', 'Description': 'Type of job requested'},
+                                    {'Column': 'feature_requested', 'Description': 'Feature requested by the user'},
+                                    {'Column': 'age_group', 'Description': 'Age group of the user'},
+                                    {'Column': 'gender', 'Description': 'Gender of the user'},
+                                ],
+                                columns=[
+                                    {'name': 'Column', 'id': 'Column'},
+                                    {'name': 'Description', 'id': 'Description'},
+                                ],
+                                style_table={'overflowX': 'auto'},
+                                style_cell={
+                                    'textAlign': 'left',
+                                    'padding': '8px',
+                                    'whiteSpace': 'normal',
+                                    'overflow': 'hidden',
+                                    'textOverflow': 'ellipsis',
+                                    'fontFamily': 'Poppins'
+                                },
+                                style_header={
+                                    'backgroundColor': '#E9EDF4',
+                                    'fontWeight': 'bold',
+                                    'border': '1px solid #ddd',
+                                    'fontFamily': 'Poppins'
+                                },
+                                style_data={
+                                    'border': '1px solid #ddd',
+                                },
+                                style_data_conditional=[
+                                    {
+                                        'if': {'row_index': 'odd'},
+                                        'backgroundColor': '#F5F7FA',
+                                    }
+                                ],
+                            ),
+                        ], style={'overflowX': 'auto'}),
+                    ])
+                ], className="h-100 shadow-sm rounded-3")
+            ], width=12, md=6, className="mb-4"),
+        ]),
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5([
+                            "Top Talkers",
+                            dbc.Tooltip(
+                                f"IP addresses with the most requests; counts may be low by at most {heavy_hitter_error(filters):,}",
+                                target="top-talkers"
+                            ),
+                        ], id="top-talkers", className="card-title mb-2", style={"fontFamily": "Poppins"}),
+                        dash.dash_table.DataTable(
+                            id='top-talkers-table',
+                            data=top_talkers.to_dict('records'),
+                            columns=[{'name': col, 'id': col} for col in top_talkers.columns],
+                            style_table={'overflowX': 'auto'},
+                            style_cell={
+                                'textAlign': 'left',
+                                'padding': '8px',
+                                'whiteSpace': 'normal',
+                                'overflow': 'hidden',
+                                'textOverflow': 'ellipsis',
+                                'fontFamily': 'Poppins'
+                            },
+                            style_header={
+                                'backgroundColor': '#E9EDF4',
+                                'fontWeight': 'bold',
+                                'border': '1px solid #ddd',
+                                'fontFamily': 'Poppins'
+                            },
+                            style_data={
+                                'border': '1px solid #ddd',
+                            },
+                            style_data_conditional=[
+                                {
+                                    'if': {'row_index': 'odd'},
+                                    'backgroundColor': '#F5F7FA',
+                                }
+                            ],
+                        ),
+                    ])
+                ], className="h-100 shadow-sm rounded-3")
+            ], width=12, md=6, className="mb-4"),
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5([
+                            "Top Subnets",
+                            dbc.Tooltip(
+                                "Requests and distinct IP addresses per subnet; subnets whose volume is an outlier "
+                                "against the others are flagged as possible bot clusters",
+                                target="top-subnets"
+                            ),
+                        ], id="top-subnets", className="card-title mb-2", style={"fontFamily": "Poppins"}),
+                        dcc.RadioItems(
+                            id='subnet-prefix',
+                            options=[{'label': f" /{prefix}", 'value': prefix} for prefix in SUBNET_PREFIXES],
+                            value=24,
+                            inline=True,
+                            inputStyle={'marginLeft': '12px'},
+                            className="mb-2"
+                        ),
+                        dash.dash_table.DataTable(
+                            id='top-subnets-table',
+                            data=top_subnet_rows.to_dict('records'),
+                            columns=[{'name': col, 'id': col} for col in top_subnet_rows.columns],
+                            style_table={'overflowX': 'auto'},
+                            style_cell={
+                                'textAlign': 'left',
+                                'padding': '8px',
+                                'whiteSpace': 'normal',
+                                'overflow': 'hidden',
+                                'textOverflow': 'ellipsis',
+                                'fontFamily': 'Poppins'
+                            },
+                            style_header={
+                                'backgroundColor': '#E9EDF4',
+                                'fontWeight': 'bold',
+                                'border': '1px solid #ddd',
+                                'fontFamily': 'Poppins'
+                            },
+                            style_data={
+                                'border': '1px solid #ddd',
+                            },
+                            style_data_conditional=[
+                                {
+                                    'if': {'row_index': 'odd'},
+                                    'backgroundColor': '#F5F7FA',
+                                },
+                                {
+                                    'if': {'filter_query': '{Flag} != ""'},
+                                    'color': '#C0392B',
+                                    'fontWeight': 'bold',
+                                }
+                            ],
+                        ),
+                    ])
+                ], className="h-100 shadow-sm rounded-3")
+            ], width=12, md=6, className="mb-4"),
+        ]),
+    ], style={"fontFamily": "Poppins"})
+
+
+# Geo-sales Insights tab content
+def render_geographic_tab(filters):
+    if row_count(filters) == 0:
+        return html.Div("No data available for the selected filters", className="text-center mt-4", style={"fontFamily": "Poppins"})
+    top_countries = top_items(filters, 'country', 10)['country'].tolist()
+    feature_country = count_by(filters, ['country', 'feature_requested'])
+    feature_country = feature_country[feature_country['country'].isin(top_countries)]
+    feature_country = feature_country.sort_values('count', ascending=False)
+    feature_country_fig = px.bar(
+        feature_country,
+        x='country',
+        y='count',
+        color='feature_requested',
+        barmode='group',
+        labels={'count': 'Number of Requests', 'country': 'Country', 'feature_requested': 'Feature'},
+        color_discrete_map={
+            'dashboard': colors['ai_assistant'],
+            'promo_event': colors['event_registrations'],
+            'job_posting': colors['job_requests'],
+            'scheduled_demo': colors['demo_requests'],
+            'report_generator': colors['job_types']['Data Analyst'],
+            'ai_virtual_assistant': colors['ai_assistant']
+        },
+        title=""
+    )
+    add_confidence_bands(feature_country_fig, feature_country, 'feature_requested')
+    feature_country_fig.update_layout(
         margin=dict(l=20, r=20, t=40, b=20),
-        xaxis_title="Month",
-        yaxis_title="Number of Interactions",
+        xaxis_title="Country",
+        yaxis_title="Number of Requests",
         height=350,
         width=500,
         autosize=True,
@@ -589,110 +3608,234 @@ def render_overview_tab(filtered_df, last_updated):
         plot_bgcolor='#F5F7FA',
         xaxis=dict(showgrid=False, title_font=dict(family="Poppins", size=14)),
         yaxis=dict(showgrid=True, gridcolor='lightgray', title_font=dict(family="Poppins", size=14)),
-        showlegend=False,
+        showlegend=True,
         title_font=dict(family="Poppins", size=16, color="#4a6baf"),
         font=dict(family="Poppins")
     )
-    job_types = filtered_df['job_type'].value_counts().reset_index()
-    job_types.columns = ['job_type', 'count']
-    job_types_fig = px.treemap(
-        job_types,
-        path=['job_type'],
-        values='count',
-        color='job_type',
-        color_discrete_map=colors['job_types'],
+    job_counts = count_by(filters, ['interaction_type', 'country'])
+    job_counts = job_counts[job_counts['interaction_type'] == 'Job Placement'][['country', 'count']]
+    choropleth_fig = px.choropleth(
+        job_counts,
+        locations='country',
+        locationmode='country names',
+        color='count',
+        color_continuous_scale='Blues',
+        labels={'count': 'Number of Jobs Placed'},
         title=""
     )
-    job_types_fig.update_layout(
+    choropleth_fig.update_layout(
         margin=dict(l=20, r=20, t=40, b=20),
         height=350,
         width=500,
         autosize=True,
         paper_bgcolor='#F5F7FA',
         plot_bgcolor='#F5F7FA',
-        showlegend=False,
+        geo=dict(showframe=False, showcoastlines=True, projection_type='equirectangular'),
+        showlegend=True,
         title_font=dict(family="Poppins", size=16, color="#4a6baf"),
         font=dict(family="Poppins")
     )
-    last_updated = datetime(2025, 5, 23, 0, 11).strftime('%b %d, %Y %H:%M %p CAT')
     return html.Div([
-        html.Div([
-            html.H4("Overview", className="mb-0", style={"fontFamily": "Poppins"}),
-            html.Small(f"Last updated: {last_updated}", className="text-muted", style={"fontFamily": "Poppins"}),
-        ], className="d-flex justify-content-between align-items-center mb-4"),
+        html.H4("Geo-sales Insights", className="mb-4", style={"fontFamily": "Poppins"}),
         dbc.Row([
             dbc.Col([
                 dbc.Card([
                     dbc.CardBody([
-                        html.H6([
-                            "📊 Total Interactions",
-                            dbc.Tooltip("Total number of all interactions recorded", target="total-interactions"),
-                        ], id="total-interactions", className="card-subtitle text-white mb-1", style={"fontFamily": "Poppins"}),
-                        html.H3(f"{total_job_requests:,}", className="card-title mb-2 text-white", style={"fontFamily": "Poppins"}),
-                        html.Div([
-                            html.Span("↑", className="text-white me-1"),
-                            html.Small(job_requests_change, className="text-white", style={"fontFamily": "Poppins"}),
-                        ], className="d-flex align-items-center"),
-                    ], className="bg-primary text-white")
-                ], className="h-100 shadow-sm rounded-3", style={"minHeight": "120px"})
-            ], width=12, sm=6, md=3, className="mb-4"),
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H6([
-                            "🎥 Demo Requests",
-                            dbc.Tooltip("Number of demo requests received", target="demo-requests"),
-                        ], id="demo-requests", className="card-subtitle text-white mb-1", style={"fontFamily": "Poppins"}),
-                        html.H3(f"{demo_requests:,}", className="card-title mb-2 text-white", style={"fontFamily": "Poppins"}),
-                        html.Div([
-                            html.Span("↑", className="text-white me-1"),
-                            html.Small(demo_requests_change, className="text-white", style={"fontFamily": "Poppins"}),
-                        ], className="d-flex align-items-center"),
-                    ], className="bg-success text-white")
-                ], className="h-100 shadow-sm rounded-3", style={"minHeight": "120px"})
-            ], width=12, sm=6, md=3, className="mb-4"),
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H6([
-                            "🤖 AI Assistant Requests",
-                            dbc.Tooltip("Number of AI assistant requests received", target="ai-assistant-requests"),
-                        ], id="ai-assistant-requests", className="card-subtitle text-white mb-1", style={"fontFamily": "Poppins"}),
-                        html.H3(f"{ai_assistant_requests:,}", className="card-title mb-2 text-white", style={"fontFamily": "Poppins"}),
-                        html.Div([
-                            html.Span("↑", className="text-white me-1"),
-                            html.Small(ai_assistant_change, className="text-white", style={"fontFamily": "Poppins"}),
-                        ], className="d-flex align-items-center"),
-                    ], className="bg-info text-white")
-                ], className="h-100 shadow-sm rounded-3", style={"minHeight": "120px"})
-            ], width=12, sm=6, md=3, className="mb-4"),
+                        html.H5([
+                            "Feature Requests of Top 10 Countries",
+                            dbc.Tooltip("Bar chart showing feature requests by top 10 countries", target="geo-feature-country"),
+                        ], id="geo-feature-country", className="card-title mb-2", style={"fontFamily": "Poppins"}),
+                        dcc.Graph(
+                            id="geo-feature-country-graph",
+                            figure=feature_country_fig,
+                            config={
+                                'displayModeBar': True,
+                                'modeBarButtonsToAdd': [
+                                    'downloadImage',
+                                    'pan2d',
+                                    'select2d',
+                                    'lasso2d',
+                                    'zoomIn2d',
+                                    'zoomOut2d'
+                                ]
+                            }
+                        ),
+                    ])
+                ], className="h-100 shadow-sm rounded-3", style={'overflow': 'auto'})
+            ], width=12, md=6, className="mb-4"),
             dbc.Col([
                 dbc.Card([
                     dbc.CardBody([
-                        html.H6([
-                            "🎉 Event Registrations",
-                            dbc.Tooltip("Number of event registrations recorded", target="event-registrations"),
-                        ], id="event-registrations", className="card-subtitle text-white mb-1", style={"fontFamily": "Poppins"}),
-                        html.H3(f"{event_registrations:,}", className="card-title mb-2 text-white", style={"fontFamily": "Poppins"}),
-                        html.Div([
-                            html.Span("↓", className="text-white me-1"),
-                            html.Small(event_registrations_change, className="text-white", style={"fontFamily": "Poppins"}),
-                        ], className="d-flex align-items-center"),
-                    ], className="bg-warning text-white")
-                ], className="h-100 shadow-sm rounded-3", style={"minHeight": "120px"})
-            ], width=12, sm=6, md=3, className="mb-4"),
+                        html.H5([
+                            "Jobs Placed by Country",
+                            dbc.Tooltip("Choropleth map showing job placements by country", target="geo-jobs-country"),
+                        ], id="geo-jobs-country", className="card-title mb-2", style={"fontFamily": "Poppins"}),
+                        dcc.Graph(
+                            id="geo-jobs-country-graph",
+                            figure=choropleth_fig,
+                            config={
+                                'displayModeBar': True,
+                                'modeBarButtonsToAdd': [
+                                    'downloadImage',
+                                    'pan2d',
+                                    'select2d',
+                                    'lasso2d',
+                                    'zoomIn2d',
+                                    'zoomOut2d'
+                                ]
+                            }
+                        ),
+                    ])
+                ], className="h-100 shadow-sm rounded-3", style={'overflow': 'auto'})
+            ], width=12, md=6, className="mb-4"),
         ]),
+    ], style={"fontFamily": "Poppins"})
+
+
+# Time tab charts, filled in by their own callbacks (see DEFERRED_CHARTS)
+TIME_LABELS = {'daily': 'Date', 'weekly': 'Week', 'monthly': 'Month', 'yearly': 'Year'}
+
+
+def time_feature_trends_figure(filters, time_granularity):
+    x_label = TIME_LABELS[time_granularity]
+    # Coarser granularities roll up the daily counts instead of regrouping raw rows
+    daily_counts = count_by(filters, ['date', 'feature_requested'])
+    # Days are separate strata, so sampling variances add up like the counts
+    totals = [col for col in ['count', 'variance'] if col in daily_counts.columns]
+    if time_granularity == 'daily':
+        feature_time = daily_counts
+        feature_time['date'] = pd.to_datetime(feature_time['date'])
+    elif time_granularity == 'weekly':
+        feature_time = daily_counts.groupby([pd.Grouper(key='date', freq='W'), 'feature_requested'])[totals].sum().reset_index()
+        feature_time['date'] = pd.to_datetime(feature_time['date'])
+    elif time_granularity == 'monthly':
+        feature_time = daily_counts.groupby([pd.Grouper(key='date', freq='M'), 'feature_requested'])[totals].sum().reset_index()
+        feature_time['date'] = pd.to_datetime(feature_time['date']).dt.strftime('%Y-%m')
+    elif time_granularity == 'yearly':
+        feature_time = daily_counts.groupby([pd.Grouper(key='date', freq='Y'), 'feature_requested'])[totals].sum().reset_index()
+        feature_time['date'] = pd.to_datetime(feature_time['date']).dt.year
+    feature_time = feature_time.sort_values('date')
+    daily_fig = px.line(
+        feature_time,
+        x='date',
+        y='count',
+        color='feature_requested',
+        labels={'count': 'Number of Requests', 'date': x_label, 'feature_requested': 'Feature'},
+        color_discrete_map={
+            'dashboard': colors['ai_assistant'],
+            'promo_event': colors['event_registrations'],
+            'job_posting': colors['job_requests'],
+            'scheduled_demo': colors['demo_requests'],
+            'report_generator': colors['job_types']['Data Analyst'],
+            'ai_virtual_assistant': colors['ai_assistant']
+        },
+        title=""
+    )
+    add_confidence_bands(daily_fig, feature_time, 'feature_requested')
+    daily_fig.update_layout(
+        margin=dict(l=20, r=20, t=40, b=20),
+        xaxis_title=x_label,
+        yaxis_title="Number of Requests",
+        height=350,
+        width=500,
+        autosize=True,
+        paper_bgcolor='#F5F7FA',
+        plot_bgcolor='#F5F7FA',
+        xaxis=dict(showgrid=False, title_font=dict(family="Poppins", size=14)),
+        yaxis=dict(showgrid=True, gridcolor='lightgray', title_font=dict(family="Poppins", size=14)),
+        showlegend=True,
+        title_font=dict(family="Poppins", size=16, color="#4a6baf"),
+        font=dict(family="Poppins")
+    )
+    return daily_fig
+
+
+def time_unique_visitors_figure(filters, time_granularity):
+    x_label = TIME_LABELS[time_granularity]
+    visitors_time = unique_visitors_over_time(filters, time_granularity)
+    visitors_fig = px.line(
+        visitors_time,
+        x='date',
+        y='visitors',
+        markers=True,
+        labels={'visitors': 'Unique Visitors', 'date': x_label},
+        color_discrete_sequence=[colors['primary']],
+        title=""
+    )
+    visitors_fig.update_layout(
+        margin=dict(l=20, r=20, t=40, b=20),
+        xaxis_title=x_label,
+        yaxis_title="Unique Visitors",
+        height=350,
+        autosize=True,
+        paper_bgcolor='#F5F7FA',
+        plot_bgcolor='#F5F7FA',
+        xaxis=dict(showgrid=False, title_font=dict(family="Poppins", size=14)),
+        yaxis=dict(showgrid=True, gridcolor='lightgray', title_font=dict(family="Poppins", size=14)),
+        showlegend=False,
+        title_font=dict(family="Poppins", size=16, color="#4a6baf"),
+        font=dict(family="Poppins")
+    )
+    return visitors_fig
+
+
+def time_hourly_dist_figure(filters, time_granularity):
+    hourly_dist = count_by(filters, ['day_of_week', 'hour'])
+    day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    hourly_dist['day_of_week'] = pd.Categorical(hourly_dist['day_of_week'], categories=day_order, ordered=True)
+    hourly_dist = hourly_dist.pivot(index='day_of_week', columns='hour', values='count').fillna(0)
+    heatmap_fig = px.imshow(
+        hourly_dist,
+        labels=dict(x='Hour of Day', y='Day of Week', color='Interaction Count'),
+        color_continuous_scale='Blues',
+        title=""
+    )
+    heatmap_fig.update_layout(
+        margin=dict(l=20, r=20, t=40, b=20),
+        xaxis_title="Hour of Day",
+        yaxis_title="Day of Week",
+        height=350,
+        width=500,
+        autosize=True,
+        paper_bgcolor='#F5F7FA',
+        plot_bgcolor='#F5F7FA',
+        xaxis=dict(
+            tickmode='array',
+            tickvals=list(range(24)),
+            ticktext=[f"{i}:00" for i in range(24)],
+            tickfont=dict(size=10, color='black', family="Poppins"),
+            tickangle=45,
+            title_font=dict(family="Poppins", size=14)
+        ),
+        yaxis=dict(
+            autorange='reversed',
+            tickfont=dict(size=10, color='black', family="Poppins"),
+            title_font=dict(family="Poppins", size=14)
+        ),
+        showlegend=True,
+        title_font=dict(family="Poppins", size=16, color="#4a6baf"),
+        font=dict(family="Poppins")
+    )
+    return heatmap_fig
+
+
+# Sales Trend Over Time tab content
+def render_time_tab(filters, time_granularity):
+    if row_count(filters) == 0:
+        return html.Div("No data available for the selected filters", className="text-center mt-4", style={"fontFamily": "Poppins"})
+    return html.Div([
+        html.H4("Sales Trend Over Time", className="mb-4", style={"fontFamily": "Poppins"}),
         dbc.Row([
             dbc.Col([
                 dbc.Card([
                     dbc.CardBody([
                         html.H5([
-                            "Interactions Over Time",
-                            dbc.Tooltip("Monthly trend of total interactions with trend line and previous year comparison", target="interactions-over-time"),
-                        ], id="interactions-over-time", className="card-title mb-2", style={"fontFamily": "Poppins"}),
+                            f"{time_granularity.capitalize()} Feature Trends",
+                            dbc.Tooltip(f"Line chart showing feature request trends over {time_granularity} periods", target="time-feature-trends"),
+                        ], id="time-feature-trends", className="card-title mb-2", style={"fontFamily": "Poppins"}),
                         dcc.Graph(
-                            id="overview-interactions-graph",
-                            figure=job_requests_fig,
+                            id="time-feature-trends-graph",
+                            figure=chart_placeholder(350),
                             config={
                                 'displayModeBar': True,
                                 'modeBarButtonsToAdd': [
@@ -712,12 +3855,12 @@ def render_overview_tab(filtered_df, last_updated):
                 dbc.Card([
                     dbc.CardBody([
                         html.H5([
-                            "Job Types Distribution",
-                            dbc.Tooltip("Treemap showing distribution of different job types", target="job-types-distribution"),
-                        ], id="job-types-distribution", className="card-title mb-2", style={"fontFamily": "Poppins"}),
+                            "Hourly Interaction Distribution",
+                            dbc.Tooltip("Heatmap showing interaction distribution by day and hour", target="time-hourly-dist"),
+                        ], id="time-hourly-dist", className="card-title mb-2", style={"fontFamily": "Poppins"}),
                         dcc.Graph(
-                            id="overview-job-types-graph",
-                            figure=job_types_fig,
+                            id="time-hourly-dist-graph",
+                            figure=chart_placeholder(350),
                             config={
                                 'displayModeBar': True,
                                 'modeBarButtonsToAdd': [
@@ -734,227 +3877,144 @@ def render_overview_tab(filtered_df, last_updated):
                 ], className="h-100 shadow-sm rounded-3", style={'overflow': 'auto'})
             ], width=12, md=6, className="mb-4"),
         ]),
-    ], style={"fontFamily": "Poppins"})
-
-# Data Explorer tab content
-def render_dataset_tab(filtered_df):
-    if filtered_df.empty:
-        return html.Div("No data available for the selected filters", className="text-center mt-4", style={"fontFamily": "Poppins"})
-    date_min = filtered_df['date'].min()
-    date_max = filtered_df['date'].max()
-    date_range_str = (
-        f"{date_min.strftime('%Y-%m-%d')} to {date_max.strftime('%Y-%m-%d')}"
-        if not pd.isna(date_min) and not pd.isna(date_max)
-        else "Date range not available"
-    )
-    return html.Div([
-        html.H4("Data Explorer", className="mb-4", style={"fontFamily": "Poppins"}),
-        dbc.Card([
-            dbc.CardBody([
-                html.H5([
-                    "Data Preview",
-                    dbc.Tooltip("Preview of the first 10 records of the filtered dataset", target="data-preview"),
-                ], id="data-preview", className="card-title mb-2", style={"fontFamily": "Poppins"}),
-                html.Div([
-                    html.Button("↑", id="scroll-up-btn", className="btn btn-outline-primary me-2"),
-                    html.Button("↓", id="scroll-down-btn", className="btn btn-outline-primary"),
-                    dash.dash_table.DataTable(
-                        id='data-table',
-                        data=filtered_df.head(10).to_dict('records'),
-                        columns=[{'name': col, 'id': col} for col in filtered_df.columns],
-                        page_size=10,
-                        style_table={
-                            'overflowX': 'auto',
-                            'maxHeight': '400px',
-                            'overflowY': 'auto'
-                        },
-                        style_cell={
-                            'textAlign': 'left',
-                            'padding': '8px',
-                            'minWidth': '100px',
-                            'maxWidth': '300px',
-                            'whiteSpace': 'normal',
-                            'overflow': 'hidden',
-                            'textOverflow': 'ellipsis',
-                            'fontFamily': 'Poppins'
-                        },
-                        style_header={
-                            'backgroundColor': '#E9EDF4',
-                            'fontWeight': 'bold',
-                            'border': '1px solid #ddd',
-                            'fontFamily': 'Poppins'
-                        },
-                        style_data={
-                            'border': '1px solid #ddd',
-                        },
-                        style_data_conditional=[
-                            {
-                                'if': {'row_index': 'odd'},
-                                'backgroundColor': '#F5F7FA',
-                            }
-                        ],
-                    ),
-                ]),
-                html.Div([
-                    dbc.Button([
-                        "Download Dataset as CSV",
-                        dbc.Tooltip("Download the filtered dataset as a CSV file", target="download-dataset-btn"),
-                    ], id="download-dataset-btn", color="primary", className="mt-3"),
-                    dcc.Download(id="download-dataset-csv"),
-                ], className="mt-3 text-center"),
-            ])
-        ], className="mb-4 shadow-sm rounded-3"),
         dbc.Row([
             dbc.Col([
                 dbc.Card([
                     dbc.CardBody([
                         html.H5([
-                            "Dataset Statistics",
-                            dbc.Tooltip("Key statistics about the filtered dataset", target="dataset-statistics"),
-                        ], id="dataset-statistics", className="card-title mb-2", style={"fontFamily": "Poppins"}),
-                        html.Div([
-                            html.P(f"Total Records: {len(filtered_df):,}", className="mb-2", style={"fontFamily": "Poppins"}),
-                            html.P(f"Date Range: {date_range_str}", className="mb-2", style={"fontFamily": "Poppins"}),
-                            html.P(f"Number of Countries: {filtered_df['country'].nunique()}", className="mb-2", style={"fontFamily": "Poppins"}),
-                            html.P(f"Number of Job Types: {filtered_df['job_type'].nunique()}", className="mb-2", style={"fontFamily": "Poppins"}),
-                            html.P(f"Number of Interaction Types: {filtered_df['interaction_type'].nunique()}", className="mb-0", style={"fontFamily": "Poppins"}),
-                        ]),
-                    ])
-                ], className="h-100 shadow-sm rounded-3")
-            ], width=12, md=6, className="mb-4"),
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        html.H5([
-                            "Column Information",
-                            dbc.Tooltip("Description of each column in the dataset", target="column-information"),
-                        ], id="column-information", className="card-title mb-2", style={"fontFamily": "Poppins"}),
-                        html.Div([
-                            dash.dash_table.DataTable(
-                                data=[
-                                    {'Column': 'timestamp', 'Description': 'Date and time of the interaction'},
-                                    {'Column': 'ip_address', 'Description': 'IP address of the user'},
-                                    {'Column': 'request_method', 'Description': 'HTTP method used (GET, POST, etc.)'},
-                                    {'Column': 'date', 'Description': 'Date of the interaction'},
-                                    {'Column': 'time', 'Description': 'Time of the interaction'},
-                                    {'Column': 'country', 'Description': 'Country of the user'},
-                                    {'Column': 'continent', 'Description': 'Continent of the user'},
-                                    {'Column': 'interaction_type', 'Description': 'Type of interaction'},
-                                    {'Column': 'job_type', 'Description': 'Type of job requested'},
-                                    {'Column': 'feature_requested', 'Description': 'Feature requested by the user'},
-                                    {'Column': 'age_group', 'Description': 'Age group of the user'},
-                                    {'Column': 'gender', 'Description': 'Gender of the user'},
-                                ],
-                                columns=[
-                                    {'name': 'Column', 'id': 'Column'},
-                                    {'name': 'Description', 'id': 'Description'},
-                                ],
-                                style_table={'overflowX': 'auto'},
-                                style_cell={
-                                    'textAlign': 'left',
-                                    'padding': '8px',
-                                    'whiteSpace': 'normal',
-                                    'overflow': 'hidden',
-                                    'textOverflow': 'ellipsis',
-                                    'fontFamily': 'Poppins'
-                                },
-                                style_header={
-                                    'backgroundColor': '#E9EDF4',
-                                    'fontWeight': 'bold',
-                                    'border': '1px solid #ddd',
-                                    'fontFamily': 'Poppins'
-                                },
-                                style_data={
-                                    'border': '1px solid #ddd',
-                                },
-                                style_data_conditional=[
-                                    {
-                                        'if': {'row_index': 'odd'},
-                                        'backgroundColor': '#F5F7FA',
-                                    }
-                                ],
+                            f"{time_granularity.capitalize()} Unique Visitors",
+                            dbc.Tooltip(
+                                f"Approximate distinct IP addresses per {time_granularity} period (HyperLogLog, about ±{HLL_ERROR:.1%} standard error)",
+                                target="time-unique-visitors"
                             ),
-                        ], style={'overflowX': 'auto'}),
+                        ], id="time-unique-visitors", className="card-title mb-2", style={"fontFamily": "Poppins"}),
+                        dcc.Graph(
+                            id="time-unique-visitors-graph",
+                            figure=chart_placeholder(350),
+                            config={
+                                'displayModeBar': True,
+                                'modeBarButtonsToAdd': [
+                                    'downloadImage',
+                                    'pan2d',
+                                    'select2d',
+                                    'lasso2d',
+                                    'zoomIn2d',
+                                    'zoomOut2d'
+                                ]
+                            }
+                        ),
                     ])
-                ], className="h-100 shadow-sm rounded-3")
-            ], width=12, md=6, className="mb-4"),
+                ], className="h-100 shadow-sm rounded-3", style={'overflow': 'auto'})
+            ], width=12, className="mb-4"),
         ]),
     ], style={"fontFamily": "Poppins"})
 
-# Geo-sales Insights tab content
-def render_geographic_tab(filtered_df):
-    if filtered_df.empty:
-        return html.Div("No data available for the selected filters", className="text-center mt-4", style={"fontFamily": "Poppins"})
-    top_countries = filtered_df['country'].value_counts().head(10).index.tolist()
-    feature_country = filtered_df[filtered_df['country'].isin(top_countries)].groupby(['country', 'feature_requested']).size().reset_index(name='count')
-    feature_country = feature_country.sort_values('count', ascending=False)
-    feature_country_fig = px.bar(
-        feature_country,
-        x='country',
-        y='count',
-        color='feature_requested',
-        barmode='group',
-        labels={'count': 'Number of Requests', 'country': 'Country', 'feature_requested': 'Feature'},
-        color_discrete_map={
-            'dashboard': colors['ai_assistant'],
-            'promo_event': colors['event_registrations'],
-            'job_posting': colors['job_requests'],
-            'scheduled_demo': colors['demo_requests'],
-            'report_generator': colors['job_types']['Data Analyst'],
-            'ai_virtual_assistant': colors['ai_assistant']
-        },
+
+# Visitor Sessions tab content
+def render_sessions_tab(filters):
+    summary = session_summary(filters)
+    if summary['sessions'] == 0:
+        return html.Div("No sessions available for the selected filters", className="text-center mt-4", style={"fontFamily": "Poppins"})
+    gap_minutes = int(SESSION_GAP.total_seconds() // 60)
+    lengths = session_lengths(filters)
+    lengths_fig = px.bar(
+        lengths,
+        x='interactions',
+        y='sessions',
+        labels={'interactions': 'Interactions per Session', 'sessions': 'Sessions'},
+        color_discrete_sequence=[colors['primary']],
         title=""
     )
-    feature_country_fig.update_layout(
+    lengths_fig.update_layout(
         margin=dict(l=20, r=20, t=40, b=20),
-        xaxis_title="Country",
-        yaxis_title="Number of Requests",
+        xaxis_title="Interactions per Session",
+        yaxis_title="Sessions",
+        height=350,
+        autosize=True,
+        paper_bgcolor='#F5F7FA',
+        plot_bgcolor='#F5F7FA',
+        xaxis=dict(showgrid=False, type='category', title_font=dict(family="Poppins", size=14)),
+        yaxis=dict(showgrid=True, gridcolor='lightgray', title_font=dict(family="Poppins", size=14)),
+        showlegend=False,
+        title_font=dict(family="Poppins", size=16, color="#4a6baf"),
+        font=dict(family="Poppins")
+    )
+    durations_fig = px.histogram(
+        session_durations(filters),
+        x='minutes',
+        nbins=30,
+        labels={'minutes': 'Session Duration (minutes)'},
+        color_discrete_sequence=[colors['ai_assistant']],
+        title=""
+    )
+    durations_fig.update_layout(
+        margin=dict(l=20, r=20, t=40, b=20),
+        xaxis_title="Session Duration (minutes)",
+        yaxis_title="Sessions",
         height=350,
-        width=500,
         autosize=True,
         paper_bgcolor='#F5F7FA',
         plot_bgcolor='#F5F7FA',
         xaxis=dict(showgrid=False, title_font=dict(family="Poppins", size=14)),
         yaxis=dict(showgrid=True, gridcolor='lightgray', title_font=dict(family="Poppins", size=14)),
-        showlegend=True,
+        showlegend=False,
         title_font=dict(family="Poppins", size=16, color="#4a6baf"),
         font=dict(family="Poppins")
     )
-    job_counts = filtered_df[filtered_df['interaction_type'] == 'Job Placement'].groupby('country').size().reset_index(name='count')
-    choropleth_fig = px.choropleth(
-        job_counts,
-        locations='country',
-        locationmode='country names',
-        color='count',
+    pairs_fig = px.imshow(
+        session_feature_pairs(filters),
+        labels=dict(x='Feature', y='Feature', color='Sessions'),
         color_continuous_scale='Blues',
-        labels={'count': 'Number of Jobs Placed'},
+        text_auto=True,
         title=""
     )
-    choropleth_fig.update_layout(
+    pairs_fig.update_layout(
         margin=dict(l=20, r=20, t=40, b=20),
-        height=350,
-        width=500,
+        height=400,
         autosize=True,
         paper_bgcolor='#F5F7FA',
         plot_bgcolor='#F5F7FA',
-        geo=dict(showframe=False, showcoastlines=True, projection_type='equirectangular'),
-        showlegend=True,
+        xaxis=dict(tickfont=dict(size=10, color='black', family="Poppins"), tickangle=45),
+        yaxis=dict(tickfont=dict(size=10, color='black', family="Poppins")),
         title_font=dict(family="Poppins", size=16, color="#4a6baf"),
         font=dict(family="Poppins")
     )
+    kpis = [
+        ("🧭 Sessions", f"{summary['sessions']:,}", f"{summary['interactions']:,} interactions", "bg-primary", "sessions-count"),
+        ("🔁 Interactions per Session", f"{summary['mean_interactions']:.2f}", "mean", "bg-success", "sessions-depth"),
+        ("⏱️ Median Duration", f"{summary['median_minutes']:.1f} min", f"{gap_minutes} min inactivity gap", "bg-info", "sessions-duration"),
+        ("↩️ Bounce Rate", f"{summary['bounce_rate']:.1%}", "single-interaction sessions", "bg-warning", "sessions-bounce"),
+    ]
     return html.Div([
-        html.H4("Geo-sales Insights", className="mb-4", style={"fontFamily": "Poppins"}),
+        html.H4("Visitor Sessions", className="mb-4", style={"fontFamily": "Poppins"}),
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H6(title, id=kpi_id, className="card-subtitle text-white mb-1", style={"fontFamily": "Poppins"}),
+                        html.H3(value, className="card-title mb-2 text-white", style={"fontFamily": "Poppins"}),
+                        html.Div([
+                            html.Small(note, className="text-white", style={"fontFamily": "Poppins"}),
+                        ], className="d-flex align-items-center"),
+                    ], className=f"{background} text-white")
+                ], className="h-100 shadow-sm rounded-3", style={"minHeight": "120px"})
+            ], width=12, sm=6, xl=3, className="mb-4")
+            for title, value, note, background, kpi_id in kpis
+        ]),
         dbc.Row([
             dbc.Col([
                 dbc.Card([
                     dbc.CardBody([
                         html.H5([
-                            "Feature Requests of Top 10 Countries",
-                            dbc.Tooltip("Bar chart showing feature requests by top 10 countries", target="geo-feature-country"),
-                        ], id="geo-feature-country", className="card-title mb-2", style={"fontFamily": "Poppins"}),
+                            "Interactions per Session",
+                            dbc.Tooltip(
+                                f"Sessions by number of interactions; a session ends after {gap_minutes} minutes without activity from the same IP address",
+                                target="sessions-lengths"
+                            ),
+                        ], id="sessions-lengths", className="card-title mb-2", style={"fontFamily": "Poppins"}),
                         dcc.Graph(
-                            id="geo-feature-country-graph",
-                            figure=feature_country_fig,
+                            id="sessions-lengths-graph",
+                            figure=lengths_fig,
                             config={
                                 'displayModeBar': True,
                                 'modeBarButtonsToAdd': [
@@ -974,12 +4034,43 @@ def render_geographic_tab(filtered_df):
                 dbc.Card([
                     dbc.CardBody([
                         html.H5([
-                            "Jobs Placed by Country",
-                            dbc.Tooltip("Choropleth map showing job placements by country", target="geo-jobs-country"),
-                        ], id="geo-jobs-country", className="card-title mb-2", style={"fontFamily": "Poppins"}),
+                            "Session Duration",
+                            dbc.Tooltip("Time between the first and last interaction of each session", target="sessions-durations"),
+                        ], id="sessions-durations", className="card-title mb-2", style={"fontFamily": "Poppins"}),
+                        dcc.Graph(
+                            id="sessions-durations-graph",
+                            figure=durations_fig,
+                            config={
+                                'displayModeBar': True,
+                                'modeBarButtonsToAdd': [
+                                    'downloadImage',
+                                    'pan2d',
+                                    'select2d',
+                                    'lasso2d',
+                                    'zoomIn2d',
+                                    'zoomOut2d'
+                                ]
+                            }
+                        ),
+                    ])
+                ], className="h-100 shadow-sm rounded-3", style={'overflow': 'auto'})
+            ], width=12, md=6, className="mb-4"),
+        ]),
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5([
+                            "Features Requested Together",
+                            dbc.Tooltip(
+                                "Sessions that requested both features; the diagonal counts sessions per feature. "
+                                "Sessions are filtered by start date and location only",
+                                target="sessions-feature-pairs"
+                            ),
+                        ], id="sessions-feature-pairs", className="card-title mb-2", style={"fontFamily": "Poppins"}),
                         dcc.Graph(
-                            id="geo-jobs-country-graph",
-                            figure=choropleth_fig,
+                            id="sessions-feature-pairs-graph",
+                            figure=pairs_fig,
                             config={
                                 'displayModeBar': True,
                                 'modeBarButtonsToAdd': [
@@ -994,120 +4085,125 @@ def render_geographic_tab(filtered_df):
                         ),
                     ])
                 ], className="h-100 shadow-sm rounded-3", style={'overflow': 'auto'})
-            ], width=12, md=6, className="mb-4"),
+            ], width=12, className="mb-4"),
         ]),
     ], style={"fontFamily": "Poppins"})
 
-# Sales Trend Over Time tab content
-def render_time_tab(filtered_df, time_granularity):
-    if filtered_df.empty:
-        return html.Div("No data available for the selected filters", className="text-center mt-4", style={"fontFamily": "Poppins"})
-    if time_granularity == 'daily':
-        feature_time = filtered_df.groupby(['date', 'feature_requested']).size().reset_index(name='count')
-        feature_time['date'] = pd.to_datetime(feature_time['date'])
-        x_label = 'Date'
-    elif time_granularity == 'weekly':
-        feature_time = filtered_df.groupby([pd.Grouper(key='date', freq='W'), 'feature_requested']).size().reset_index(name='count')
-        feature_time['date'] = pd.to_datetime(feature_time['date'])
-        x_label = 'Week'
-    elif time_granularity == 'monthly':
-        feature_time = filtered_df.groupby([pd.Grouper(key='date', freq='M'), 'feature_requested']).size().reset_index(name='count')
-        feature_time['date'] = pd.to_datetime(feature_time['date']).dt.strftime('%Y-%m')
-        x_label = 'Month'
-    elif time_granularity == 'yearly':
-        feature_time = filtered_df.groupby([pd.Grouper(key='date', freq='Y'), 'feature_requested']).size().reset_index(name='count')
-        feature_time['date'] = pd.to_datetime(feature_time['date']).dt.year
-        x_label = 'Year'
-    feature_time = feature_time.sort_values('date')
-    daily_fig = px.line(
-        feature_time,
-        x='date',
-        y='count',
-        color='feature_requested',
-        labels={'count': 'Number of Requests', 'date': x_label, 'feature_requested': 'Feature'},
-        color_discrete_map={
-            'dashboard': colors['ai_assistant'],
-            'promo_event': colors['event_registrations'],
-            'job_posting': colors['job_requests'],
-            'scheduled_demo': colors['demo_requests'],
-            'report_generator': colors['job_types']['Data Analyst'],
-            'ai_virtual_assistant': colors['ai_assistant']
-        },
-        title=""
-    )
-    daily_fig.update_layout(
+
+# Conversion Funnel tab content
+FUNNEL_WINDOW_OPTIONS = sorted({7, 14, 30, 90, FUNNEL_WINDOW_DAYS})
+
+
+def funnel_figure(table):
+    totals = table.sum()
+    fig = go.Figure(go.Funnel(
+        y=totals.index.tolist(),
+        x=totals.tolist(),
+        textinfo="value+percent initial",
+        marker=dict(color=[colors['event_registrations'], colors['demo_requests'], colors['job_requests']]),
+    ))
+    fig.update_layout(
         margin=dict(l=20, r=20, t=40, b=20),
-        xaxis_title=x_label,
-        yaxis_title="Number of Requests",
         height=350,
-        width=500,
         autosize=True,
         paper_bgcolor='#F5F7FA',
         plot_bgcolor='#F5F7FA',
-        xaxis=dict(showgrid=False, title_font=dict(family="Poppins", size=14)),
-        yaxis=dict(showgrid=True, gridcolor='lightgray', title_font=dict(family="Poppins", size=14)),
-        showlegend=True,
         title_font=dict(family="Poppins", size=16, color="#4a6baf"),
         font=dict(family="Poppins")
     )
-    hourly_dist = filtered_df.groupby(['day_of_week', 'hour']).size().reset_index(name='count')
-    day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    hourly_dist['day_of_week'] = pd.Categorical(hourly_dist['day_of_week'], categories=day_order, ordered=True)
-    hourly_dist = hourly_dist.pivot(index='day_of_week', columns='hour', values='count').fillna(0)
-    heatmap_fig = px.imshow(
-        hourly_dist,
-        labels=dict(x='Hour of Day', y='Day of Week', color='Interaction Count'),
-        color_continuous_scale='Blues',
+    return fig
+
+
+def funnel_breakdown_figure(table, breakdown):
+    top = table.head(10)
+    entered = top.iloc[:, 0].where(top.iloc[:, 0] > 0)
+    rates = pd.DataFrame({label: top[label] / entered * 100 for label, _ in FUNNEL_STAGES[1:]}, index=top.index)
+    rates = rates.fillna(0).rename_axis('group').reset_index().melt(id_vars='group', var_name='stage', value_name='rate')
+    label = FUNNEL_BREAKDOWNS[breakdown]
+    fig = px.bar(
+        rates,
+        x='group',
+        y='rate',
+        color='stage',
+        barmode='group',
+        labels={'group': label, 'rate': 'Conversion (%)', 'stage': 'Reached'},
+        color_discrete_sequence=[colors['demo_requests'], colors['job_requests']],
         title=""
     )
-    heatmap_fig.update_layout(
+    fig.update_layout(
         margin=dict(l=20, r=20, t=40, b=20),
-        xaxis_title="Hour of Day",
-        yaxis_title="Day of Week",
+        xaxis_title=label,
+        yaxis_title="Conversion from Entry (%)",
         height=350,
-        width=500,
         autosize=True,
         paper_bgcolor='#F5F7FA',
         plot_bgcolor='#F5F7FA',
-        xaxis=dict(
-            tickmode='array',
-            tickvals=list(range(24)),
-            ticktext=[f"{i}:00" for i in range(24)],
-            tickfont=dict(size=10, color='black', family="Poppins"),
-            tickangle=45,
-            title_font=dict(family="Poppins", size=14)
-        ),
-        yaxis=dict(
-            autorange='reversed',
-            tickfont=dict(size=10, color='black', family="Poppins"),
-            title_font=dict(family="Poppins", size=14)
-        ),
+        xaxis=dict(showgrid=False, tickangle=45, title_font=dict(family="Poppins", size=14)),
+        yaxis=dict(showgrid=True, gridcolor='lightgray', title_font=dict(family="Poppins", size=14)),
         showlegend=True,
         title_font=dict(family="Poppins", size=16, color="#4a6baf"),
         font=dict(family="Poppins")
     )
+    return fig
+
+
+def render_funnel_tab(filters):
+    # The funnel orders each visitor's events in time; the aggregates backend only keeps
+    # counts, and materializing every raw row would defeat its bounded memory
+    if QUERY_BACKEND == 'aggregates':
+        return html.Div(
+            "The conversion funnel needs each visitor's event times, which the aggregates backend does not keep",
+            className="text-center mt-4", style={"fontFamily": "Poppins"}
+        )
+    if row_count(filters) == 0:
+        return html.Div("No data available for the selected filters", className="text-center mt-4", style={"fontFamily": "Poppins"})
+    breakdown = 'country'
+    table = funnel(filters, FUNNEL_WINDOW_DAYS, breakdown)
+    stages = " → ".join(label for label, _ in FUNNEL_STAGES)
     return html.Div([
-        html.H4("Sales Trend Over Time", className="mb-4", style={"fontFamily": "Poppins"}),
+        html.H4("Conversion Funnel", className="mb-4", style={"fontFamily": "Poppins"}),
+        dbc.Row([
+            dbc.Col([
+                html.Label("Conversion Window", className="fw-bold mb-2"),
+                dcc.Dropdown(
+                    id='funnel-window',
+                    options=[{'label': f"{days} days", 'value': days} for days in FUNNEL_WINDOW_OPTIONS],
+                    value=FUNNEL_WINDOW_DAYS,
+                    clearable=False,
+                    className="mb-3"
+                ),
+            ], width=12, md=4),
+            dbc.Col([
+                html.Label("Breakdown", className="fw-bold mb-2"),
+                dcc.RadioItems(
+                    id='funnel-breakdown',
+                    options=[{'label': f" {label}", 'value': column} for column, label in FUNNEL_BREAKDOWNS.items()],
+                    value=breakdown,
+                    inline=True,
+                    inputStyle={'marginLeft': '12px'},
+                    className="mb-3"
+                ),
+            ], width=12, md=8),
+        ]),
         dbc.Row([
             dbc.Col([
                 dbc.Card([
                     dbc.CardBody([
                         html.H5([
-                            f"{time_granularity.capitalize()} Feature Trends",
-                            dbc.Tooltip(f"Line chart showing feature request trends over {time_granularity} periods", target="time-feature-trends"),
-                        ], id="time-feature-trends", className="card-title mb-2", style={"fontFamily": "Poppins"}),
+                            "Visitor Funnel",
+                            dbc.Tooltip(
+                                f"Visitors reaching each stage in order ({stages}), each step within the window of their first entry request. "
+                                "The interaction type filter does not apply",
+                                target="funnel-overall"
+                            ),
+                        ], id="funnel-overall", className="card-title mb-2", style={"fontFamily": "Poppins"}),
                         dcc.Graph(
-                            id="time-feature-trends-graph",
-                            figure=daily_fig,
+                            id="funnel-graph",
+                            figure=funnel_figure(table),
                             config={
                                 'displayModeBar': True,
                                 'modeBarButtonsToAdd': [
-                                    'downloadImage',
-                                    'pan2d',
-                                    'select2d',
-                                    'lasso2d',
-                                    'zoomIn2d',
-                                    'zoomOut2d'
+                                    'downloadImage'
                                 ]
                             }
                         ),
@@ -1118,12 +4214,12 @@ def render_time_tab(filtered_df, time_granularity):
                 dbc.Card([
                     dbc.CardBody([
                         html.H5([
-                            "Hourly Interaction Distribution",
-                            dbc.Tooltip("Heatmap showing interaction distribution by day and hour", target="time-hourly-dist"),
-                        ], id="time-hourly-dist", className="card-title mb-2", style={"fontFamily": "Poppins"}),
+                            "Conversion by Segment",
+                            dbc.Tooltip("Share of entering visitors reaching each later stage, for the ten segments with the most entrants", target="funnel-segments"),
+                        ], id="funnel-segments", className="card-title mb-2", style={"fontFamily": "Poppins"}),
                         dcc.Graph(
-                            id="time-hourly-dist-graph",
-                            figure=heatmap_fig,
+                            id="funnel-breakdown-graph",
+                            figure=funnel_breakdown_figure(table, breakdown),
                             config={
                                 'displayModeBar': True,
                                 'modeBarButtonsToAdd': [
@@ -1142,12 +4238,13 @@ def render_time_tab(filtered_df, time_granularity):
         ]),
     ], style={"fontFamily": "Poppins"})
 
+
 # Job Types Analysis tab content
-def render_job_types_tab(filtered_df):
-    if filtered_df.empty:
+def render_job_types_tab(filters):
+    if row_count(filters) == 0:
         return html.Div("No data available for the selected filters", className="text-center mt-4", style={"fontFamily": "Poppins"})
-    job_country = filtered_df.groupby(['country', 'job_type']).size().reset_index(name='count')
-    top_countries = filtered_df['country'].value_counts().head(10).index.tolist()
+    job_country = count_by(filters, ['country', 'job_type'])
+    top_countries = top_items(filters, 'country', 10)['country'].tolist()
     job_country_filtered = job_country[job_country['country'].isin(top_countries)]
     job_country_fig = px.area(
         job_country_filtered,
@@ -1173,7 +4270,7 @@ def render_job_types_tab(filtered_df):
         title_font=dict(family="Poppins", size=16, color="#4a6baf"),
         font=dict(family="Poppins")
     )
-    job_age = filtered_df.groupby(['age_group', 'job_type']).size().reset_index(name='count')
+    job_age = count_by(filters, ['age_group', 'job_type'])
     job_age_fig = px.pie(
         job_age,
         values='count',
@@ -1250,12 +4347,13 @@ def render_job_types_tab(filtered_df):
         ]),
     ], style={"fontFamily": "Poppins"})
 
+
 # Feature Requests tab content
-def render_features_tab(filtered_df):
-    if filtered_df.empty:
+def render_features_tab(filters):
+    if row_count(filters) == 0:
         return html.Div("No data available for the selected filters", className="text-center mt-4", style={"fontFamily": "Poppins"})
-    features = filtered_df['feature_requested'].value_counts().reset_index()
-    features.columns = ['feature', 'count']
+    features = count_by(filters, ['feature_requested']).sort_values('count', ascending=False, kind='stable')
+    features = features.rename(columns={'feature_requested': 'feature'})
     features_fig = px.pie(
         features,
         values='count',
@@ -1283,7 +4381,9 @@ def render_features_tab(filtered_df):
         title_font=dict(family="Poppins", size=16, color="#4a6baf"),
         font=dict(family="Poppins")
     )
-    feature_pivot = filtered_df.pivot_table(index='ip_address', columns='feature_requested', aggfunc='size', fill_value=0)
+    feature_pivot = count_by(filters, ['ip_address', 'feature_requested']).pivot_table(
+        index='ip_address', columns='feature_requested', values='count', fill_value=0
+    )
     feature_corr = feature_pivot.corr()
     feature_corr_fig = px.imshow(
         feature_corr,
@@ -1362,11 +4462,12 @@ def render_features_tab(filtered_df):
         ]),
     ], style={"fontFamily": "Poppins"})
 
+
 # Demographic Insights tab content
-def render_demographics_tab(filtered_df):
-    if filtered_df.empty:
+def render_demographics_tab(filters):
+    if row_count(filters) == 0:
         return html.Div("No data available for the selected filters", className="text-center mt-4", style={"fontFamily": "Poppins"})
-    age_gender = filtered_df.groupby(['age_group', 'gender']).size().reset_index(name='count')
+    age_gender = count_by(filters, ['age_group', 'gender'])
     age_gender_fig = px.bar(
         age_gender,
         x='age_group',
@@ -1377,6 +4478,7 @@ def render_demographics_tab(filtered_df):
         color_discrete_map=colors['gender'],
         title=""
     )
+    add_confidence_bands(age_gender_fig, age_gender, 'gender')
     age_gender_fig.update_layout(
         margin=dict(l=20, r=20, t=40, b=20),
         xaxis_title="Age Group",
@@ -1392,7 +4494,7 @@ def render_demographics_tab(filtered_df):
         title_font=dict(family="Poppins", size=16, color="#4a6baf"),
         font=dict(family="Poppins")
     )
-    gender_job = filtered_df.groupby(['gender', 'job_type']).size().reset_index(name='count')
+    gender_job = count_by(filters, ['gender', 'job_type'])
     gender_job_fig = px.bar(
         gender_job,
         x='gender',
@@ -1474,13 +4576,14 @@ def render_demographics_tab(filtered_df):
         ]),
     ], style={"fontFamily": "Poppins"})
 
+
 # Statistical Insights tab content
-def render_statistics_tab(filtered_df):
-    if filtered_df.empty:
+def render_statistics_tab(filters):
+    if row_count(filters) == 0:
         return html.Div("No data available for the selected filters", className="text-center mt-4", style={"fontFamily": "Poppins"})
     
     # Interaction Type Distribution
-    stats = filtered_df.groupby(['interaction_type']).size().reset_index(name='count')
+    stats = count_by(filters, ['interaction_type'])
     stats_fig = px.histogram(
         stats,
         x='interaction_type',
@@ -1489,6 +4592,7 @@ def render_statistics_tab(filtered_df):
         color_discrete_sequence=[colors['primary']],
         title=""
     )
+    add_confidence_bands(stats_fig, stats)
     stats_fig.update_layout(
         margin=dict(l=20, r=20, t=40, b=20),
         xaxis_title="Interaction Type",
@@ -1505,48 +4609,50 @@ def render_statistics_tab(filtered_df):
         font=dict(family="Poppins")
     )
     
-    # Feature Request Distribution
-    feature_stats = filtered_df.groupby(['feature_requested']).size().reset_index(name='count')
-    feature_box_fig = px.box(
-        filtered_df,
-        x='feature_requested',
-        y=filtered_df.index,
-        labels={'feature_requested': 'Feature Requested'},
-        color='feature_requested',
-        color_discrete_map={
-            'dashboard': colors['ai_assistant'],
-            'promo_event': colors['event_registrations'],
-            'job_posting': colors['job_requests'],
-            'scheduled_demo': colors['demo_requests'],
-            'report_generator': colors['job_types']['Data Analyst'],
-            'ai_virtual_assistant': colors['ai_assistant']
-        },
-        title=""
-    )
-    feature_box_fig.update_layout(
-        margin=dict(l=20, r=20, t=40, b=20),
-        xaxis_title="Feature Requested",
-        yaxis_title="Index",
-        height=350,
-        width=500,
-        autosize=True,
-        paper_bgcolor='#F5F7FA',
-        plot_bgcolor='#F5F7FA',
-        xaxis=dict(showgrid=False, tickangle=45, title_font=dict(family="Poppins", size=14)),
-        yaxis=dict(showgrid=True, gridcolor='lightgray', title_font=dict(family="Poppins", size=14)),
-        showlegend=True,
-        title_font=dict(family="Poppins", size=16, color="#4a6baf"),
-        font=dict(family="Poppins")
-    )
+    # Feature Request Distribution: daily and hourly request counts per feature, drawn from
+    # the quantile sketches rather than raw rows
+    feature_quantile_data = feature_quantiles(filters)
+    feature_color_map = {
+        'dashboard': colors['ai_assistant'],
+        'promo_event': colors['event_registrations'],
+        'job_posting': colors['job_requests'],
+        'scheduled_demo': colors['demo_requests'],
+        'report_generator': colors['job_types']['Data Analyst'],
+        'ai_virtual_assistant': colors['ai_assistant']
+    }
+    box_figs = {}
+    for kind, y_label in [('daily', 'Requests per Day'), ('hourly', 'Requests per Hour')]:
+        box_fig = go.Figure()
+        for _, row in feature_quantile_data[feature_quantile_data['kind'] == kind].iterrows():
+            box_fig.add_trace(go.Box(
+                x=[row['feature_requested']],
+                name=row['feature_requested'],
+                lowerfence=[row[0.0]],
+                q1=[row[0.25]],
+                median=[row[0.5]],
+                q3=[row[0.75]],
+                upperfence=[row[0.99]],
+                marker_color=feature_color_map.get(row['feature_requested'], colors['primary']),
+            ))
+        box_fig.update_layout(
+            margin=dict(l=20, r=20, t=40, b=20),
+            xaxis_title="Feature Requested",
+            yaxis_title=y_label,
+            height=350,
+            autosize=True,
+            paper_bgcolor='#F5F7FA',
+            plot_bgcolor='#F5F7FA',
+            xaxis=dict(showgrid=False, tickangle=45, title_font=dict(family="Poppins", size=14)),
+            yaxis=dict(showgrid=True, gridcolor='lightgray', title_font=dict(family="Poppins", size=14)),
+            showlegend=True,
+            title_font=dict(family="Poppins", size=16, color="#4a6baf"),
+            font=dict(family="Poppins")
+        )
+        box_figs[kind] = box_fig
+    feature_box_fig = box_figs['daily']
     
     # Feature Request Statistics Table
-    feature_stats_table = filtered_df.groupby('feature_requested').size().reset_index(name='count')
-    feature_stats_table['Mean Requests'] = feature_stats_table['count'].mean()
-    feature_stats_table['Std Dev Requests'] = feature_stats_table['count'].std()
-    feature_stats_table = feature_stats_table[['feature_requested', 'count', 'Mean Requests', 'Std Dev Requests']]
-    feature_stats_table.columns = ['Feature', 'Total Requests', 'Mean Requests', 'Std Dev Requests']
-    feature_stats_table['Mean Requests'] = feature_stats_table['Mean Requests'].round(2)
-    feature_stats_table['Std Dev Requests'] = feature_stats_table['Std Dev Requests'].round(2)
+    feature_stats = feature_stats_table(filters)
     
     return html.Div([
         html.H4("Statistical Insights", className="mb-4", style={"fontFamily": "Poppins"}),
@@ -1580,8 +4686,8 @@ def render_statistics_tab(filtered_df):
                 dbc.Card([
                     dbc.CardBody([
                         html.H5([
-                            "Feature Request Distribution",
-                            dbc.Tooltip("Box plot showing distribution of feature requests", target="stats-feature-box"),
+                            "Daily Feature Request Distribution",
+                            dbc.Tooltip("Box plot of requests per day for each feature (whiskers at min and p99)", target="stats-feature-box"),
                         ], id="stats-feature-box", className="card-title mb-2", style={"fontFamily": "Poppins"}),
                         dcc.Graph(
                             id="stats-feature-box-graph",
@@ -1602,23 +4708,48 @@ def render_statistics_tab(filtered_df):
                 ], className="h-100 shadow-sm rounded-3", style={'overflow': 'auto'})
             ], width=12, md=6, className="mb-4"),
         ]),
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5([
+                            "Hourly Feature Request Distribution",
+                            dbc.Tooltip("Box plot of requests per hour for each feature (whiskers at min and p99)", target="stats-feature-hourly-box"),
+                        ], id="stats-feature-hourly-box", className="card-title mb-2", style={"fontFamily": "Poppins"}),
+                        dcc.Graph(
+                            id="stats-feature-hourly-box-graph",
+                            figure=box_figs['hourly'],
+                            config={
+                                'displayModeBar': True,
+                                'modeBarButtonsToAdd': [
+                                    'downloadImage',
+                                    'pan2d',
+                                    'select2d',
+                                    'lasso2d',
+                                    'zoomIn2d',
+                                    'zoomOut2d'
+                                ]
+                            }
+                        ),
+                    ])
+                ], className="h-100 shadow-sm rounded-3", style={'overflow': 'auto'})
+            ], width=12, className="mb-4"),
+        ]),
         dbc.Row([
             dbc.Col([
                 dbc.Card([
                     dbc.CardBody([
                         html.H5([
                             "Feature Request Statistics",
-                            dbc.Tooltip("Table showing mean and standard deviation of requests per feature", target="stats-feature-table"),
+                            dbc.Tooltip(
+                                f"Requests per day and per hour at p50/p90/p99 for each feature (within {QUANTILE_ACCURACY:.0%} relative error)",
+                                target="stats-feature-table"
+                            ),
                         ], id="stats-feature-table", className="card-title mb-2", style={"fontFamily": "Poppins"}),
                         dash.dash_table.DataTable(
                             id='stats-feature-table-data',
-                            data=feature_stats_table.to_dict('records'),
-                            columns=[
-                                {'name': 'Feature', 'id': 'Feature'},
-                                {'name': 'Total Requests', 'id': 'Total Requests'},
-                                {'name': 'Mean Requests', 'id': 'Mean Requests'},
-                                {'name': 'Std Dev Requests', 'id': 'Std Dev Requests'},
-                            ],
+                            data=feature_stats.to_dict('records'),
+                            columns=[{'name': col, 'id': col} for col in feature_stats.columns],
                             style_table={
                                 'overflowX': 'auto',
                                 'maxHeight': '350px',
@@ -1663,40 +4794,593 @@ def render_statistics_tab(filtered_df):
         ]),
     ], style={"fontFamily": "Poppins"})
 
+
+# Charts filled in by their own callback (see chart_placeholder): graph id -> (tab, figure
+# function, whether the figure depends on the time granularity). Figures are cached per
+# selection, so the second call a full tab re-render triggers, and switching back to a tab,
+# are cache hits. Like the tab, a chart in the fast mode waits for or reuses a finished exact
+# render (see prefetch_exact)
+DEFERRED_CHARTS = {
+    'overview-interactions-graph': ('overview', overview_interactions_figure, False),
+    'overview-job-types-graph': ('overview', overview_job_types_figure, False),
+    'overview-retention-graph': ('overview', overview_retention_figure, False),
+    'time-feature-trends-graph': ('time', time_feature_trends_figure, True),
+    'time-hourly-dist-graph': ('time', time_hourly_dist_figure, False),
+    'time-unique-visitors-graph': ('time', time_unique_visitors_figure, True),
+}
+# Their callbacks keep them up to date, so tab patches leave them out
+PATCH_SKIP_IDS.update(DEFERRED_CHARTS)
+
+
+@memory_cache(maxsize=32)
+def chart_for_key(graph_id, key, sample, time_granularity):
+    filters = json.loads(key)
+    if sample:
+        filters['sample'] = True
+    active_tab, figure, _ = DEFERRED_CHARTS[graph_id]
+    with tab_projection(active_tab):
+        return figure(filters, time_granularity)
+
+
+def chart_figure(graph_id, filters, time_granularity):
+    # The chart a cross-filter came from keeps showing every value so the selection can change
+    if ((filters.get('cross') or {}).get('source')) == graph_id:
+        filters = without_cross(filters)
+    granular = DEFERRED_CHARTS[graph_id][2]
+    return chart_for_key(graph_id, filters_key(filters), bool(filters.get('sample')), time_granularity if granular else None)
+
+
+def register_deferred_chart(graph_id, active_tab, granular):
+    def update_chart(filters, time_granularity):
+        filters = filters or make_filters()
+        if not granular and dash.callback_context.triggered_id == 'time-granularity-filter':
+            raise PreventUpdate
+        if exact_render(active_tab, filters, time_granularity, wait=not filters.get('sample')) is not None:
+            filters = exact_filters(filters)
+        if row_count(filters) == 0:
+            raise PreventUpdate
+        return [chart_figure(graph_id, filters, time_granularity)]
+
+    # Admission tracks the latest request per callback name, so each chart gets its own
+    update_chart.__name__ = f"update_chart_{graph_id.replace('-', '_')}"
+    app.callback(
+        [Output(graph_id, 'figure')],
+        [Input('filtered-data-store', 'data'),
+         Input('time-granularity-filter', 'value')]
+    )(companion_controlled(update_chart))
+
+
+for graph_id, (active_tab, _, granular) in DEFERRED_CHARTS.items():
+    register_deferred_chart(graph_id, active_tab, granular)
+
+
+# Top subnets callback
+@app.callback(
+    [Output('top-subnets-table', 'data')],
+    [Input('subnet-prefix', 'value'),
+     Input('filtered-data-store', 'data')],
+    prevent_initial_call=True
+)
+@companion_controlled
+def update_top_subnets(prefix, filters):
+    return [top_subnets(filters or make_filters(), prefix or 24).to_dict('records')]
+
+
+# Data Explorer search callback. It also runs when the table is inserted, so a search kept
+# in the box across renders applies to the new table
+@app.callback(
+    [Output('data-table', 'data'),
+     Output('data-table', 'page_count'),
+     Output('data-table', 'page_current'),
+     Output('data-search-status', 'children')],
+    [Input('data-search', 'value'),
+     Input('data-table', 'page_current'),
+     Input('filtered-data-store', 'data')]
+)
+@companion_controlled
+def search_data_table(query, page, filters):
+    if dash.callback_context.triggered_id != 'data-table':
+        page = 0
+    total, result = search_page(filters or make_filters(), query, page or 0)
+    status = f"{total:,} matching records" if search_terms(query) else f"{total:,} records"
+    return [result.to_dict('records'), search_page_count(total), page or 0, status]
+
+
+# Funnel controls callback
+@app.callback(
+    [Output('funnel-graph', 'figure'),
+     Output('funnel-breakdown-graph', 'figure')],
+    [Input('funnel-window', 'value'),
+     Input('funnel-breakdown', 'value'),
+     Input('filtered-data-store', 'data')],
+    prevent_initial_call=True
+)
+@companion_controlled
+def update_funnel(window_days, breakdown, filters):
+    table = funnel(filters or make_filters(), window_days or FUNNEL_WINDOW_DAYS, breakdown)
+    return funnel_figure(table), funnel_breakdown_figure(table, breakdown)
+
 # Download dataset callback
 @app.callback(
-    Output("download-dataset-csv", "data"),
+    [Output("download-dataset-csv", "data")],
     [Input("download-dataset-btn", "n_clicks")],
     [State('filtered-data-store', 'data')],
     prevent_initial_call=True
 )
-def download_dataset(n_clicks, filtered_data_json):
-    if filtered_data_json is None:
-        filtered_df = df.copy()
-    else:
-        filtered_df = pd.read_json(StringIO(filtered_data_json), orient='split')
-    return dcc.send_data_frame(filtered_df.to_csv, "filtered_dataset.csv")
+@admission_controlled
+def download_dataset(n_clicks, filters):
+    filtered_df = rows(filters or make_filters())
+    return [dcc.send_data_frame(filtered_df.to_csv, "filtered_dataset.csv")]
 
 # Download report callback
 @app.callback(
-    Output("download-report-csv", "data"),
+    [Output("download-report-csv", "data")],
     [Input("download-report-btn", "n_clicks")],
     [State('filtered-data-store', 'data')],
     prevent_initial_call=True
 )
-def download_report(n_clicks, filtered_data_json):
-    if filtered_data_json is None:
-        filtered_df = df.copy()
+@admission_controlled
+def download_report(n_clicks, filters):
+    feature_stats = feature_stats_table(exact_filters(filters or make_filters()))
+    return [dcc.send_data_frame(feature_stats.to_csv, "statistical_report.csv")]
+
+
+# Aggregation API: read-only grouped counts for other services from the same query layer as
+# the tabs. The ETag covers the loaded data and the request, so a poller sending
+# If-None-Match gets an empty 304 without any query until the data changes. Callers need a
+# dashboard session or, when DASHBOARD_API_TOKEN is set, an "Authorization: Bearer" header
+API_TOKEN = os.environ.get('DASHBOARD_API_TOKEN')
+API_MAX_AGE = int(os.environ.get('DASHBOARD_API_MAX_AGE', '60'))
+API_MIN_COMPRESS_BYTES = 1024
+API_DIMENSIONS = [col for col in DATA_COLUMNS if col not in ('time', 'timestamp')]
+data_modified = os.path.getmtime(DATA_FILE)
+data_version = f"{data_modified}:{os.path.getsize(DATA_FILE)}:{QUERY_BACKEND}"
+
+
+def api_error(status, message):
+    return flask.jsonify({'error': message}), status
+
+
+def api_authorized():
+    if current_user.is_authenticated:
+        return True
+    header = flask.request.headers.get('Authorization', '')
+    return bool(API_TOKEN) and hmac.compare_digest(header, f"Bearer {API_TOKEN}")
+
+
+def api_date(value):
+    return pd.to_datetime(value).strftime('%Y-%m-%d') if value else None
+
+
+# Encoded and gzipped response bodies, kept so repeated polls skip the query and compression
+@memory_cache(maxsize=64)
+def aggregate_body(key, dims):
+    filters = json.loads(key)
+    result = count_by(filters, list(dims))
+    if 'ip_address' in dims:
+        result['ip_address'] = format_ips(result['ip_address'])
+    if 'date' in dims:
+        result['date'] = result['date'].dt.strftime('%Y-%m-%d')
+    body = json.dumps({
+        'dims': list(dims),
+        'filters': filters,
+        'total': int(result['count'].sum()),
+        'rows': result.astype(object).where(result.notna(), None).to_dict('records'),
+    }).encode('utf-8')
+    return body, gzip.compress(body)
+
+
+@server.route('/api/v1/aggregate')
+def api_aggregate():
+    if not api_authorized():
+        return api_error(401, "Authentication required")
+    args = flask.request.args
+    dims = tuple(dim.strip() for dim in args.get('dims', '').split(',') if dim.strip())
+    if not dims:
+        return api_error(400, "dims is required, e.g. dims=country,feature_requested")
+    unknown = [dim for dim in dims if dim not in API_DIMENSIONS]
+    if unknown:
+        return api_error(400, f"Unknown dims: {', '.join(unknown)}; available: {', '.join(API_DIMENSIONS)}")
+    try:
+        filters = make_filters(
+            api_date(args.get('start')), api_date(args.get('end')), args.get('continent'),
+            args.get('country'), args.get('job_type'), args.get('interaction_type')
+        )
+    except (ValueError, TypeError) as e:
+        return api_error(400, f"Invalid date: {str(e)}")
+    key = filters_key(filters)
+    etag = hashlib.sha1(f"{data_version}|{key}|{','.join(dims)}".encode('utf-8')).hexdigest()
+    if flask.request.if_none_match.contains(etag):
+        response = flask.Response(status=304)
     else:
-        filtered_df = pd.read_json(StringIO(filtered_data_json), orient='split')
-    feature_stats_table = filtered_df.groupby('feature_requested').size().reset_index(name='count')
-    feature_stats_table['Mean Requests'] = feature_stats_table['count'].mean()
-    feature_stats_table['Std Dev Requests'] = feature_stats_table['count'].std()
-    feature_stats_table = feature_stats_table[['feature_requested', 'count', 'Mean Requests', 'Std Dev Requests']]
-    feature_stats_table.columns = ['Feature', 'Total Requests', 'Mean Requests', 'Std Dev Requests']
-    feature_stats_table['Mean Requests'] = feature_stats_table['Mean Requests'].round(2)
-    feature_stats_table['Std Dev Requests'] = feature_stats_table['Std Dev Requests'].round(2)
-    return dcc.send_data_frame(feature_stats_table.to_csv, "statistical_report.csv")
+        try:
+            body, compressed = aggregate_body(key, dims)
+        except ValueError as e:
+            # The aggregates backend only answers groupings covered by its rollups
+            return api_error(400, str(e))
+        response = flask.Response(body, mimetype='application/json')
+        if len(body) >= API_MIN_COMPRESS_BYTES and 'gzip' in flask.request.accept_encodings:
+            response.set_data(compressed)
+            response.headers['Content-Encoding'] = 'gzip'
+    response.set_etag(etag)
+    response.last_modified = data_modified
+    response.headers['Cache-Control'] = f"private, max-age={API_MAX_AGE}"
+    response.headers['Vary'] = 'Accept-Encoding, Authorization, Cookie'
+    return response
+
+
+# Warm-up: render the most-used tabs for the default (unfiltered) view right after the data
+# load, which also fills the query caches, so the first request to a fresh worker does not
+# pay for it. It runs wherever the data loads (see start_up); with gunicorn preload (see
+# gunicorn.conf.py) that is the master, and the forked workers inherit the results. In
+# 'background' mode a worker that loaded its data while importing warms up in a thread
+# instead. /ready answers 503 until the data is loaded and the warm-up has finished
+WARMUP_MODE = os.environ.get('DASHBOARD_WARMUP', 'on')
+WARMUP_TABS = [tab.strip() for tab in os.environ.get('DASHBOARD_WARMUP_TABS', 'overview,dataset,time').split(',') if tab.strip()]
+warmup_state = {'ready': WARMUP_MODE == 'off', 'seconds': None, 'tabs': [], 'error': None}
+warm_tabs = {}
+
+
+# Only the time tab depends on the granularity
+def warm_key(active_tab, filters, time_granularity):
+    return active_tab, filters_key(filters), time_granularity if active_tab == 'time' else None
+
+
+def warm_up():
+    started = time.perf_counter()
+    filters = make_filters()
+    try:
+        for tab in WARMUP_TABS:
+            # Fills the chart cache too, for the charts the tab defers
+            content = render_exact(tab, filters, 'daily')
+            warm_tabs[warm_key(tab, filters, 'daily')] = content
+            warmup_state['tabs'].append(tab)
+    except Exception as e:
+        # A failed warm-up only costs latency; the worker still serves
+        warmup_state['error'] = str(e)
+        print(f"Warm-up error: {str(e)}")
+    warmup_state['seconds'] = round(time.perf_counter() - started, 3)
+    warmup_state['ready'] = True
+    print(f"Warm-up: {', '.join(warmup_state['tabs']) or 'no tabs'} rendered in {warmup_state['seconds']}s")
+
+
+@server.route('/ready')
+def ready():
+    loaded = data_ready.is_set() and not data_state['error']
+    status = 200 if loaded and warmup_state['ready'] else 503
+    return flask.jsonify({
+        'pid': os.getpid(), **warmup_state, 'data_loaded': loaded, 'data_error': data_state['error'],
+        'startup': [{'phase': name, 'seconds': seconds} for name, seconds in startup_phases],
+        'admission': admission_stats,
+    }), status
+
+
+# Memory accounting (admins only): deep sizes of the dataset columns, the structures built
+# at startup and every memory_cache, plus tracemalloc's top allocation sites and the diff
+# between the last two snapshots. Numbers are per worker process. With
+# DASHBOARD_MEMORY_LIMIT_MB set, a worker whose RSS is over the limit after a request evicts
+# its caches, largest first, until it is back under MEMORY_TARGET of the limit
+ADMIN_USERS = {name.strip() for name in os.environ.get('DASHBOARD_ADMIN_USERS', 'admin').split(',') if name.strip()}
+MEMORY_LIMIT = int(float(os.environ.get('DASHBOARD_MEMORY_LIMIT_MB', '0')) * 2**20)
+MEMORY_TARGET = 0.9
+MEMORY_TOP_SITES = 15
+memory_state = {'evictions': 0, 'evicted': [], 'last_eviction': None}
+memory_snapshots = []
+
+
+def is_admin():
+    return current_user.is_authenticated and current_user.id in ADMIN_USERS
+
+
+def process_rss():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # Peak rather than current RSS where /proc is not available
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# The array that owns a view's memory; a view keeps all of it alive
+def array_root(values):
+    while isinstance(values.base, np.ndarray):
+        values = values.base
+    return values
+
+
+# Bytes held by a value, following containers; objects already counted (seen) count once.
+# Dash components and figures count as their serialized JSON, the form they are sent in.
+# deep=False skips measuring the strings in object columns, which is slow on large frames
+def deep_size(value, seen, deep=True):
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=deep, index=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=deep))
+    if isinstance(value, np.ndarray):
+        root = array_root(value)
+        if root is not value and id(root) in seen:
+            return 0
+        seen.add(id(root))
+        # Arrays over shared memory or memory-mapped files are not this process's heap
+        return root.nbytes if root.flags.owndata else 0
+    if isinstance(value, (dash.development.base_component.Component, go.Figure)):
+        return len(json.dumps(value, cls=plotly.utils.PlotlyJSONEncoder))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(deep_size(k, seen, deep) + deep_size(v, seen, deep) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(deep_size(item, seen, deep) for item in value)
+    return sys.getsizeof(value)
+
+
+# Mark the dataset's column buffers as counted, so caches holding views of them (the
+# categorical codes in column_codes, unfiltered frames) do not count them again
+def mark_dataset(seen):
+    if df is None:
+        return
+    seen.add(id(df))
+    for col in df.columns:
+        values = df[col].array
+        values = values.codes if isinstance(values, pd.Categorical) else df[col].to_numpy()
+        seen.add(id(array_root(values)))
+
+
+def dataset_memory(seen):
+    if df is None:
+        return []
+    mark_dataset(seen)
+    usage = df.memory_usage(deep=True, index=True)
+    return [
+        {'column': col, 'dtype': str(df[col].dtype) if col in df.columns else str(df.index.dtype),
+         'bytes': int(size), 'shared': SHARED_MEMORY and col in df.columns}
+        for col, size in usage.sort_values(ascending=False).items()
+    ]
+
+
+def structure_memory(seen):
+    structures = {
+        'ip_index': ip_index, 'search_index': search_index, 'sketches': sketches, 'sessions': sessions, 'sample': sample, 'aggregates': aggregates,
+        'partition_manifest': partition_manifest, 'warm_tabs': warm_tabs,
+        'exact_renders': [future.result() for future in list(exact_renders.values()) if future.done() and not future.exception()],
+    }
+    return sorted(
+        [{'structure': name, 'bytes': deep_size(value, seen)} for name, value in structures.items() if value is not None],
+        key=lambda row: -row['bytes']
+    )
+
+
+def cache_memory(seen, deep=True):
+    rows = []
+    for name, cache in caches.items():
+        entries = cache.cache_entries()
+        rows.append({'cache': name, **cache.cache_info(), 'bytes': sum(deep_size(value, seen, deep) for _, value in entries)})
+    return sorted(rows, key=lambda row: -row['bytes'])
+
+
+def allocation_sites(stats):
+    return [
+        {'site': str(stat.traceback[0]) if stat.traceback else '?', 'bytes': stat.size,
+         'change': getattr(stat, 'size_diff', None), 'blocks': stat.count}
+        for stat in stats[:MEMORY_TOP_SITES]
+    ]
+
+
+def take_memory_snapshot():
+    if not tracemalloc.is_tracing():
+        # Only allocations made from now on are traced
+        tracemalloc.start(max(TRACEMALLOC_FRAMES, 1))
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ])
+    memory_snapshots.append((datetime.now().strftime('%H:%M:%S'), snapshot))
+    del memory_snapshots[:-2]
+
+
+def memory_report():
+    seen = set()
+    report = {
+        'pid': os.getpid(),
+        'rss': process_rss(),
+        'limit': MEMORY_LIMIT or None,
+        'backend': QUERY_BACKEND,
+        'dataset': dataset_memory(seen),
+        'structures': structure_memory(seen),
+        'caches': cache_memory(seen),
+        'tracing': tracemalloc.is_tracing(),
+        **memory_state,
+    }
+    if memory_snapshots:
+        taken, latest = memory_snapshots[-1]
+        report['snapshot'] = {'taken': taken, 'top': allocation_sites(latest.statistics('lineno'))}
+        if len(memory_snapshots) > 1:
+            previous_taken, previous = memory_snapshots[0]
+            report['diff'] = {'from': previous_taken, 'to': taken, 'top': allocation_sites(latest.compare_to(previous, 'lineno'))}
+    return report
+
+
+# Clear caches, largest first, until RSS is at or below target bytes; warm tabs go too,
+# since they only save latency
+def evict_caches(target):
+    seen = set()
+    mark_dataset(seen)
+    sizes = {row['cache']: row['bytes'] for row in cache_memory(seen, deep=False)}
+    clearers = [(name, caches[name].cache_clear) for name in sorted(sizes, key=lambda name: -sizes[name]) if sizes[name]]
+    clearers.append(('warm_tabs', warm_tabs.clear))
+    evicted = []
+    for name, clear in clearers:
+        if process_rss() <= target:
+            break
+        clear()
+        gc.collect()
+        evicted.append(name)
+    return evicted
+
+
+@server.after_request
+def enforce_memory_limit(response):
+    # Once everything is evicted there is nothing left to free until the caches refill
+    if not warm_tabs and not any(cache.cache_info()['currsize'] for cache in caches.values()):
+        return response
+    if MEMORY_LIMIT and process_rss() > MEMORY_LIMIT:
+        rss = process_rss()
+        evicted = evict_caches(MEMORY_LIMIT * MEMORY_TARGET)
+        memory_state['evictions'] += 1
+        memory_state['evicted'] = evicted
+        memory_state['last_eviction'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"Memory: RSS {rss / 2**20:.0f} MB over the {MEMORY_LIMIT / 2**20:.0f} MB limit, "
+              f"evicted {', '.join(evicted) or 'nothing'}, now {process_rss() / 2**20:.0f} MB")
+    return response
+
+
+@server.route('/api/v1/memory')
+def memory_api():
+    if not is_admin():
+        return api_error(403, "Admins only")
+    return flask.jsonify(memory_report())
+
+
+def megabytes(value):
+    return f"{value / 2**20:,.1f}" if value is not None else ""
+
+
+def memory_table(rows, columns):
+    if not rows:
+        return html.P("Nothing to show", className="text-muted")
+    frame = pd.DataFrame(rows)[[key for key, _ in columns]]
+    for key, label in columns:
+        if key in ('bytes', 'change'):
+            frame[key] = frame[key].map(megabytes)
+    frame.columns = [label for _, label in columns]
+    return dbc.Table.from_dataframe(frame, striped=True, bordered=False, hover=True, size='sm')
+
+
+def memory_card(title, body):
+    return dbc.Card([
+        dbc.CardBody([
+            html.H5(title, className="card-title", style={"fontFamily": "Poppins", "fontWeight": "bold", "color": colors['dark']}),
+            body,
+        ])
+    ], className="mb-4 shadow-sm rounded-3")
+
+
+def render_memory_report(report):
+    limit = f" of a {megabytes(report['limit'])} MB limit" if report['limit'] else ""
+    eviction = ""
+    if report['last_eviction']:
+        eviction = f" {report['evictions']} evictions, last at {report['last_eviction']} ({', '.join(report['evicted']) or 'nothing'})."
+    cards = [
+        html.P(f"Worker {report['pid']} ({report['backend']} backend): RSS {megabytes(report['rss'])} MB{limit}.{eviction}",
+               style={"fontFamily": "Poppins"}),
+        memory_card("Dataset columns", memory_table(report['dataset'], [('column', 'Column'), ('dtype', 'Type'), ('bytes', 'MB'), ('shared', 'Shared')])),
+        memory_card("Startup structures", memory_table(report['structures'], [('structure', 'Structure'), ('bytes', 'MB')])),
+        memory_card("Caches", memory_table(report['caches'], [
+            ('cache', 'Cache'), ('currsize', 'Entries'), ('maxsize', 'Max'), ('hits', 'Hits'), ('misses', 'Misses'), ('bytes', 'MB')
+        ])),
+    ]
+    if 'snapshot' in report:
+        cards.append(memory_card(f"Top allocation sites at {report['snapshot']['taken']}",
+                                 memory_table(report['snapshot']['top'], [('site', 'Site'), ('bytes', 'MB'), ('blocks', 'Blocks')])))
+    elif not report['tracing']:
+        cards.append(html.P("Take a snapshot to start tracing allocations; take another later to see what grew.", className="text-muted"))
+    if 'diff' in report:
+        cards.append(memory_card(f"Growth from {report['diff']['from']} to {report['diff']['to']}",
+                                 memory_table(report['diff']['top'], [('site', 'Site'), ('change', 'MB change'), ('bytes', 'MB'), ('blocks', 'Blocks')])))
+    return cards
+
+
+@memory_cache(maxsize=1)
+def memory_layout():
+    return dbc.Container([
+        html.H3("Memory", className="mt-4 mb-3", style={"fontFamily": "Poppins", "fontWeight": "bold", "color": colors['dark']}),
+        html.Div([
+            dbc.Button("Refresh", id="memory-refresh", color="primary", className="me-2"),
+            dbc.Button("Take snapshot", id="memory-snapshot", color="secondary", className="me-2"),
+            dbc.Button("Evict caches", id="memory-evict", color="danger", outline=True),
+        ], className="mb-4"),
+        dcc.Loading(html.Div(id="memory-report")),
+    ], fluid=True, style={"backgroundColor": "#F5F7FA"})
+
+
+@app.callback(
+    Output('memory-report', 'children'),
+    [Input('memory-refresh', 'n_clicks'),
+     Input('memory-snapshot', 'n_clicks'),
+     Input('memory-evict', 'n_clicks')]
+)
+def update_memory_report(refresh_clicks, snapshot_clicks, evict_clicks):
+    if not is_admin():
+        raise PreventUpdate
+    triggered = dash.callback_context.triggered[0]['prop_id']
+    if triggered == 'memory-snapshot.n_clicks':
+        take_memory_snapshot()
+    elif triggered == 'memory-evict.n_clicks':
+        memory_state['evicted'] = evict_caches(0)
+        memory_state['last_eviction'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    return render_memory_report(memory_report())
+
+
+# Start-up: hash the sample passwords, load the data, then warm up, and print how long each
+# phase took. Until data_ready is set, requests that need the data wait for it; the login
+# page and its callbacks (the ones only updating DATA_FREE_OUTPUTS), static files and
+# /ready do not
+DATA_FREE_OUTPUTS = {'page-content', 'country-hierarchy-store', 'url', 'login-alert'}
+
+
+def start_up(warm):
+    with startup_phase('password hashes'):
+        for user in users.values():
+            password_hash(user)
+    try:
+        load_data_sources()
+    except Exception as e:
+        data_state['error'] = str(e)
+        print(f"Data load error: {str(e)}")
+    data_ready.set()
+    if warm and not data_state['error']:
+        with startup_phase('warm-up'):
+            warm_up()
+    print("Startup: " + ", ".join(f"{name} {seconds}s" for name, seconds in startup_phases))
+
+
+@server.before_request
+def wait_for_data_before_request():
+    if data_ready.is_set():
+        return None
+    path = flask.request.path
+    if path == '/_dash-update-component':
+        output = (flask.request.get_json(silent=True) or {}).get('output', '')
+        if {part.rsplit('.', 1)[0] for part in output.strip('.').split('...')} <= DATA_FREE_OUTPUTS:
+            return None
+    elif not path.startswith('/api/'):
+        return None
+    try:
+        wait_for_data()
+    except RuntimeError as e:
+        return api_error(503, str(e))
+    return None
+
+
+def record_serving():
+    if process_age() is not None:
+        startup_phases.append(('serving after', round(process_age(), 3)))
+
+
+if LOAD_MODE == 'sync' or SHARED_MEMORY:
+    # Threads do not survive gunicorn's fork, so a preloaded app loads and warms up in the master
+    start_up(WARMUP_MODE == 'on' or (SHARED_MEMORY and WARMUP_MODE == 'background'))
+    if WARMUP_MODE == 'background' and not SHARED_MEMORY:
+        threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
+    record_serving()
+else:
+    record_serving()
+    threading.Thread(target=start_up, args=(WARMUP_MODE != 'off',), name='start-up', daemon=True).start()
 
 # Run the app
 if __name__ == '__main__':
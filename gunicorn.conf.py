@@ -0,0 +1,5 @@
+import os
+
+# With DASHBOARD_SHARED_MEMORY=1 the app is imported once in the master so the dataset is
+# loaded into shared memory before the workers are forked
+preload_app = os.environ.get('DASHBOARD_SHARED_MEMORY', '0') == '1'
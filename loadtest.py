@@ -0,0 +1,454 @@
+import argparse
+import functools
+import http.cookiejar
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+# Load test for the Dash callback layer: virtual users log in, switch tabs, apply random
+# filter combinations, click chart points to cross-filter and download reports, sending the same /_dash-update-component
+# requests the browser would. The callback graph comes from /_dash-dependencies, so each
+# request carries the exact output, inputs and state the renderer sends, and callbacks of
+# newly rendered components fire the way the renderer fires them on insertion.
+#
+#   python loadtest.py --users 20 --duration 120                 # in-process, Flask test client
+#   python loadtest.py --url http://127.0.0.1:8000 --server-pid $(cat gunicorn.pid)
+#   python loadtest.py --check --users 1 --duration 0              # every cross-filter on every tab
+#
+# In-process runs share one interpreter (and its GIL) between all users, so they measure
+# per-request cost and memory growth; throughput needs a server run with real workers
+
+TABS = ['overview', 'dataset', 'geographic', 'time', 'sessions', 'funnel', 'job_types', 'features', 'demographics', 'statistics']
+GRANULARITIES = ['daily', 'weekly', 'monthly', 'yearly']
+# Download buttons and the tab that shows them
+DOWNLOADS = {'download-report-btn': 'statistics', 'download-dataset-btn': 'dataset'}
+ACTIONS = {'switch_tab': 0.4, 'apply_filters': 0.3, 'cross_filter': 0.15, 'download': 0.15}
+# Point fields a click sends, from the trace arrays plotly takes them from
+POINT_FIELDS = {'x': 'x', 'y': 'y', 'label': 'labels', 'location': 'locations'}
+# Stores the browser keeps outside the page content
+STORES = ['filtered-data-store', 'country-hierarchy-store', 'tab-render-store']
+# The reason admission control turned a request away (user_limit, queue_full, timed_out,
+# superseded); such requests did not run, so they are counted apart and kept out of latencies
+ADMISSION_HEADER = 'X-Dashboard-Admission'
+
+
+# In-process client: the app's Flask test client, one per user so each has its own cookies
+class TestClient:
+    def __init__(self, server):
+        self.client = server.test_client()
+
+    def request(self, method, path, body=None):
+        response = self.client.open(path, method=method, json=body)
+        return response.status_code, response.get_data(), response.headers
+
+
+class HttpClient:
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        request = urllib.request.Request(self.url + path, data=data, method=method, headers={'Content-Type': 'application/json'})
+        try:
+            with self.opener.open(request, timeout=120) as response:
+                return response.status, response.read(), response.headers
+        except urllib.error.HTTPError as e:
+            return e.code, e.read(), e.headers
+
+
+# '..a.children...b.data..' or 'a.data@hash' to [(id, property)]
+def parse_outputs(output):
+    parts = output[2:-2].split('...') if output.startswith('..') else [output]
+    return [tuple(part.rsplit('.', 1)) for part in parts]
+
+
+def output_spec(output):
+    specs = [{'id': id_, 'property': prop.split('@')[0]} for id_, prop in parse_outputs(output)]
+    return specs if output.startswith('..') else specs[0]
+
+
+def component_props(layout, props):
+    if isinstance(layout, list):
+        for child in layout:
+            component_props(child, props)
+    elif isinstance(layout, dict) and 'props' in layout:
+        component_id = layout['props'].get('id')
+        if isinstance(component_id, str):
+            props[component_id] = layout['props']
+        component_props(layout['props'].get('children'), props)
+
+
+# outcome is 'ok', 'error' or the reason admission control refused the request
+def record_request(stats, lock, name, elapsed, outcome):
+    with lock:
+        entry = stats.setdefault(name, {'latencies': [], 'errors': 0, 'refused': {}})
+        if outcome not in ('ok', 'error'):
+            entry['refused'][outcome] = entry['refused'].get(outcome, 0) + 1
+            return
+        entry['latencies'].append(elapsed)
+        if outcome == 'error':
+            entry['errors'] += 1
+
+
+def request_count(entry):
+    return len(entry['latencies']) + sum(entry['refused'].values())
+
+
+# A refusal with a message comes back as a 200 whose only update is the admission alert;
+# servers without the header are recognised by that
+def refusal(status, data, headers):
+    reason = headers.get(ADMISSION_HEADER)
+    if reason or status != 200:
+        return reason
+    body = json.loads(data)
+    if not body.get('response') and 'admission-alert' in body.get('sideUpdate', {}):
+        return 'refused'
+    return None
+
+
+class VirtualUser:
+    def __init__(self, client, dependencies, credentials, stats, lock, rng, think_time, check=False):
+        self.client = client
+        self.dependencies = dependencies
+        self.username, self.password = credentials
+        self.stats = stats
+        self.lock = lock
+        self.rng = rng
+        self.think_time = think_time
+        self.check = check
+        self.props = {}
+        self.clicks = {}
+        # Charts whose clicks cross-filter the rest of the dashboard
+        self.cross_filter_graphs = sorted({
+            item['id'] for dependency in dependencies for item in dependency['inputs'] if item['property'] == 'clickData'
+        })
+
+    def value(self, id_, prop):
+        return self.props.get(id_, {}).get(prop)
+
+    def call(self, dependency, changed):
+        body = {
+            'output': dependency['output'],
+            'outputs': output_spec(dependency['output']),
+            'inputs': [{**item, 'value': self.value(item['id'], item['property'])} for item in dependency['inputs']],
+            'state': [{**item, 'value': self.value(item['id'], item['property'])} for item in dependency['state']],
+            'changedPropIds': changed,
+        }
+        name = dependency['output'].strip('.').replace('...', ' + ')
+        start = time.perf_counter()
+        try:
+            status, data, headers = self.client.request('POST', '/_dash-update-component', body)
+        except Exception as e:
+            print(f"{self.username}: {name} failed: {e}")
+            record_request(self.stats, self.lock, name, time.perf_counter() - start, 'error')
+            return []
+        # 204 is a PreventUpdate: the callback ran and chose not to update anything
+        reason = refusal(status, data, headers)
+        outcome = reason or ('ok' if status in (200, 204) else 'error')
+        record_request(self.stats, self.lock, name, time.perf_counter() - start, outcome)
+        if status != 200 or reason:
+            return []
+        response = json.loads(data).get('response', {})
+        updated = []
+        for id_, props in response.items():
+            for prop, value in props.items():
+                if isinstance(value, dict) and '__dash_patch_update' in value:
+                    # Patches are applied by the renderer; only the ids matter here
+                    continue
+                self.props.setdefault(id_, {})[prop] = value
+                if prop == 'children':
+                    component_props(value, self.props)
+                updated.append(f"{id_}.{prop}")
+        return updated
+
+    # The renderer skips callbacks whose inputs or outputs are not on the page
+    def ready(self, dependency):
+        return (
+            not dependency.get('clientside_function')
+            and all(item['id'] in self.props for item in dependency['inputs'])
+            and any(id_ in self.props for id_, _ in parse_outputs(dependency['output']))
+        )
+
+    # Run the server callbacks listening to the changed props, then the ones they change in
+    # turn, plus the initial calls of any components the responses inserted into the page.
+    # Like the renderer, a callback that outputs one of its own inputs is not re-run by it
+    def propagate(self, changed):
+        pending = [(prop_id, None) for prop_id in changed]
+        while pending:
+            prop_id, source = pending.pop(0)
+            before = set(self.props)
+            for dependency in self.dependencies:
+                inputs = [f"{item['id']}.{item['property']}" for item in dependency['inputs']]
+                if prop_id in inputs and dependency is not source and self.ready(dependency):
+                    pending.extend((updated, dependency) for updated in self.call(dependency, [prop_id]))
+            inserted = set(self.props) - before
+            if inserted:
+                pending.extend(self.insert(inserted))
+
+    # Like the renderer, inserting a component runs the callbacks it is an input or an output
+    # of, and a callback whose inputs another initial call outputs waits for it. Returns the
+    # updated props with the callback that updated each
+    def insert(self, inserted):
+        batch = [
+            dependency for dependency in self.dependencies
+            if not dependency.get('prevent_initial_call') and self.ready(dependency)
+            and (any(item['id'] in inserted for item in dependency['inputs'])
+                 or any(id_ in inserted for id_, _ in parse_outputs(dependency['output'])))
+        ]
+        outputs = [
+            {f"{id_}.{prop.split('@')[0]}" for id_, prop in parse_outputs(dependency['output'])}
+            for dependency in batch
+        ]
+        updated = []
+        for waiting in [False, True]:
+            for index, dependency in enumerate(batch):
+                inputs = [f"{item['id']}.{item['property']}" for item in dependency['inputs']]
+                others = set().union(*(props for other, props in enumerate(outputs) if other != index))
+                if any(input_ in others for input_ in inputs) != waiting:
+                    continue
+                # Waiting callbacks whose inputs were updated run through propagate instead
+                if waiting and any(input_ in {prop_id for prop_id, _ in updated} for input_ in inputs):
+                    continue
+                updated.extend((prop_id, dependency) for prop_id in self.call(dependency, inputs))
+        return updated
+
+    def trigger(self, id_, prop, value):
+        self.props.setdefault(id_, {})[prop] = value
+        self.propagate([f"{id_}.{prop}"])
+
+    def click(self, id_):
+        self.clicks[id_] = self.clicks.get(id_, 0) + 1
+        self.trigger(id_, 'n_clicks', self.clicks[id_])
+
+    def login(self):
+        self.props = {'url': {'pathname': '/login'}}
+        for store in STORES:
+            self.props[store] = {'data': None}
+        self.trigger('url', 'pathname', '/login')
+        self.props.setdefault('username', {})['value'] = self.username
+        self.props.setdefault('password', {})['value'] = self.password
+        self.click('login-button')
+        if self.value('url', 'pathname') != '/' or 'tabs' not in self.props:
+            raise RuntimeError(f"login failed for {self.username}")
+
+    def switch_tab(self, tab=None):
+        tabs = [t for t in TABS if t != self.value('tabs', 'active_tab')]
+        self.trigger('tabs', 'active_tab', tab or self.rng.choice(tabs))
+
+    def apply_filters(self):
+        hierarchy = self.value('country-hierarchy-store', 'data') or {'continents': {}, 'countries': []}
+        start, end = self.value('start-date', 'min_date_allowed'), self.value('end-date', 'max_date_allowed')
+        if start and end:
+            days = (np.datetime64(end[:10]) - np.datetime64(start[:10])).astype(int)
+            lower = int(self.rng.integers(0, max(days, 1)))
+            upper = int(self.rng.integers(lower, max(days, 1) + 1))
+            self.props['start-date']['date'] = str(np.datetime64(start[:10]) + lower)
+            self.props['end-date']['date'] = str(np.datetime64(start[:10]) + upper)
+        continent = self.pick(list(hierarchy['continents']))
+        countries = hierarchy['continents'].get(continent, hierarchy['countries'])
+        for id_, value in [
+            ('continent-filter', continent),
+            ('country-filter', self.pick(countries)),
+            ('job-type-filter', self.pick(self.options('job-type-filter'))),
+            ('interaction-type-filter', self.pick(self.options('interaction-type-filter'))),
+            ('time-granularity-filter', self.rng.choice(GRANULARITIES)),
+        ]:
+            self.props.setdefault(id_, {})['value'] = value
+        self.click('apply-filters')
+
+    # Click a random point of a cross-filter chart on the page. The selection stays on for the
+    # tabs opened after it until the next Apply, so other tabs also run with cross-filters on
+    # columns their own charts are not grouped by
+    def cross_filter(self):
+        graphs = [id_ for id_ in self.cross_filter_graphs if (self.value(id_, 'figure') or {}).get('data')]
+        if not graphs:
+            self.switch_tab()
+            return
+        self.click_point(self.rng.choice(graphs))
+
+    def click_point(self, graph):
+        traces = self.value(graph, 'figure')['data']
+        trace = traces[int(self.rng.integers(len(traces)))]
+        point = {}
+        # Each field from its own index, so a heatmap click can land on any cell
+        for field, key in POINT_FIELDS.items():
+            values = trace.get(key)
+            if isinstance(values, list) and values:
+                point[field] = values[int(self.rng.integers(len(values)))]
+        self.trigger(graph, 'clickData', {'points': [point]})
+
+    # Each chart's selection is a cross-filter on columns other tabs may not group by, so every
+    # tab is opened under a click on every cross-filter chart
+    def check_cross_filters(self):
+        for tab in TABS:
+            self.switch_tab(tab)
+            for graph in self.cross_filter_graphs:
+                if not (self.value(graph, 'figure') or {}).get('data'):
+                    continue
+                self.click_point(graph)
+                for other in TABS:
+                    if other != tab:
+                        self.switch_tab(other)
+                self.click('reset-filters')
+                self.switch_tab(tab)
+
+    def download(self):
+        button = self.rng.choice(list(DOWNLOADS))
+        if button not in self.props:
+            self.switch_tab(DOWNLOADS[button])
+        self.click(button)
+
+    def options(self, id_):
+        options = self.value(id_, 'options') or []
+        return [option['value'] if isinstance(option, dict) else option for option in options if option != 'all']
+
+    # Most selections leave a filter open, as most real ones do
+    def pick(self, values):
+        values = [value for value in values if value != 'all']
+        if not values or self.rng.random() < 0.6:
+            return 'all'
+        return self.rng.choice(values)
+
+    def run(self, deadline):
+        self.login()
+        if self.check:
+            self.check_cross_filters()
+        names, weights = list(ACTIONS), list(ACTIONS.values())
+        while time.time() < deadline:
+            getattr(self, self.rng.choice(names, p=np.array(weights) / sum(weights)))()
+            time.sleep(self.rng.exponential(self.think_time))
+
+
+def rss_bytes(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+# The server process and its children (the gunicorn workers), from /proc
+def process_tree(pid):
+    pids = [pid]
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                if int(f.read().rsplit(')', 1)[1].split()[1]) == pid:
+                    pids.append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+    return pids
+
+
+def sample_memory(pid, samples, stats, lock, interval, stop):
+    start = time.time()
+    while True:
+        rss = {p: rss_bytes(p) for p in process_tree(pid)}
+        with lock:
+            requests = sum(request_count(entry) for entry in stats.values())
+        samples.append((time.time() - start, requests, {p: r for p, r in rss.items() if r is not None}))
+        if stop.wait(interval):
+            break
+
+
+def report(stats, samples, elapsed, users):
+    total = sum(request_count(entry) for entry in stats.values())
+    errors = sum(entry['errors'] for entry in stats.values())
+    refused = {}
+    for entry in stats.values():
+        for reason, count in entry['refused'].items():
+            refused[reason] = refused.get(reason, 0) + count
+    turned_away = sum(refused.values())
+    print(f"\n{users} users, {elapsed:.1f}s, {total} requests, {total / elapsed:.1f} req/s, "
+          f"{errors} errors ({errors / max(total, 1):.1%}), {turned_away} refused ({turned_away / max(total, 1):.1%})")
+    if refused:
+        print("Refused by admission control: " + ', '.join(f"{reason} {count}" for reason, count in sorted(refused.items())))
+    # Latencies are of the requests that ran; refused ones return at once and would hide the wait
+    print(f"\n{'callback':<60} {'n':>6} {'req/s':>7} {'err%':>6} {'ref%':>6} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, entry in sorted(stats.items(), key=lambda item: -request_count(item[1])):
+        count = request_count(entry)
+        latencies = np.array(entry['latencies']) * 1000
+        p50, p90, p99, slowest = np.percentile(latencies, [50, 90, 99, 100]) if len(latencies) else [np.nan] * 4
+        print(f"{name[:60]:<60} {count:>6} {count / elapsed:>7.1f} {entry['errors'] / count:>6.1%} "
+              f"{sum(entry['refused'].values()) / count:>6.1%} {p50:>8.1f} {p90:>8.1f} {p99:>8.1f} {slowest:>8.1f}")
+    if not samples:
+        return
+    pids = sorted({pid for _, _, rss in samples for pid in rss})
+    print(f"\n{'elapsed s':>9} {'requests':>9} " + ' '.join(f"{f'pid {pid} MB':>14}" for pid in pids))
+    for offset, requests, rss in samples:
+        print(f"{offset:>9.1f} {requests:>9} " + ' '.join(
+            f"{rss[pid] / 2**20:>14.1f}" if pid in rss else f"{'-':>14}" for pid in pids
+        ))
+    first, last = samples[0][2], samples[-1][2]
+    growth = {pid: last[pid] - first[pid] for pid in pids if pid in first and pid in last}
+    if growth:
+        print("\nMemory growth: " + ', '.join(f"pid {pid} {delta / 2**20:+.1f} MB" for pid, delta in growth.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent dashboard users against the Dash callbacks")
+    parser.add_argument('--users', type=int, default=10, help="virtual users (default 10)")
+    parser.add_argument('--duration', type=float, default=60, help="seconds to run (default 60)")
+    parser.add_argument('--think-time', type=float, default=0.5, help="mean pause between actions in seconds (default 0.5)")
+    parser.add_argument('--url', help="server to test, e.g. http://127.0.0.1:8000 (default: in-process test client)")
+    parser.add_argument('--server-pid', type=int, help="with --url, the gunicorn master pid whose workers' memory to sample")
+    parser.add_argument('--login', default='admin:password,user:password', help="comma-separated user:password pairs, assigned round-robin")
+    parser.add_argument('--sample-interval', type=float, default=5, help="seconds between memory samples (default 5)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="also write the raw latencies and memory samples to this file")
+    parser.add_argument('--check', action='store_true', help="before the timed run, open every tab under a click on every cross-filter chart")
+    args = parser.parse_args()
+
+    if args.url:
+        make_client = functools.partial(HttpClient, args.url)
+        pid = args.server_pid
+    else:
+        import app
+        make_client = functools.partial(TestClient, app.server)
+        pid = os.getpid()
+    status, data, _ = make_client().request('GET', '/_dash-dependencies')
+    if status != 200:
+        raise SystemExit(f"Could not read the callback graph: HTTP {status}")
+    dependencies = json.loads(data)
+    credentials = [tuple(pair.split(':', 1)) for pair in args.login.split(',')]
+
+    stats, lock, samples, stop = {}, threading.Lock(), [], threading.Event()
+    sampler = None
+    if pid:
+        sampler = threading.Thread(target=sample_memory, args=(pid, samples, stats, lock, args.sample_interval, stop), daemon=True)
+        sampler.start()
+    start = time.time()
+    deadline = start + args.duration
+    users = [
+        VirtualUser(make_client(), dependencies, credentials[i % len(credentials)], stats, lock,
+                    np.random.default_rng(args.seed + i), args.think_time, args.check)
+        for i in range(args.users)
+    ]
+    threads = [threading.Thread(target=user.run, args=(deadline,), daemon=True) for user in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - start
+    if sampler:
+        stop.set()
+        sampler.join()
+    report(stats, samples, elapsed, args.users)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'elapsed': elapsed, 'callbacks': stats, 'memory': samples}, f)
+
+
+if __name__ == '__main__':
+    main()